@@ -1,38 +1,153 @@
 # app.py
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
-from flask_socketio import SocketIO, emit, join_room, leave_room
+import atexit
+import os
+
+# SOCKETIO_ASYNC_MODE=eventlet|gevent serves connections cooperatively instead of a thread each;
+# the stdlib has to be patched before anything else imports it
+from services.runtime import monkey_patch, offloader
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+monkey_patch(ASYNC_MODE)
+
+from flask import Flask, Response, render_template, jsonify, request, session, redirect, url_for
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 import threading
 import time
-import base64
-import cv2
-import numpy as np
-from datetime import datetime
 
 from services.uav_simulator import UAVSimulator
 from services.mission_manager import MissionManager
+from services.mission_log import LEVELS, MissionLog
 from services.geofence_manager import GeofenceManager
+from services.alert_engine import AlertEngine
+from services.breach_forecast import BreachForecaster
+from services.deconfliction import SeparationMonitor
 from services.video_feed_manager import VideoFeedManager
+from services.telemetry_stream import ColumnarTelemetry, TelemetryDeltaEncoder
+from services.telemetry_store import TelemetryStore, parse_timestamp
+from services.frame_hub import FrameHub
+from services.stream_config import QualityTier, StreamSettings, parse_process_map
+from services.video_tiers import StreamDemand, TierSelector
+from services.subscriptions import TOPICS, TopicSubscriptions, WorkerDemand
+from services.message_bus import (FRAMES_CHANNEL, LocalBroker, RpcClient, RpcServer, RpcTimeout,
+                                  connect_bus, queue_manager)
+from services.metrics import BYTES_BUCKETS, PacketSizeJSON, metrics
+from services.scheduler import TickScheduler
+from services.snapshot import SnapshotCache
+from services.socket_transport import serialize_packet_sends
+from services.wire_format import WIRE_FORMATS, FastJSONProvider, dumps as json_dumps
 from models.uav import UAVType
 from models.user import User, UserRole
 
-# Simplified ORB-SLAM import
-try:
-    from python_orb_slam3 import ORBExtractor
-    HAS_ORB_SLAM = True
-    print("✓ Using python_orb_slam3")
-except ImportError:
-    HAS_ORB_SLAM = False
-    print("⚠ python_orb_slam3 not found, using OpenCV ORB fallback")
+# APP_ROLE=all (default) runs everything in this process. With SOCKETIO_MESSAGE_QUEUE set,
+# APP_ROLE=producer runs the simulator and video pipeline without serving clients and any number
+# of APP_ROLE=web workers serve the dashboards; events fan out to them through the queue
+APP_ROLE = os.environ.get('APP_ROLE', 'all')
+MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')  # redis://..., amqp://..., local://127.0.0.1:5600
+# Address the producer's local:// broker listens on; loopback unless workers run on other hosts
+MESSAGE_QUEUE_BIND = os.environ.get('MESSAGE_QUEUE_BIND')
+if APP_ROLE not in ('all', 'producer', 'web'):
+    raise ValueError(f"Unknown APP_ROLE {APP_ROLE!r}, expected all, producer or web")
+if APP_ROLE != 'all' and not MESSAGE_QUEUE:
+    raise ValueError(f'APP_ROLE={APP_ROLE} needs SOCKETIO_MESSAGE_QUEUE')
+IS_PRODUCER = APP_ROLE in ('all', 'producer')
+
+# APP_PROFILE=telemetry serves commands, telemetry and the APIs without the video stack: OpenCV
+# and the ORB pipeline are never imported. In the full profile they are imported, and the
+# streams started, when the first client subscribes to a stream
+APP_PROFILE = os.environ.get('APP_PROFILE', 'full')
+if APP_PROFILE not in ('full', 'telemetry'):
+    raise ValueError(f"Unknown APP_PROFILE {APP_PROFILE!r}, expected full or telemetry")
+VIDEO_ENABLED = APP_PROFILE == 'full'
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'military-uav-dashboard-classified'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+app.json = FastJSONProvider(app)  # orjson when installed
+# the producer only publishes to the queue; web workers (and APP_ROLE=all) also deliver from it
+queue_options = {'client_manager': queue_manager(MESSAGE_QUEUE, write_only=APP_ROLE == 'producer')} if MESSAGE_QUEUE else {}
+# PacketSizeJSON records the encoded size of every Socket.IO event packet
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, json=PacketSizeJSON(metrics, dumps=json_dumps),
+                    **queue_options)
+serialize_packet_sends(socketio.server)  # frame emits come from several threads at once
+offload = offloader(ASYNC_MODE)  # None in threading mode
+
+def run_blocking(fn, *args):
+    """Run CPU-heavy work on a native thread in async modes so the event loop keeps serving"""
+    return offload(fn, *args) if offload else fn(*args)
 
 # Initialize services
-simulator = UAVSimulator()
-mission_manager = MissionManager()
+# UAV_FLEET_ENGINE=vectorized steps the fleet with the NumPy struct-of-arrays engine
+simulator = UAVSimulator(vectorized=os.environ.get('UAV_FLEET_ENGINE') == 'vectorized')
+mission_manager = MissionManager()  # the durable log is attached at startup, in the producer only
 geofence_manager = GeofenceManager()
 video_manager = VideoFeedManager()
+frame_hub = FrameHub()
+subscriptions = TopicSubscriptions()  # telemetry / alerts / video_feeds rooms
+
+# Producer state is reached over the bus from web workers (rpc); the producer sums their viewer counts
+bus = connect_bus(MESSAGE_QUEUE) if MESSAGE_QUEUE else None
+rpc = RpcClient(bus) if APP_ROLE == 'web' else None
+DEMAND_REPORT_INTERVAL = 1.0  # web workers also report immediately on change
+
+# TICK RATES (Hz): physics runs in fixed steps, everything else at its own rate off the same loop
+PHYSICS_HZ = float(os.environ.get('TICK_PHYSICS_HZ', 20))
+TELEMETRY_HZ = float(os.environ.get('TICK_TELEMETRY_HZ', 10))
+GEOFENCE_HZ = float(os.environ.get('TICK_GEOFENCE_HZ', 1))
+VIDEO_STATUS_HZ = float(os.environ.get('TICK_VIDEO_STATUS_HZ', 1))
+STORE_HZ = float(os.environ.get('TICK_STORE_HZ', 1))
+SEPARATION_HZ = float(os.environ.get('TICK_SEPARATION_HZ', 2))  # 0 disables separation monitoring
+PHYSICS_MAX_CATCHUP = 5  # steps run back to back when behind; older missed steps are dropped
+
+# TELEMETRY CONFIG
+TELEMETRY_DELTA = True          # keyframe + delta protocol instead of full uav_update lists
+TELEMETRY_KEYFRAME_SECONDS = 30   # periodic keyframe, whatever the broadcast rate
+telemetry_encoder = TelemetryDeltaEncoder(keyframe_interval=max(1, round(TELEMETRY_KEYFRAME_SECONDS * TELEMETRY_HZ)))
+telemetry_clients = {}  # sid -> ETag of the last keyframe sent to that client
+# Clients may negotiate 'columnar' telemetry (typed-array binary frames) with set_wire_format;
+# they get it in their own room, so each format is only encoded while someone receives it
+COLUMNAR_ROOM = 'telemetry:columnar'
+columnar_encoder = ColumnarTelemetry()
+columnar_subscribers = TopicSubscriptions([COLUMNAR_ROOM])
+wire_formats = {}  # sid -> negotiated wire format, for clients not on plain JSON
+
+# Alerts are sent on raise/escalate/clear, plus a reminder while active (0 disables reminders)
+ALERT_RENOTIFY_SECONDS = float(os.environ.get('ALERT_RENOTIFY_SECONDS', 60))
+ALERT_CLEAR_AFTER = 3.0  # seconds outside every fence before a violation clears
+# Warn this many seconds before a UAV's planned route enters a geofence (0 disables forecasting)
+BREACH_WARNING_SECONDS = float(os.environ.get('BREACH_WARNING_SECONDS', 120))
+alert_engine = AlertEngine(renotify_seconds=ALERT_RENOTIFY_SECONDS, clear_after=ALERT_CLEAR_AFTER,
+                           breach_warning_seconds=BREACH_WARNING_SECONDS)
+breach_forecaster = BreachForecaster(geofence_manager)
+separation_monitor = SeparationMonitor()
+
+# Commands and mission events, as JSON lines with UAV/user/level/time indexes ('' keeps them in memory)
+MISSION_LOG_PATH = os.environ.get('MISSION_LOG_PATH', 'data/mission_log.jsonl')
+LOGS_MAX_LIMIT = 500
+
+# Every tick is appended to memory-mapped per-UAV segments for after-action review ('' disables)
+TELEMETRY_STORE_DIR = os.environ.get('TELEMETRY_STORE_DIR', 'data/telemetry')
+TELEMETRY_RETAIN_DAYS = float(os.environ.get('TELEMETRY_RETAIN_DAYS', 0)) or None
+TRACK_MAX_POINTS = 10000
+telemetry_store = None
+if TELEMETRY_STORE_DIR and IS_PRODUCER:
+    telemetry_store = TelemetryStore(TELEMETRY_STORE_DIR,
+                                     retain_seconds=TELEMETRY_RETAIN_DAYS and TELEMETRY_RETAIN_DAYS * 86400)
+
+# Collections serialized once per version, for REST (with ETag/304) and connect bursts alike
+snapshots = SnapshotCache(metrics, dumps=json_dumps)
+
+# METRICS CONFIG
+# /api/metrics accepts a logged-in session, or "Authorization: Bearer $METRICS_TOKEN" for scrapers
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+metrics.describe('video_stage_seconds', 'Per-frame time spent in each video pipeline stage')
+metrics.describe('video_frame_bytes', 'Encoded JPEG size per stream and tier')
+metrics.describe('tick_stage_seconds', 'Time spent in each stage of the broadcast tick')
+metrics.describe('tick_task_seconds', 'Run time of each scheduled task')
+metrics.describe('tick_lag_seconds', 'How late each scheduled task started after its deadline')
+metrics.describe('tick_overruns_total', 'Scheduled task runs that took longer than their period')
+metrics.describe('tick_skipped_total', 'Task periods (or physics steps) skipped because the loop fell behind')
+metrics.describe('emit_seconds', 'Socket.IO emit fan-out time per event')
+metrics.describe('snapshot_builds_total', 'Serializations of cached collection snapshots')
+metrics.describe('socketio_packet_bytes', 'Encoded Socket.IO packet size per event and recipient')
+metrics.describe('frame_cache_total', 'Processed frames served from the frame cache (hit) or computed (miss)')
 
 # Mock users for demo
 users = {
@@ -90,26 +205,69 @@ def get_uavs():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    uavs_data = [uav.to_dict() for uav in simulator.uavs.values()]
-    return jsonify(uavs_data)
+    # ?zoom=<map zoom> returns tracks simplified to about one pixel at that zoom
+    zoom = request.args.get('zoom', type=float)
+    path_limit = request.args.get('points', 100, type=int)
+    return snapshot_response('uavs', path_limit=path_limit, zoom=zoom)
 
 @app.route('/api/missions')
 def get_missions():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
-    return jsonify(mission_manager.get_all_missions())
+    return snapshot_response('missions')
 
 @app.route('/api/geofences')
 def get_geofences():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
-    return jsonify(geofence_manager.get_all_geofences())
+    return snapshot_response('geofences')
+
+@app.route('/api/alerts')
+def get_alerts():
+    """Currently active alerts, oldest first"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(producer_call('alerts'))
+
+@app.route('/api/forecasts')
+def get_forecasts():
+    """Next predicted geofence entry of every UAV whose route leads into one, soonest first"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(producer_call('forecasts'))
+
+@app.route('/api/conflicts')
+def get_conflicts():
+    """UAV pairs currently in loss of separation or on course for a near miss, closest first"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(producer_call('conflicts'))
 
 @app.route('/api/video-feeds')
 def get_video_feeds():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
-    return jsonify(video_manager.get_all_feeds())
+    return snapshot_response('video_feeds')
+
+@app.route('/api/uav/<uav_id>/track')
+def get_uav_track(uav_id):
+    """Stored track between ?from= and ?to= (epoch seconds or ISO-8601), downsampled to ?max_points="""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        end = parse_timestamp(request.args.get('to'), time.time())
+        start = parse_timestamp(request.args.get('from'), end - 3600)
+    except ValueError:
+        return jsonify({'error': 'from/to must be epoch seconds or ISO-8601'}), 400
+    max_points = request.args.get('max_points', 1000, type=int)
+    if start > end or not 2 <= max_points <= TRACK_MAX_POINTS:
+        return jsonify({'error': f'Need from <= to and 2 <= max_points <= {TRACK_MAX_POINTS}'}), 400
+    
+    track = producer_call('track', uav_id=uav_id, start=start, end=end, max_points=max_points)
+    if track is None:
+        return jsonify({'error': f'No stored telemetry for {uav_id}'}), 404
+    return jsonify(track)
 
 @app.route('/api/uav/<uav_id>/command', methods=['POST'])
 def send_uav_command(uav_id):
@@ -121,17 +279,7 @@ def send_uav_command(uav_id):
         return jsonify({'error': 'Insufficient permissions'}), 403
     
     command = request.json.get('command')
-    success = False
-    
-    if command == 'pause':
-        success = simulator.toggle_uav_pause(uav_id)
-    elif command == 'kill':
-        success = simulator.kill_uav(uav_id)
-    elif command == 'rtb':
-        success = simulator.return_to_base(uav_id)
-    
-    mission_manager.add_log_entry(f"Command '{command}' sent to {uav_id} by {user.name}")
-    
+    success = producer_call('command', uav_id=uav_id, command=command, user_name=user.name)
     return jsonify({'success': success})
 
 @app.route('/api/mission/create', methods=['POST'])
@@ -144,33 +292,278 @@ def create_mission():
         return jsonify({'error': 'Only commanders can create missions'}), 403
     
     mission_data = request.json
-    mission_id = mission_manager.create_mission(
-        mission_data['name'],
-        mission_data['description'],
-        mission_data['uav_ids'],
-        user.name
+    mission_id = producer_call('create_mission',
+        name=mission_data['name'],
+        description=mission_data['description'],
+        uav_ids=mission_data['uav_ids'],
+        created_by=user.name
     )
     
     return jsonify({'mission_id': mission_id})
 
+@app.route('/api/logs')
+def get_logs():
+    """Mission/command log, newest first; filter by uav_id, user, level, from/to and page with ?cursor="""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    level = request.args.get('level')
+    if level is not None and level not in LEVELS:
+        return jsonify({'error': f'level must be one of {", ".join(LEVELS)}'}), 400
+    try:
+        since = parse_timestamp(request.args.get('from'), None)
+        until = parse_timestamp(request.args.get('to'), None)
+    except ValueError:
+        return jsonify({'error': 'from/to must be epoch seconds or ISO-8601'}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), LOGS_MAX_LIMIT))
+    
+    return jsonify(producer_call('logs', uav_id=request.args.get('uav_id'), user=request.args.get('user'),
+                                 level=level, since=since, until=until,
+                                 cursor=request.args.get('cursor', type=int), limit=limit))
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Prometheus text exposition; ?format=json for a summary with p50/p95/p99"""
+    token = request.headers.get('Authorization', '')
+    if 'user_id' not in session and not (METRICS_TOKEN and token == f'Bearer {METRICS_TOKEN}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    fmt = request.args.get('format', 'prometheus')
+    if request.args.get('source') == 'producer':
+        body = producer_call('metrics', fmt=fmt)  # a web worker's own metrics cover only its clients
+    else:
+        body = op_metrics(fmt)
+    if fmt == 'json':
+        return jsonify(body)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.errorhandler(RpcTimeout)
+def producer_unavailable(error):
+    return jsonify({'error': f'Producer unavailable: {error}'}), 503
+
+@app.route('/video/<int:stream_id>.mjpg')
+def video_mjpeg(stream_id):
+    """Multipart MJPEG stream of the processed feed, for <img> tags and external players"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    if not VIDEO_ENABLED:
+        return jsonify({'error': 'Video is disabled (APP_PROFILE=telemetry)'}), 404
+    if stream_id not in range(len(get_video_paths())):
+        return jsonify({'error': f'Unknown stream: {stream_id}'}), 404
+    start_video_on_demand()
+    tier = request.args.get('tier', STREAM_TIERS[0].name)
+    tier_index = tier_selector.tier_index(tier)
+    if tier_index is None:
+        return jsonify({'error': f'Unknown tier: {tier}'}), 400
+    return Response(mjpeg_frames(stream_id, tier_index), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+def mjpeg_frames(stream_id, tier_index):
+    key = (stream_id, STREAM_TIERS[tier_index].name)
+    stream_demand.add(stream_id, tier_index, +1)
+    mjpeg_readers[stream_id * len(STREAM_TIERS) + tier_index] += 1
+    try:
+        seq = 0
+        part = b'\r\n'  # preamble, ignored by readers
+        while True:
+            frame = frame_hub.wait(key, seq)
+            if frame is not None:
+                seq, jpeg = frame
+                part = (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: ' +
+                        str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+            # On a timeout (paused or stalled stream) the last part is sent again, so a
+            # disconnected reader fails the write and releases its demand below
+            yield part
+    finally:
+        stream_demand.add(stream_id, tier_index, -1)
+        mjpeg_readers[stream_id * len(STREAM_TIERS) + tier_index] -= 1
+
 # WebSocket Events
 @socketio.on('connect')
 def handle_connect():
     print(f'[SOCKET] Client connected: {request.sid}')
     
-    # Send initial data
-    emit('uav_data', [uav.to_dict() for uav in simulator.uavs.values()])
-    emit('mission_data', mission_manager.get_all_missions())
-    emit('geofence_data', geofence_manager.get_all_geofences())
+    # Every topic by default; video streams are opt-in via 'subscribe'
+    subscribe_topics(subscriptions.topics)
+    emit('mission_data', snapshot('missions').raw())
+    emit('geofence_data', snapshot('geofences').raw())
+    
+    if VIDEO_ENABLED:
+        tier = tier_selector.add(request.sid)
+        emit('stream_tier', {'tier': tier, 'tiers': [t.name for t in STREAM_TIERS]})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     print(f'[SOCKET] Client disconnected: {request.sid}')
+    telemetry_clients.pop(request.sid, None)
+    subscriptions.drop(request.sid)
+    columnar_subscribers.drop(request.sid)
+    wire_formats.pop(request.sid, None)
+    tier_selector.remove(request.sid)  # Socket.IO clears the rooms themselves
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """{'streams': [0, 2], 'features': [0], 'topics': ['alerts']} -> join the matching rooms"""
+    data = data or {}
+    if not VIDEO_ENABLED:
+        data = {'topics': data.get('topics', [])}
+    elif data.get('streams') or data.get('features'):
+        start_video_on_demand()
+    for stream_id in data.get('streams', []):
+        tier = tier_selector.subscribe(request.sid, int(stream_id))
+        if tier:
+            join_room(f'stream:{int(stream_id)}:{tier}')
+    for stream_id in data.get('features', []):
+        join_room(f'features:{int(stream_id)}')
+    subscribe_topics(data.get('topics', []))
+    emit_subscriptions()
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    data = data or {}
+    for stream_id in data.get('streams', []):
+        tier = tier_selector.unsubscribe(request.sid, int(stream_id))
+        if tier:
+            leave_room(f'stream:{int(stream_id)}:{tier}')
+    for stream_id in data.get('features', []):
+        leave_room(f'features:{int(stream_id)}')
+    for topic in subscriptions.unsubscribe(request.sid, data.get('topics', [])):
+        leave_room(topic)
+        if topic == 'telemetry':
+            leave_room(COLUMNAR_ROOM)
+            columnar_subscribers.drop(request.sid)
+            telemetry_clients.pop(request.sid, None)
+    emit_subscriptions()
+
+def subscribe_topics(topics):
+    """Join topic rooms for the requesting client and send each topic's initial state"""
+    for topic in subscriptions.subscribe(request.sid, topics):
+        if topic == 'telemetry':
+            join_telemetry()
+        elif topic == 'alerts':
+            join_room(topic)
+            active = producer_call('alerts')  # only transitions are broadcast, so start from the current set
+            if active:
+                emit('alerts', active)
+        else:
+            join_room(topic)
+
+def join_telemetry():
+    """Put the requesting client in the telemetry room for its wire format and send the initial state"""
+    if wire_formats.get(request.sid) == 'columnar':
+        leave_room('telemetry')
+        join_room(COLUMNAR_ROOM)
+        columnar_subscribers.subscribe(request.sid, [COLUMNAR_ROOM])
+        send_columnar_state()
+        return
+    leave_room(COLUMNAR_ROOM)
+    columnar_subscribers.drop(request.sid)
+    join_room('telemetry')
+    if TELEMETRY_DELTA:
+        telemetry_clients.pop(request.sid, None)
+        send_telemetry_keyframe()
+    else:
+        emit('uav_data', snapshot('uavs').raw())
+
+@socketio.on('set_wire_format')
+def handle_set_wire_format(data):
+    """{'format': 'json' | 'columnar'}: how this client wants telemetry encoded"""
+    fmt = (data or {}).get('format')
+    if fmt not in WIRE_FORMATS:
+        fmt = 'json'
+    if fmt == 'json':
+        wire_formats.pop(request.sid, None)
+    else:
+        wire_formats[request.sid] = fmt
+    emit('wire_format', {'format': fmt, 'formats': WIRE_FORMATS,
+                         'schema': ColumnarTelemetry.schema() if fmt == 'columnar' else None})
+    if 'telemetry' in subscriptions.topics_of(request.sid):
+        join_telemetry()
+
+def emit_subscriptions():
+    emit('subscriptions', {
+        'streams': tier_selector.streams_of(request.sid),
+        'features': sorted(int(room.split(':')[1]) for room in rooms() if room.startswith('features:')),
+        'topics': subscriptions.topics_of(request.sid),
+    })
+
+@socketio.on('set_stream_tier')
+def handle_set_stream_tier(data):
+    """Pin this client to a quality tier, or {'tier': 'auto'} to adapt to its ack latency"""
+    tier = (data or {}).get('tier')
+    if not tier:
+        return
+    switch_stream_tier(tier_selector.request(request.sid, tier))
+
+@socketio.on('frame_ack')
+def handle_frame_ack(data):
+    """Client echoes the server timestamp of a frame it displayed"""
+    ts = (data or {}).get('ts')
+    if ts is None:
+        return
+    change = tier_selector.record_ack(request.sid, float(ts))
+    if change:
+        print(f'[VIDEO] {request.sid} tier {change[0]} -> {change[1]}')
+    switch_stream_tier(change)
+
+def switch_stream_tier(change):
+    """Move the requesting client between frame rooms after a tier change"""
+    if not change:
+        return
+    old, new = change
+    for stream_id in tier_selector.streams_of(request.sid):
+        leave_room(f'stream:{stream_id}:{old}')
+        join_room(f'stream:{stream_id}:{new}')
+    emit('stream_tier', {'tier': new})
+
+@socketio.on('telemetry_resync')
+def handle_telemetry_resync(data=None):
+    """Client saw a gap in the delta sequence and needs a fresh keyframe"""
+    if request.sid not in telemetry_clients:
+        return  # not subscribed to telemetry
+    if wire_formats.get(request.sid) == 'columnar':
+        send_columnar_state()  # unknown roster or UAV
+    else:
+        send_telemetry_keyframe()  # always: the client has dropped its copy
+
+def send_telemetry_keyframe():
+    """Send the encoder's current keyframe to the requesting client"""
+    keyframe = snapshot('keyframe')
+    telemetry_clients[request.sid] = keyframe.etag
+    emit('telemetry_keyframe', keyframe.raw())
+
+def send_columnar_state():
+    """Roster plus full UAV records; telemetry_columnar frames then update them in place"""
+    uavs = snapshot('uavs')
+    telemetry_clients[request.sid] = uavs.etag
+    emit('telemetry_roster', producer_call('roster'))
+    emit('uav_data', uavs.raw())
 
 # ORB STREAMING CONFIG
 EMIT_FPS = 10  # Increased FPS for smoother video
 JPEG_QUALITY = 75
 MAX_WIDTH = 640
+# Each tier is encoded once per frame, and only while someone is watching it
+STREAM_TIERS = (
+    QualityTier('high', MAX_WIDTH, JPEG_QUALITY),
+    QualityTier('medium', 480, 60),
+    QualityTier('low', 320, 40),
+)
+# ORB_KEYPOINTS=channel sends packed keypoints on 'features' and leaves frames un-annotated
+ORB_KEYPOINTS = os.environ.get('ORB_KEYPOINTS', 'burn')
+# Processed frames of the looping clips are kept (LRU, per process) so later loops skip ORB and encode
+FRAME_CACHE_MB = float(os.environ.get('FRAME_CACHE_MB', 256))
+stream_settings = StreamSettings(emit_fps=EMIT_FPS, max_width=MAX_WIDTH, tiers=STREAM_TIERS,
+                                 keypoint_channel=ORB_KEYPOINTS == 'channel',
+                                 frame_cache_bytes=int(FRAME_CACHE_MB * 2 ** 20))
+stream_demand = StreamDemand(4, len(STREAM_TIERS))
+tier_selector = TierSelector(STREAM_TIERS, stream_demand)
+mjpeg_readers = [0] * (stream_demand.streams * len(STREAM_TIERS))  # subset of stream_demand served over HTTP
+worker_demand = WorkerDemand(stream_demand) if bus and IS_PRODUCER else None  # viewers on web workers
+
+# 'threads' runs streams inside this process; 'processes' runs them in a worker pool
+# ORB_PROCESS_MAP assigns streams to workers, e.g. "0,1;2,3" (default: one per stream, up to CPU count)
+ORB_STREAM_MODE = os.environ.get('ORB_STREAM_MODE', 'threads')
+ORB_PROCESS_MAP = os.environ.get('ORB_PROCESS_MAP')
+stream_pool = None
 
 FALLBACK_VIDEO_PATHS = [
     "static/videos/vid1.mp4",
@@ -179,14 +572,6 @@ FALLBACK_VIDEO_PATHS = [
     "static/videos/vid4.mp4"
 ]
 
-def encode_jpeg_to_dataurl(img_bgr):
-    """Convert BGR image to JPEG data URL"""
-    is_success, buf = cv2.imencode('.jpg', img_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
-    if not is_success:
-        return None
-    b64 = base64.b64encode(buf.tobytes()).decode('utf-8')
-    return f"data:image/jpeg;base64,{b64}"
-
 def get_video_paths():
     """Get video paths from manager or use fallback"""
     feeds = []
@@ -210,160 +595,337 @@ def get_video_paths():
     
     return paths[:4]
 
-def process_stream(stream_id, video_path):
-    """Simple stream processing with small ORB keypoint dots"""
-    print(f"[ORB-{stream_id}] Starting stream: {video_path}")
+# Checked at startup (without importing OpenCV) so a bad ORB_PROCESS_MAP fails before anyone subscribes
+ORB_PROCESS_GROUPS = (parse_process_map(ORB_PROCESS_MAP, len(get_video_paths()))
+                      if ORB_STREAM_MODE == 'processes' and VIDEO_ENABLED and IS_PRODUCER else None)
+
+def broadcast(event, payload, to):
+    """socketio.emit to a room, timing the fan-out"""
+    with metrics.timer('emit_seconds', event=event):
+        socketio.emit(event, payload, to=to, namespace='/')
+
+def publish_frame(stream_id, encoded, meta):
+    """Fan out one frame's tier encodings to Socket.IO rooms and MJPEG readers"""
+    start = time.perf_counter()
+    ts = time.time()
+    features = meta.get('features')
+    if features is not None:
+        # sent before the frames so overlays are ready when the image lands
+        broadcast('features', {'id': stream_id, 'frame': meta['frame'], 'data': features}, f'features:{stream_id}')
+    for tier, jpeg in encoded.items():
+        seq = frame_hub.publish((stream_id, tier), jpeg)
+        if worker_demand and worker_demand.mjpeg_count(stream_id, tier_selector.tier_index(tier)):
+            bus.publish(FRAMES_CHANNEL, (stream_id, tier, jpeg))  # for MJPEG readers on web workers
+        metrics.observe('video_frame_bytes', len(jpeg), BYTES_BUCKETS, stream=stream_id, tier=tier)
+        # bytes go out as a Socket.IO binary attachment, no base64
+        broadcast('frame', {'id': stream_id, 'tier': tier, 'seq': seq, 'ts': ts, 'frame': meta['frame'], 'image': jpeg},
+                  f'stream:{stream_id}:{tier}')
     
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"[ORB-{stream_id}] ERROR: Cannot open video")
+    if 'cached' in meta:
+        metrics.inc('frame_cache_total', stream=stream_id, result='hit' if meta['cached'] else 'miss')
+    timings = meta.get('timings', {})
+    timings['emit'] = time.perf_counter() - start
+    for stage, seconds in timings.items():
+        metrics.observe('video_stage_seconds', seconds, stream=stream_id, stage=stage)
+
+def process_stream(stream_id, video_path):
+    """Paced stream processing with small ORB keypoint dots"""
+    from services.orb_pipeline import run_stream
+    run_stream(stream_id, video_path, stream_settings, publish_frame, stream_demand,
+               sleep=socketio.sleep, offload=offload)
+
+video_started = False
+video_start_lock = threading.Lock()
+
+def start_video_on_demand():
+    """Start the streams the first time anyone wants one; on web workers this is the producer's job"""
+    global video_started
+    if video_started or not VIDEO_ENABLED or not IS_PRODUCER:
         return
+    with video_start_lock:
+        if video_started:
+            return
+        video_started = True
+    start_orb_streams()
+
+def start_orb_streams():
+    """Start ORB streaming tasks, or worker processes when ORB_STREAM_MODE=processes"""
+    started = time.perf_counter()
+    from services.stream_workers import StreamWorkerPool  # imports OpenCV
     
-    # Initialize ORB extractor
-    if HAS_ORB_SLAM:
-        try:
-            orb_extractor = ORBExtractor()
-            print(f"[ORB-{stream_id}] Using ORB-SLAM3")
-        except Exception as e:
-            print(f"[ORB-{stream_id}] ORB-SLAM3 failed: {e}, using OpenCV")
-            orb_extractor = cv2.ORB_create(nfeatures=2000)
+    video_paths = get_video_paths()
+    print(f"[ORB] Starting {len(video_paths)} video streams")
+    print(f"[ORB] Video paths: {video_paths}")
+    
+    if ORB_STREAM_MODE == 'processes':
+        global stream_pool
+        stream_pool = StreamWorkerPool(video_paths, stream_settings, stream_demand, ORB_PROCESS_GROUPS)
+        stream_pool.start(publish_frame, spawn=socketio.start_background_task, offload=offload)
+        atexit.register(stream_pool.stop)
     else:
-        orb_extractor = cv2.ORB_create(nfeatures=2000)
-        print(f"[ORB-{stream_id}] Using OpenCV ORB")
+        for i, path in enumerate(video_paths):
+            socketio.start_background_task(process_stream, i, path)
+            print(f"[ORB] Started {ASYNC_MODE} task for stream {i}")
+    print(f"[ORB] Video stack loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def serialize_fleet():
+    return [uav.to_dict() for uav in simulator.uavs.values()]
+
+# PRODUCER OPS
+# Everything that reads or changes producer state; web workers call these over the bus
+def op_uavs(path_limit=100, zoom=None):
+    return [uav.to_dict(path_limit, zoom) for uav in simulator.uavs.values()]
+
+def op_missions():
+    return mission_manager.get_all_missions()
+
+def op_geofences():
+    return geofence_manager.get_all_geofences()
+
+def op_alerts():
+    return alert_engine.active()
+
+def op_forecasts():
+    return breach_forecaster.latest
+
+def op_conflicts():
+    return separation_monitor.latest
+
+def op_roster():
+    return columnar_encoder.roster_of(simulator)
+
+def op_video_feeds():
+    return video_manager.get_all_feeds() if VIDEO_ENABLED else []
+
+def op_snapshot(name, known_etag=None, args=None):
+    """(etag, JSON text) of a cached collection; text is None when the caller holds known_etag"""
+    snap = snapshots.get(name, **(args or {}))
+    return snap.etag, (None if snap.etag == known_etag else snap.text)
+
+def op_track(uav_id, start, end, max_points):
+    """Stored track, or None when the store is off or the UAV is unknown and has no history"""
+    if telemetry_store is None:
+        return None
+    track = telemetry_store.query(uav_id, start, end, max_points)
+    if track['count'] == 0 and uav_id not in simulator.uavs:
+        return None
+    return track
+
+def op_command(uav_id, command, user_name):
+    success = False
     
-    frame_interval = 1.0 / float(EMIT_FPS)
-    last_emit = 0.0
-    frame_count = 0
+    if command == 'pause':
+        success = simulator.toggle_uav_pause(uav_id)
+    elif command == 'kill':
+        success = simulator.kill_uav(uav_id)
+    elif command == 'rtb':
+        success = simulator.return_to_base(uav_id)
     
+    mission_manager.add_log_entry(f"Command '{command}' sent to {uav_id} by {user_name}",
+                                  level='info' if success else 'warning', user=user_name, uav_ids=[uav_id])
+    return success
+
+def op_logs(**filters):
+    return mission_manager.log.query(**filters)
+
+def op_create_mission(name, description, uav_ids, created_by):
+    return mission_manager.create_mission(name, description, uav_ids, created_by)
+
+def op_report_demand(worker, streams, mjpeg, topics):
+    worker_demand.report(worker, streams, mjpeg, topics)
+    if any(streams) or any(mjpeg):
+        start_video_on_demand()
+
+def op_metrics(fmt='prometheus'):
+    return metrics.to_dict() if fmt == 'json' else metrics.to_prometheus()
+
+PRODUCER_OPS = {
+    'uavs': op_uavs,
+    'missions': op_missions,
+    'geofences': op_geofences,
+    'alerts': op_alerts,
+    'forecasts': op_forecasts,
+    'conflicts': op_conflicts,
+    'roster': op_roster,
+    'video_feeds': op_video_feeds,
+    'snapshot': op_snapshot,
+    'track': op_track,
+    'command': op_command,
+    'create_mission': op_create_mission,
+    'logs': op_logs,
+    'report_demand': op_report_demand,
+    'metrics': op_metrics,
+}
+
+snapshots.register('uavs', op_uavs, lambda: simulator.version)
+snapshots.register('missions', op_missions, lambda: mission_manager.version)
+snapshots.register('geofences', op_geofences, lambda: geofence_manager.version)
+snapshots.register('video_feeds', op_video_feeds, lambda: video_manager.version)
+snapshots.register('keyframe', telemetry_encoder.keyframe, lambda: telemetry_encoder.seq)
+
+def snapshot(name, **args):
+    """Cached serialized collection; a web worker revalidates its copy against the producer's"""
+    if rpc:
+        return snapshots.revalidate(
+            name, lambda known: rpc.call('snapshot', name=name, known_etag=known, args=args), **args)
+    return snapshots.get(name, **args)
+
+def snapshot_response(name, **args):
+    """JSON response from the snapshot cache; 304 when If-None-Match has the current ETag"""
+    snap = snapshot(name, **args)
+    response = Response(snap.body, mimetype='application/json')
+    response.set_etag(snap.etag)
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate; a 304 costs no serialization
+    return response.make_conditional(request)
+
+def producer_call(op, **args):
+    """Run a producer operation here, or on the producer process when this is a web worker"""
+    if rpc:
+        return rpc.call(op, **args)
+    return PRODUCER_OPS[op](**args)
+
+def topic_count(topic):
+    """Subscribers to a topic (or the columnar telemetry room) here plus, on a producer, on every web worker"""
+    local = (columnar_subscribers if topic == COLUMNAR_ROOM else subscriptions).count(topic)
+    return local + (worker_demand.topic_count(topic) if worker_demand else 0)
+
+def report_demand():
+    """Web worker: send this worker's viewer counts to the producer on change, and at least once a second"""
+    last, sent = None, 0.0
     while True:
-        ret, frame = cap.read()
-        
-        if not ret:
-            # Loop video
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            frame_count = 0
-            time.sleep(0.1)
-            continue
-        
-        frame_count += 1
-        
-        # Resize if needed
-        h, w = frame.shape[:2]
-        if w > MAX_WIDTH:
-            scale = MAX_WIDTH / float(w)
-            frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Extract keypoints and descriptors
-        try:
-            if HAS_ORB_SLAM:
-                keypoints, descriptors = orb_extractor.detectAndCompute(gray)
-            else:
-                keypoints, descriptors = orb_extractor.detectAndCompute(gray, None)
-        except Exception as e:
-            print(f"[ORB-{stream_id}] Detection error: {e}")
-            keypoints = []
-        
-        # Draw keypoints (small dots with flags=0)
-        frame_with_keypoints = cv2.drawKeypoints(
-            frame, keypoints, None, color=(0, 255, 0), flags=0
-        )
-        
-        # Rate-limited emission
+        report = {
+            'streams': stream_demand.snapshot(),
+            'mjpeg': list(mjpeg_readers),
+            'topics': {**{topic: subscriptions.count(topic) for topic in TOPICS},
+                       COLUMNAR_ROOM: columnar_subscribers.count(COLUMNAR_ROOM)},
+        }
         now = time.time()
-        if now - last_emit >= frame_interval:
-            dataurl = encode_jpeg_to_dataurl(frame_with_keypoints)
-            if dataurl:
-                try:
-                    socketio.emit('frame', {'id': stream_id, 'image': dataurl}, namespace='/')
-                    if frame_count % 50 == 0:  # Log every 50 frames
-                        print(f"[ORB-{stream_id}] Frame {frame_count}, keypoints: {len(keypoints)}")
-                except Exception as e:
-                    print(f"[ORB-{stream_id}] Emit error: {e}")
-            last_emit = now
-        
-        # Small sleep to prevent CPU overload
-        time.sleep(0.01)
+        if report != last or now - sent >= DEMAND_REPORT_INTERVAL:
+            rpc.cast('report_demand', worker=rpc.worker_id, **report)
+            last, sent = report, now
+        socketio.sleep(0.25)
 
-def start_orb_stream_threads():
-    """Start ORB streaming threads"""
-    video_paths = get_video_paths()
-    print(f"[ORB] Starting {len(video_paths)} video streams")
-    print(f"[ORB] Video paths: {video_paths}")
-    
-    for i, path in enumerate(video_paths):
-        t = threading.Thread(target=process_stream, args=(i, path), daemon=True, name=f"ORB-Stream-{i}")
-        t.start()
-        print(f"[ORB] Started thread for stream {i}")
+def receive_frames():
+    """Web worker: feed local MJPEG readers from frames the producer publishes on the bus"""
+    for _, (stream_id, tier, jpeg) in bus.listen([FRAMES_CHANNEL]):
+        frame_hub.publish((stream_id, tier), jpeg)
+
+# Background update tasks, run by broadcast_updates() at their own rates
+def tick_physics(dt):
+    with metrics.timer('tick_stage_seconds', stage='simulate'):
+        run_blocking(simulator.update_all_uavs, dt)
+
+def tick_store():
+    with metrics.timer('tick_stage_seconds', stage='store'):
+        run_blocking(telemetry_store.append_fleet, list(simulator.uavs.values()))
+
+def tick_telemetry():
+    """Broadcast to telemetry subscribers in each wire format that has any; skip the others"""
+    columnar = topic_count(COLUMNAR_ROOM)
+    if topic_count('telemetry') > columnar:
+        with metrics.timer('tick_stage_seconds', stage='serialize'):
+            uavs_data = run_blocking(serialize_fleet)
+        if TELEMETRY_DELTA:
+            with metrics.timer('tick_stage_seconds', stage='telemetry_encode'):
+                event, payload = run_blocking(telemetry_encoder.encode, uavs_data)
+            broadcast(event, payload, 'telemetry')
+        else:
+            broadcast('uav_update', uavs_data, 'telemetry')
+    if columnar:
+        with metrics.timer('tick_stage_seconds', stage='columnar_encode'):
+            frame = run_blocking(columnar_encoder.encode, simulator)
+        broadcast('telemetry_columnar', frame, COLUMNAR_ROOM)
+
+def tick_alerts():
+    """Evaluate geofences and batteries; only changes are broadcast. Runs without subscribers
+    too, so the active set is current for the next client that subscribes"""
+    uavs, lats, lons = simulator.positions()
+    with metrics.timer('tick_stage_seconds', stage='geofence'):
+        violations = run_blocking(geofence_manager.check_fleet, lats, lons)
+    forecasts = None
+    if BREACH_WARNING_SECONDS:
+        with metrics.timer('tick_stage_seconds', stage='forecast'):
+            forecasts = run_blocking(breach_forecaster.forecast_fleet, uavs)
+    with metrics.timer('tick_stage_seconds', stage='alerts'):
+        alerts = alert_engine.evaluate(uavs, violations, forecasts=forecasts)
+    if alerts and topic_count('alerts'):
+        broadcast('alerts', alerts, 'alerts')
+
+def tick_separation():
+    """Airframe-to-airframe separation; like alerts, only changes are broadcast"""
+    uavs, *kinematics = simulator.kinematics()
+    with metrics.timer('tick_stage_seconds', stage='separation'):
+        conflicts = run_blocking(separation_monitor.check, [uav.id for uav in uavs], *kinematics)
+    alerts = alert_engine.evaluate_separation(conflicts)
+    if alerts and topic_count('alerts'):
+        broadcast('alerts', alerts, 'alerts')
+
+def tick_video_status():
+    if worker_demand:
+        worker_demand.expire()
+    if VIDEO_ENABLED and topic_count('video_feeds'):
+        video_manager.update_feeds()
+        broadcast('video_update', snapshot('video_feeds').raw(), 'video_feeds')
 
-# Background update broadcaster
 def broadcast_updates():
-    """Background thread to broadcast real-time updates"""
-    print("[BROADCAST] Starting update broadcaster")
-    
-    while True:
-        try:
-            simulator.update_all_uavs()
-            
-            # Broadcast to all connected users
-            uavs_data = [uav.to_dict() for uav in simulator.uavs.values()]
-            socketio.emit('uav_update', uavs_data, namespace='/')
-            
-            # Check for alerts and violations
-            alerts = []
-            for uav in simulator.uavs.values():
-                if geofence_manager.check_violation(uav.lat, uav.lon):
-                    alerts.append({
-                        'type': 'geofence_violation',
-                        'uav_id': uav.id,
-                        'message': f'{uav.id} has violated restricted airspace',
-                        'severity': 'high',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                
-                if uav.battery_level < 20:
-                    alerts.append({
-                        'type': 'low_battery',
-                        'uav_id': uav.id,
-                        'message': f'{uav.id} battery critically low: {uav.battery_level}%',
-                        'severity': 'medium',
-                        'timestamp': datetime.now().isoformat()
-                    })
-            
-            if alerts:
-                socketio.emit('alerts', alerts, namespace='/')
-            
-            # Update video feeds
-            try:
-                video_feeds = video_manager.update_feeds()
-                socketio.emit('video_update', video_feeds, namespace='/')
-            except Exception:
-                pass
-        
-        except Exception as e:
-            print(f"[BROADCAST] Error: {e}")
-        
-        time.sleep(1)
+    """Background task: fixed-step physics plus telemetry, alerts and feed status at their own rates"""
+    print(f"[BROADCAST] Starting update broadcaster (physics {PHYSICS_HZ:g} Hz, telemetry {TELEMETRY_HZ:g} Hz, "
+          f"geofence {GEOFENCE_HZ:g} Hz, separation {SEPARATION_HZ:g} Hz, video status {VIDEO_STATUS_HZ:g} Hz)")
+    scheduler = TickScheduler(metrics, sleep=socketio.sleep, max_catchup=PHYSICS_MAX_CATCHUP)
+    scheduler.add('physics', PHYSICS_HZ, tick_physics, fixed_step=True)
+    if telemetry_store:
+        scheduler.add('store', STORE_HZ, tick_store)
+    scheduler.add('telemetry', TELEMETRY_HZ, tick_telemetry)
+    scheduler.add('alerts', GEOFENCE_HZ, tick_alerts)
+    if SEPARATION_HZ:
+        scheduler.add('separation', SEPARATION_HZ, tick_separation)
+    scheduler.add('video_status', VIDEO_STATUS_HZ, tick_video_status)
+    scheduler.run()
+
+PORT = int(os.environ.get('PORT', 5000))
+DEBUG = os.environ.get('FLASK_DEBUG', '1') != '0'  # FLASK_DEBUG=0 disables the reloader (load tests)
 
 if __name__ == '__main__':
-    # Initialize demo data
-    init_demo_uavs()
-    init_geofences()
+    if MESSAGE_QUEUE and MESSAGE_QUEUE.startswith('local://') and IS_PRODUCER:
+        try:
+            LocalBroker.from_url(MESSAGE_QUEUE, bind=MESSAGE_QUEUE_BIND).start()
+        except OSError as e:
+            print(f"[BUS] Not hosting the broker ({e}); using the one already on {MESSAGE_QUEUE}")
     
-    # Start background update thread
-    update_thread = threading.Thread(target=broadcast_updates, daemon=True, name="UAV-Broadcast")
-    update_thread.start()
+    # The debug reloader serves from a child process that re-runs this file; the watching
+    # parent starts no tasks so it does not write the telemetry store or mission log twice
+    reloader_parent = DEBUG and APP_ROLE != 'producer' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+    
+    if IS_PRODUCER and not reloader_parent:
+        if MISSION_LOG_PATH:
+            mission_manager.log = MissionLog(MISSION_LOG_PATH)
+        
+        # Initialize demo data
+        init_demo_uavs()
+        init_geofences()
+        
+        # Start background update task
+        socketio.start_background_task(broadcast_updates)
+        
+        if bus:
+            socketio.start_background_task(RpcServer(bus, PRODUCER_OPS).serve)
+    elif not IS_PRODUCER and not reloader_parent:
+        rpc.start(socketio.start_background_task)
+        socketio.start_background_task(report_demand)
+        if VIDEO_ENABLED:
+            socketio.start_background_task(receive_frames)
     
-    # Start ORB streaming threads
-    start_orb_stream_threads()
+    if APP_ROLE == 'producer':
+        print(f"[BUS] Producer publishing to {MESSAGE_QUEUE}; start APP_ROLE=web workers to serve clients")
+        while True:
+            socketio.sleep(60)
     
     print("=" * 60)
     print(" MILITARY UAV COMMAND & CONTROL SYSTEM")
     print(" CLASSIFIED - AUTHORIZED PERSONNEL ONLY")
     print("=" * 60)
-    print(f" Access dashboard at: http://localhost:5000")
+    print(f" Access dashboard at: http://localhost:{PORT}")
+    print(f" Profile: {APP_PROFILE}" + (" (video loads on first stream subscribe)" if VIDEO_ENABLED else " (no video)"))
     print()
     print(" Demo Accounts:")
     print("   Commander: commander / password123")
@@ -372,4 +934,4 @@ if __name__ == '__main__':
     print("=" * 60)
     
     # Run Flask-SocketIO
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, debug=DEBUG, host='0.0.0.0', port=PORT, allow_unsafe_werkzeug=True)
\ No newline at end of file
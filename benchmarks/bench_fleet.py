@@ -0,0 +1,56 @@
+"""Compare simulator tick throughput: per-object UAV.update vs the NumPy fleet engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_fleet
+    python -m benchmarks.bench_fleet --sizes 10 1000 10000 --seconds 3
+"""
+import argparse
+import random
+import time
+
+from models.uav import UAVType
+from services.uav_simulator import UAVSimulator
+
+BASE_LAT = 12.8406
+BASE_LON = 80.1530
+
+
+def build_simulator(count: int, vectorized: bool) -> UAVSimulator:
+    """Create a simulator with `count` UAVs scattered around the demo base"""
+    simulator = UAVSimulator(vectorized=vectorized)
+    rng = random.Random(42)
+    for i in range(count):
+        uav_type = UAVType.QUADCOPTER if i % 2 else UAVType.FIXED_WING
+        simulator.add_uav(
+            f"SIM-{i:05d}", uav_type,
+            BASE_LAT + rng.uniform(-0.2, 0.2),
+            BASE_LON + rng.uniform(-0.2, 0.2),
+        )
+    return simulator
+
+
+def ticks_per_second(simulator: UAVSimulator, seconds: float) -> float:
+    simulator.update_all_uavs()  # warm-up
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        simulator.update_all_uavs()
+        ticks += 1
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--seconds', type=float, default=2.0, help='measurement time per case')
+    args = parser.parse_args()
+
+    print(f"{'UAVs':>8} {'object t/s':>12} {'vector t/s':>12} {'speedup':>9}")
+    for size in args.sizes:
+        obj = ticks_per_second(build_simulator(size, vectorized=False), args.seconds)
+        vec = ticks_per_second(build_simulator(size, vectorized=True), args.seconds)
+        print(f"{size:>8} {obj:>12.1f} {vec:>12.1f} {vec / obj:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Separation monitoring cost: grid-bucketed SeparationMonitor vs a naive all-pairs haversine scan.
+
+UAVs are scattered over the same ~44 x 44 km area as bench_fleet, so density
+(and the number of candidate pairs per UAV) grows with the fleet. The naive
+scan is NumPy-vectorized row by row but still O(n^2); it is skipped above
+--naive-max UAVs.
+
+Run from the repository root:
+    python -m benchmarks.bench_separation
+    python -m benchmarks.bench_separation --sizes 1000 10000 20000 --naive-max 5000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_fleet import build_simulator
+from benchmarks.harness import measure
+from services.deconfliction import SeparationMonitor
+
+EARTH_RADIUS = 6371000
+
+
+def naive_scan(monitor: SeparationMonitor, lat, lon, alt) -> int:
+    """Pairs inside both separation minima, found by comparing every UAV with every later one"""
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat_r)
+    found = 0
+    for i in range(len(lat) - 1):
+        dlat = lat_r[i + 1:] - lat_r[i]
+        dlon = lon_r[i + 1:] - lon_r[i]
+        a = np.sin(dlat / 2) ** 2 + cos_lat[i] * cos_lat[i + 1:] * np.sin(dlon / 2) ** 2
+        horizontal = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+        found += int(((horizontal < monitor.horizontal_m) &
+                      (np.abs(alt[i + 1:] - alt[i]) < monitor.vertical_m)).sum())
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--naive-max', type=int, default=10000, help='largest fleet to run the O(n^2) scan on')
+    parser.add_argument('--hz', type=float, default=2.0, help='separation tick rate the budget is taken from')
+    args = parser.parse_args()
+
+    budget = 1.0 / args.hz
+    print(f"{'UAVs':>7} {'candidates':>11} {'conflicts':>10} {'grid ms':>9} {'naive ms':>10} "
+          f"{'speedup':>8} {'% budget':>9}")
+    for size in args.sizes:
+        simulator = build_simulator(size, vectorized=True)
+        simulator.update_all_uavs(1.0)  # get everyone moving on their first leg
+        uavs, *kinematics = simulator.kinematics()
+        ids = [uav.id for uav in uavs]
+        monitor = SeparationMonitor()
+        grid = measure(lambda: monitor.check(ids, *kinematics))['median']
+        conflicts = len(monitor.latest)
+
+        naive = speedup = '-'
+        if size <= args.naive_max:
+            lat, lon, alt = kinematics[:3]
+            seconds = measure(lambda: naive_scan(monitor, lat, lon, alt), min_time=0, repeat=1)['median']
+            naive, speedup = f'{seconds * 1e3:.1f}', f'{seconds / grid:.0f}x'
+        print(f"{size:>7} {monitor.candidates:>11} {conflicts:>10} {grid * 1e3:>9.2f} {naive:>10} "
+              f"{speedup:>8} {grid / budget:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Cold start per APP_PROFILE: time from launching app.py to its first served request.
+
+Each run starts a fresh `python app.py` (no debug reloader, no telemetry store
+or mission log on disk) and polls until it answers. It reports:
+    listen     process start -> first HTTP response (GET /login)
+    api        first authenticated GET /api/uavs after that
+    rss        server resident memory once it is serving (needs psutil)
+    modules    whether OpenCV / the ORB pipeline were imported by then
+    first frame (full profile) first MJPEG frame of --stream, which includes
+               importing the video stack on that first subscribe
+
+Run from the repository root (needs benchmarks/requirements.txt):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --profiles telemetry --runs 10
+    python -m benchmarks.bench_startup --stream 1  # a stream whose clip exists
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+try:
+    import requests
+except ImportError:
+    sys.exit('[BENCH] Needs requests: pip install -r benchmarks/requirements.txt')
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROFILES = ('full', 'telemetry')
+PROBE = ("import sys, app; "
+         "print(int('cv2' in sys.modules), int('services.orb_pipeline' in sys.modules))")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_env(profile: str, port: int) -> Dict[str, str]:
+    return dict(os.environ, APP_PROFILE=profile, PORT=str(port), FLASK_DEBUG='0',
+                MISSION_LOG_PATH='', TELEMETRY_STORE_DIR='')
+
+
+def imported_modules(profile: str) -> str:
+    """Which heavy modules `import app` pulls in under this profile"""
+    out = subprocess.run([sys.executable, '-c', PROBE], env=server_env(profile, 0),
+                         capture_output=True, text=True, timeout=60).stdout.split()
+    cv2, orb = (out[-2:] if len(out) >= 2 else ['?', '?'])
+    return f"cv2={'yes' if cv2 == '1' else 'no'} orb={'yes' if orb == '1' else 'no'}"
+
+
+def first_frame(session: requests.Session, url: str, stream: int, timeout: float) -> Optional[float]:
+    """Seconds until the first MJPEG part arrives, or None"""
+    start = time.perf_counter()
+    try:
+        with session.get(f'{url}/video/{stream}.mjpg', stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                return None
+            for chunk in response.iter_content(chunk_size=4096):
+                if b'image/jpeg' in chunk:
+                    return time.perf_counter() - start
+                if time.perf_counter() - start > timeout:
+                    return None
+    except requests.RequestException:
+        return None
+    return None
+
+
+def cold_start(profile: str, stream: Optional[int], frame_timeout: float) -> Dict[str, Optional[float]]:
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'app.py'], env=server_env(profile, port),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        result = {'listen': None, 'api': None, 'rss_mb': None, 'frame': None}
+        session = requests.Session()
+        deadline = start + 60
+        while time.perf_counter() < deadline:
+            try:
+                if session.get(f'{url}/login', timeout=1).status_code == 200:
+                    result['listen'] = time.perf_counter() - start
+                    break
+            except requests.RequestException:
+                if server.poll() is not None:
+                    sys.exit(f'[BENCH] app.py exited during startup (APP_PROFILE={profile})')
+                time.sleep(0.01)
+        if result['listen'] is None:
+            sys.exit(f'[BENCH] app.py did not answer within 60 s (APP_PROFILE={profile})')
+
+        session.post(f'{url}/login', data={'username': 'commander', 'password': 'password123'}, timeout=10)
+        begin = time.perf_counter()
+        session.get(f'{url}/api/uavs', timeout=10).raise_for_status()
+        result['api'] = time.perf_counter() - begin
+        if psutil is not None:
+            result['rss_mb'] = psutil.Process(server.pid).memory_info().rss / 2 ** 20
+        if profile == 'full' and stream is not None:
+            result['frame'] = first_frame(session, url, stream, frame_timeout)
+        return result
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _median(values) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def _ms(value: Optional[float]) -> str:
+    return f'{value * 1000:.0f}' if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per profile (median reported)')
+    parser.add_argument('--stream', type=int, default=0, help='stream to time the first frame of (full profile)')
+    parser.add_argument('--no-frame', action='store_true', help='skip the first-frame measurement')
+    parser.add_argument('--frame-timeout', type=float, default=15.0)
+    args = parser.parse_args()
+
+    stream = None if args.no_frame else args.stream
+    print(f"{'profile':>10} {'listen ms':>10} {'api ms':>7} {'rss MB':>7} {'first frame ms':>15}  imported at boot")
+    for profile in args.profiles:
+        runs = [cold_start(profile, stream, args.frame_timeout) for _ in range(args.runs)]
+        rss = _median(r['rss_mb'] for r in runs)
+        print(f"{profile:>10} {_ms(_median(r['listen'] for r in runs)):>10} "
+              f"{_ms(_median(r['api'] for r in runs)):>7} {f'{rss:.0f}' if rss else '-':>7} "
+              f"{_ms(_median(r['frame'] for r in runs)) if profile == 'full' else 'n/a':>15}  "
+              f"{imported_modules(profile)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Measure wire bytes and encode CPU time per telemetry broadcast, for each wire format.
+
+Each tick the simulator is advanced by one simulated second, then the same
+fleet state is encoded as:
+    full      uav_update list, to_dict() + stdlib json (the legacy path)
+    delta     keyframe + delta, to_dict() + stdlib json (the default JSON path)
+    delta+fast keyframe + delta, encoded with wire_format.dumps (orjson if installed)
+    columnar  typed-array frame (set_wire_format 'columnar'); bytes include the JSON header
+
+Run from the repository root:
+    python -m benchmarks.bench_telemetry
+    python -m benchmarks.bench_telemetry --sizes 6 100 1000 --ticks 120 --vectorized
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_fleet import build_simulator
+from services.telemetry_stream import ColumnarTelemetry, TelemetryDeltaEncoder
+from services.wire_format import dumps, orjson
+
+FORMATS = ('full', 'delta', 'delta+fast', 'columnar')
+
+
+def measure(size: int, ticks: int, keyframe_interval: int, vectorized: bool = False):
+    """{format: (total bytes, total encode seconds)} over `ticks` broadcasts"""
+    simulator = build_simulator(size, vectorized=vectorized)
+    encoders = {'delta': TelemetryDeltaEncoder(keyframe_interval=keyframe_interval),
+                'delta+fast': TelemetryDeltaEncoder(keyframe_interval=keyframe_interval)}
+    columnar = ColumnarTelemetry()
+    totals = {name: [0, 0.0] for name in FORMATS}
+
+    def record(name, started, payload_bytes):
+        totals[name][0] += payload_bytes
+        totals[name][1] += time.perf_counter() - started
+
+    for _ in range(ticks):
+        simulator.update_all_uavs(1.0)  # one simulated second per tick
+
+        started = time.perf_counter()
+        record('full', started, len(json.dumps([uav.to_dict() for uav in simulator.uavs.values()])))
+
+        started = time.perf_counter()
+        _, payload = encoders['delta'].encode([uav.to_dict() for uav in simulator.uavs.values()])
+        record('delta', started, len(json.dumps(payload)))
+
+        started = time.perf_counter()
+        _, payload = encoders['delta+fast'].encode([uav.to_dict() for uav in simulator.uavs.values()])
+        record('delta+fast', started, len(dumps(payload)))
+
+        started = time.perf_counter()
+        frame = columnar.encode(simulator)
+        binary = {k: v for k, v in frame.items() if isinstance(v, bytes)}
+        header = dumps({k: v for k, v in frame.items() if k not in binary})
+        record('columnar', started, len(header) + sum(len(v) for v in binary.values()))
+
+    return {name: tuple(value) for name, value in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 100, 1000])
+    parser.add_argument('--ticks', type=int, default=120, help='broadcasts to encode per case')
+    parser.add_argument('--keyframe-interval', type=int, default=30)
+    parser.add_argument('--vectorized', action='store_true', help='use the NumPy fleet engine')
+    args = parser.parse_args()
+
+    print(f"fast JSON encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    print(f"{'UAVs':>6} {'format':>11} {'KB/tick':>9} {'encode/tick':>12} {'bytes vs full':>14} {'cpu vs full':>12}")
+    for size in args.sizes:
+        results = measure(size, args.ticks, args.keyframe_interval, args.vectorized)
+        full_bytes, full_seconds = results['full']
+        for name in FORMATS:
+            total_bytes, seconds = results[name]
+            print(f"{size:>6} {name:>11} {total_bytes / args.ticks / 1024:>9.2f} "
+                  f"{seconds / args.ticks * 1e6:>10.0f}us {full_bytes / total_bytes:>13.1f}x "
+                  f"{full_seconds / seconds:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
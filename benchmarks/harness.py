@@ -0,0 +1,99 @@
+"""Timing, result files and baseline comparison shared by the benchmark suite."""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def summarize(samples: Sequence[float], number: int = 1) -> Dict[str, float]:
+    """Seconds-per-op statistics from per-op samples"""
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': len(samples),
+        'number': number,
+    }
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """timeit-style: calibrate a loop count so each of `repeat` runs takes about min_time / repeat"""
+    fn()  # warm-up (lazy indexes, caches, first-call imports)
+    target = min_time / repeat
+    number = 1
+    while True:
+        elapsed = _run(fn, number)
+        if elapsed >= target or number >= 1 << 24:
+            break
+        number = max(number * 2, int(number * target / max(elapsed, 1e-9)))
+    samples = [_run(fn, number) / number for _ in range(repeat)]
+    return summarize(samples, number)
+
+
+def _run(fn: Callable[[], object], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def environment() -> Dict[str, Optional[str]]:
+    """Enough context to tell whether two result files are comparable"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': None,
+    }
+    for module in ('numpy', 'cv2'):
+        mod = sys.modules.get(module)
+        info[module] = getattr(mod, '__version__', None) if mod else None
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                        text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return info
+
+
+def write_results(path: str, results: Dict[str, Dict[str, float]]):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = 0.2) -> List[Dict]:
+    """Median ratio current / baseline per case; beyond +/- threshold is a regression / improvement"""
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        now, then = current.get(name), baseline.get(name)
+        if now is None or then is None:
+            rows.append({'name': name, 'status': 'new' if then is None else 'missing', 'ratio': None})
+            continue
+        ratio = now['median'] / then['median'] if then['median'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'status': status, 'ratio': ratio,
+                     'baseline': then['median'], 'current': now['median']})
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
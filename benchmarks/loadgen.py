@@ -0,0 +1,335 @@
+"""Socket.IO load generator: how many operator consoles can one server feed?
+
+Logs in through /login, then ramps up N Socket.IO clients that subscribe the
+way the dashboards do (all topics plus the four video streams, acking frames
+like static/js/video.js). For each step it reports end-to-end telemetry and
+frame latency percentiles, dropped frames (sequence gaps), late frames and
+the server's CPU and memory.
+
+Everything runs on one box; the generator shares CPU with the server, so
+keep an eye on its own load when reading results at high N.
+
+Run from the repository root (needs benchmarks/requirements.txt):
+    python -m benchmarks.loadgen --spawn --clients 1 10 50 100 --duration 20
+    python -m benchmarks.loadgen --spawn --async-mode eventlet --no-video --clients 100 500 1000
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --server-pid 1234 --no-video
+    python -m benchmarks.loadgen --url http://127.0.0.1:5001 http://127.0.0.1:5002 --clients 100 200
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import engineio
+    import requests
+    import socketio
+except ImportError:
+    sys.exit('[LOAD] Needs python-socketio[client]: pip install -r benchmarks/requirements.txt')
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class StepStats:
+    """Counters for one ramp step, shared by every client thread"""
+
+    def __init__(self, late_after: float):
+        self.late_after = late_after
+        self.telemetry_latency: List[float] = []
+        self.frame_latency: List[float] = []
+        self.frames = 0
+        self.frame_bytes = 0
+        self.dropped = 0
+        self.late = 0
+        self.telemetry = 0
+        self.telemetry_gaps = 0
+        self.disconnects = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def on_telemetry(self, latency: float, gap: bool):
+        with self._lock:
+            self.telemetry += 1
+            self.telemetry_latency.append(latency)
+            self.telemetry_gaps += gap
+
+    def on_frame(self, latency: float, size: int, dropped: int):
+        with self._lock:
+            self.frames += 1
+            self.frame_bytes += size
+            self.frame_latency.append(latency)
+            self.dropped += dropped
+            self.late += latency > self.late_after
+
+    def on_disconnect(self):
+        with self._lock:
+            self.disconnects += 1
+
+    def report(self, clients: int, server: Dict[str, Optional[float]]) -> Dict:
+        elapsed = time.time() - self.started
+        return {
+            'clients': clients,
+            'seconds': elapsed,
+            'telemetry_msgs_per_s': self.telemetry / elapsed,
+            'telemetry_latency_ms': _percentiles(self.telemetry_latency),
+            'telemetry_gaps': self.telemetry_gaps,
+            'frames_per_s': self.frames / elapsed,
+            'frame_mbit_per_s': self.frame_bytes * 8 / elapsed / 1e6,
+            'frame_latency_ms': _percentiles(self.frame_latency),
+            'frames_dropped': self.dropped,
+            'frames_late': self.late,
+            'disconnects': self.disconnects,
+            'server': server,
+        }
+
+
+def _percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': ordered[-1] * 1000}
+
+
+class OrderedEngineIOClient(engineio.Client):
+    """Handles incoming messages on the read thread, in arrival order.
+
+    The stock client hands each message to a new thread, so a binary
+    attachment can be processed before its header packet and the frame is
+    lost with a decode error.
+    """
+
+    def _trigger_event(self, event, *args, **kwargs):
+        kwargs['run_async'] = False
+        return super()._trigger_event(event, *args, **kwargs)
+
+
+class OrderedClient(socketio.Client):
+    def _engineio_client_class(self):
+        return OrderedEngineIOClient
+
+
+class ConsoleClient:
+    """One simulated operator console"""
+
+    def __init__(self, url: str, cookie: str, streams: List[int], ack_interval: float = 1.0):
+        self.url = url
+        self.cookie = cookie
+        self.streams = streams
+        self.ack_interval = ack_interval
+        self.stats: Optional[StepStats] = None
+        self.telemetry_seq: Optional[int] = None
+        self.frame_seq: Dict[tuple, int] = {}
+        self.last_ack = 0.0
+
+        self.sio = OrderedClient(reconnection=False)
+        self.sio.on('telemetry_keyframe', self._on_telemetry)
+        self.sio.on('telemetry_delta', self._on_telemetry)
+        self.sio.on('frame', self._on_frame)
+        self.sio.on('disconnect', lambda: self.stats and self.stats.on_disconnect())
+
+    def connect(self):
+        self.sio.connect(self.url, headers={'Cookie': f'session={self.cookie}'}, transports=['websocket'], wait_timeout=10)
+        if self.streams:
+            self.sio.emit('subscribe', {'streams': self.streams})
+
+    def close(self):
+        self.stats = None
+        if self.streams:
+            # stop frames first so the disconnect does not cut a binary packet in half
+            self.sio.emit('unsubscribe', {'streams': self.streams})
+            time.sleep(0.5)
+        self.sio.disconnect()
+
+    def _on_telemetry(self, payload):
+        now = time.time()
+        seq = payload.get('seq')
+        gap = self.telemetry_seq is not None and 'path_points' not in payload and seq != self.telemetry_seq + 1
+        self.telemetry_seq = seq
+        if self.stats and 'ts' in payload:
+            self.stats.on_telemetry(now - payload['ts'], gap)
+
+    def _on_frame(self, payload):
+        now = time.time()
+        key = (payload.get('id'), payload.get('tier'))
+        seq = payload.get('seq')
+        previous = self.frame_seq.get(key)
+        self.frame_seq[key] = seq
+        dropped = max(0, seq - previous - 1) if previous is not None and seq is not None else 0
+        if self.stats and 'ts' in payload:
+            self.stats.on_frame(now - payload['ts'], len(payload.get('image') or b''), dropped)
+        if now - self.last_ack >= self.ack_interval and 'ts' in payload:
+            self.last_ack = now
+            self.sio.emit('frame_ack', {'ts': payload['ts']})
+
+
+class ServerSampler:
+    """CPU% and RSS of the server process tree (worker processes included), sampled once a second"""
+
+    def __init__(self, pid: Optional[int]):
+        self.process = psutil.Process(pid) if pid and psutil else None
+        self.cpu: List[float] = []
+        self.rss: List[int] = []
+        self._known: Dict[int, 'psutil.Process'] = {}
+        self._stop = threading.Event()
+
+    def _tree(self):
+        """Server plus children, reusing Process objects so cpu_percent has a previous sample"""
+        try:
+            current = [self.process] + self.process.children(recursive=True)
+        except psutil.Error:
+            return []
+        tree = []
+        for proc in current:
+            if proc.pid not in self._known:
+                self._known[proc.pid] = proc
+                proc.cpu_percent(None)  # prime; the first call always returns 0
+            tree.append(self._known[proc.pid])
+        return tree
+
+    def run(self):
+        if self.process is None:
+            return
+        self._tree()
+        while not self._stop.wait(1.0):
+            cpu = rss = 0
+            for proc in self._tree():
+                try:
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.cpu.append(cpu)
+            self.rss.append(rss)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        self._stop.set()
+        if not self.cpu:
+            return {'cpu_percent': None, 'rss_mb': None}
+        return {'cpu_percent': statistics.fmean(self.cpu), 'rss_mb': max(self.rss) / 2 ** 20}
+
+
+def login(url: str, username: str, password: str) -> str:
+    response = requests.post(f'{url}/login', data={'username': username, 'password': password},
+                             allow_redirects=False, timeout=10)
+    cookie = response.cookies.get('session')
+    if response.status_code != 302 or not cookie:
+        sys.exit(f'[LOAD] Login failed for {username} ({response.status_code})')
+    return cookie
+
+
+def spawn_server(url: str, async_mode: str) -> subprocess.Popen:
+    """Start app.py without the debug reloader and wait until it accepts connections"""
+    parsed = urlparse(url)
+    env = dict(os.environ, PORT=str(parsed.port or 5000), FLASK_DEBUG='0', SOCKETIO_ASYNC_MODE=async_mode)
+    server = subprocess.Popen([sys.executable, 'app.py'], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((parsed.hostname, parsed.port or 5000), timeout=1):
+                return server
+        except OSError:
+            if server.poll() is not None:
+                sys.exit('[LOAD] app.py exited during startup')
+            time.sleep(0.5)
+    server.terminate()
+    sys.exit('[LOAD] app.py did not start listening within 60 s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', nargs='+', default=['http://127.0.0.1:5000'],
+                        help='server URL(s); clients are spread round-robin over web workers')
+    parser.add_argument('--spawn', action='store_true', help='start app.py locally for the run')
+    parser.add_argument('--async-mode', default='threading', choices=['threading', 'eventlet', 'gevent'],
+                        help='SOCKETIO_ASYNC_MODE for --spawn')
+    parser.add_argument('--server-pid', type=int, help='measure an already running server')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 50], help='cumulative ramp steps')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds measured per step')
+    parser.add_argument('--streams', type=int, nargs='+', default=[0, 1, 2, 3])
+    parser.add_argument('--no-video', action='store_true', help='telemetry-only consoles')
+    parser.add_argument('--late-ms', type=float, default=250.0, help='frames slower than this count as late')
+    parser.add_argument('--user', default='commander')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--out', help='write step reports as JSON')
+    args = parser.parse_args()
+
+    server = spawn_server(args.url[0], args.async_mode) if args.spawn else None
+    pid = server.pid if server else args.server_pid
+    if pid and psutil is None:
+        print('[LOAD] psutil not installed; server CPU/memory will not be reported')
+
+    streams = [] if args.no_video else args.streams
+    clients: List[ConsoleClient] = []
+    reports = []
+    try:
+        cookie = login(args.url[0], args.user, args.password)  # the session cookie is valid on every worker
+        print(f"{'clients':>7} {'tel p50/p99 ms':>15} {'frame p50/p99 ms':>17} {'fps':>7} "
+              f"{'Mbit/s':>7} {'dropped':>8} {'late':>6} {'cpu %':>6} {'rss MB':>7}")
+        for target in args.clients:
+            while len(clients) < target:
+                client = ConsoleClient(args.url[len(clients) % len(args.url)], cookie, streams)
+                client.connect()
+                clients.append(client)
+            time.sleep(2.0)  # let keyframes and tier placement settle
+
+            stats = StepStats(args.late_ms / 1000.0)
+            for client in clients:
+                client.stats = stats
+            sampler = ServerSampler(pid)
+            sampler.start()
+            time.sleep(args.duration)
+            report = stats.report(len(clients), sampler.stop())
+            reports.append(report)
+
+            tel, frame, srv = report['telemetry_latency_ms'], report['frame_latency_ms'], report['server']
+            print(f"{len(clients):>7} {_pair(tel):>15} {_pair(frame):>17} {report['frames_per_s']:>7.1f} "
+                  f"{report['frame_mbit_per_s']:>7.1f} {report['frames_dropped']:>8} {report['frames_late']:>6} "
+                  f"{_num(srv['cpu_percent']):>6} {_num(srv['rss_mb']):>7}")
+    finally:
+        closers = [threading.Thread(target=_close_quietly, args=(client,)) for client in clients]
+        for t in closers:
+            t.start()
+        for t in closers:
+            t.join(10)
+        if server:
+            server.terminate()
+            server.wait(10)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f'[LOAD] Wrote {args.out}')
+
+
+def _close_quietly(client: ConsoleClient):
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+def _pair(p: Dict[str, Optional[float]]) -> str:
+    return f"{_num(p['p50'])}/{_num(p['p99'])}"
+
+
+def _num(value: Optional[float]) -> str:
+    return '-' if value is None else f'{value:.0f}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Headless benchmark suite: simulator, geofencing, separation, serialization, telemetry store, mission log and video.
+
+Every case reports seconds per operation (median of several calibrated runs).
+Results can be written as JSON and compared against a stored baseline; the
+exit status is 1 when any case is slower than the baseline by more than
+--threshold.
+
+Run from the repository root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --quick --groups geofence video
+    python -m benchmarks.suite --out results.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_fleet import BASE_LAT, BASE_LON, build_simulator
+from benchmarks.harness import compare, format_seconds, load_results, measure, summarize, write_results
+
+GROUPS = ('simulator', 'geofence', 'separation', 'serialization', 'store', 'log', 'video')
+VIDEO_GLOB = 'static/videos/*.mp4'
+
+
+def bench_simulator(quick: bool):
+    sizes = [10, 100, 1000] if quick else [10, 100, 1000, 10000]
+    for size in sizes:
+        simulator = build_simulator(size, vectorized=False)
+        uav = next(iter(simulator.uavs.values()))
+        yield f'simulator/uav_update[fleet={size}]', measure(uav.update)
+        yield f'simulator/update_all_uavs[fleet={size},engine=object]', measure(simulator.update_all_uavs)
+        vectorized = build_simulator(size, vectorized=True)
+        yield f'simulator/update_all_uavs[fleet={size},engine=vectorized]', measure(vectorized.update_all_uavs)
+
+
+def _polygon(rng: random.Random, vertices: int):
+    """Jittered regular polygon a few hundred metres across, somewhere near the base"""
+    lat0 = BASE_LAT + rng.uniform(-0.1, 0.1)
+    lon0 = BASE_LON + rng.uniform(-0.1, 0.1)
+    radius = rng.uniform(0.002, 0.006)
+    return [[lat0 + radius * rng.uniform(0.7, 1.0) * math.sin(2 * math.pi * k / vertices),
+             lon0 + radius * rng.uniform(0.7, 1.0) * math.cos(2 * math.pi * k / vertices)]
+            for k in range(vertices)]
+
+
+def bench_geofence(quick: bool):
+    from services.geofence_manager import GeofenceManager
+
+    counts = [1, 10, 100] if quick else [1, 10, 100, 1000]
+    vertex_counts = [4, 32] if quick else [4, 32, 256]
+    rng = random.Random(7)
+    points = [(BASE_LAT + rng.uniform(-0.1, 0.1), BASE_LON + rng.uniform(-0.1, 0.1)) for _ in range(1000)]
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+
+    for count in counts:
+        for vertices in vertex_counts:
+            manager = GeofenceManager()
+            for i in range(count):
+                manager.add_geofence(f'NFZ-{i:04d}', f'Zone {i}', _polygon(rng, vertices))
+
+            def check_points():
+                for lat, lon in points:
+                    manager.check_violation(lat, lon)
+
+            stats = measure(check_points)
+            yield f'geofence/check_violation[fences={count},vertices={vertices}]', _per(stats, len(points))
+            stats = measure(lambda: manager.check_fleet(lats, lons))
+            yield f'geofence/check_fleet[fences={count},vertices={vertices}]', _per(stats, len(points))
+
+
+def bench_separation(quick: bool):
+    from services.deconfliction import SeparationMonitor
+
+    sizes = [100, 1000] if quick else [100, 1000, 10000]
+    for size in sizes:
+        simulator = build_simulator(size, vectorized=True)
+        simulator.update_all_uavs(1.0)
+        uavs, *kinematics = simulator.kinematics()
+        ids = [uav.id for uav in uavs]
+        monitor = SeparationMonitor()
+        yield f'separation/check[fleet={size}]', measure(lambda: monitor.check(ids, *kinematics))
+
+
+def bench_serialization(quick: bool):
+    from services.mission_manager import MissionManager
+
+    simulator = build_simulator(1, vectorized=False)
+    uav = next(iter(simulator.uavs.values()))
+    for _ in range(300):  # fill the track history
+        uav.update(1.0)
+    yield 'serialization/uav_to_dict[path=100]', measure(uav.to_dict)
+    yield 'serialization/uav_to_dict[path=100,zoom=15]', measure(lambda: uav.to_dict(zoom=15))
+    yield 'serialization/uav_to_dict_json[path=100]', measure(lambda: json.dumps(uav.to_dict()))
+
+    for count in ([3, 100] if quick else [3, 100, 1000]):
+        manager = MissionManager()
+        for i in range(len(manager.missions), count):
+            manager.create_mission(f'Mission {i}', 'benchmark', [f'SIM-{i % 50:05d}'], 'bench')
+        yield f'serialization/get_all_missions[missions={count}]', measure(manager.get_all_missions)
+
+
+def bench_store(quick: bool):
+    import numpy as np
+    from services.telemetry_store import RECORD_DTYPE, TelemetryStore
+
+    fleet = 10 if quick else 50
+    day0 = int(time.time()) // 86400 * 86400 - 86400
+    with tempfile.TemporaryDirectory() as root:
+        store = TelemetryStore(os.path.join(root, 'history'))
+        for i in range(fleet):  # one day at 1 Hz per UAV
+            rows = np.zeros(86400, RECORD_DTYPE)
+            rows['ts'] = day0 + np.arange(86400)
+            rows['lat'] = BASE_LAT + np.cumsum(np.full(86400, 1e-6))
+            rows['lon'] = BASE_LON
+            store.extend(f'SIM-{i:05d}', rows)
+
+        yield 'store/track_query[span=1d,max_points=1000]', \
+            measure(lambda: store.query('SIM-00000', day0, day0 + 86400, 1000))
+        yield 'store/track_query[span=1h,max_points=100]', \
+            measure(lambda: store.query('SIM-00000', day0 + 43200, day0 + 46800, 100))
+
+        def fleet_day():
+            for i in range(fleet):
+                store.query(f'SIM-{i:05d}', day0, day0 + 86400, 500)
+        yield f'store/fleet_track_query[fleet={fleet},span=1d,max_points=500]', measure(fleet_day)
+
+        live = TelemetryStore(os.path.join(root, 'live'))
+        simulator = build_simulator(100, vectorized=False)
+        uavs = list(simulator.uavs.values())
+        yield 'store/append_fleet[fleet=100]', measure(lambda: live.append_fleet(uavs))
+
+
+def bench_log(quick: bool):
+    from services.mission_log import MissionLog
+
+    size = 100_000 if quick else 1_000_000
+    users = ['Commander Alpha', 'Operator Bravo', 'Analyst Charlie']
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'mission_log.jsonl')
+        log = MissionLog(path)
+        start = time.time() - size
+        for i in range(size):
+            log.append(f"Command 'rtb' sent to SIM-{i % 500:05d}", 'warning' if i % 97 == 0 else 'info',
+                       users[i % 3], [f'SIM-{i % 500:05d}'], ts=start + i)
+        log.close()
+
+        started = time.perf_counter()
+        log = MissionLog(path)
+        yield f'log/reopen_index[entries={size}]', summarize([time.perf_counter() - started])
+        yield f'log/append[entries={size}]', measure(lambda: log.append('benchmark', user='bench', uav_ids=['SIM-00001']))
+        yield f'log/query_newest[entries={size}]', measure(lambda: log.query(limit=50))
+        yield f'log/query_uav_deep[entries={size}]', \
+            measure(lambda: log.query(uav_id='SIM-00007', cursor=size // 2, limit=50))
+        yield f'log/query_user_level[entries={size}]', \
+            measure(lambda: log.query(user='Analyst Charlie', level='warning', cursor=size // 2, limit=50))
+        yield f'log/query_time_window[entries={size}]', \
+            measure(lambda: log.query(since=start + size // 3, until=start + size // 3 + 600, limit=50))
+        log.close()
+
+
+def bench_video(quick: bool):
+    import cv2
+    from services.frame_cache import FrameCache
+    from services.orb_pipeline import (create_orb_extractor, detect_keypoints, draw_keypoints, encode_jpeg,
+                                       resize_frame, to_gray)
+    from services.stream_config import DEFAULT_TIERS
+
+    frames = 30 if quick else 120
+    clips = sorted(glob.glob(VIDEO_GLOB))
+    if not clips:
+        print(f'[BENCH] No clips match {VIDEO_GLOB}, skipping video group', file=sys.stderr)
+        return
+
+    for path in clips:
+        clip = os.path.splitext(os.path.basename(path))[0]
+        cap = cv2.VideoCapture(path)
+        orb = create_orb_extractor(0)
+        stages = {name: [] for name in ('read', 'resize', 'gray', 'orb', 'draw')}
+        stages.update({f'encode_{tier.name}': [] for tier in DEFAULT_TIERS})
+
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            t1 = time.perf_counter()
+            frame = resize_frame(frame, DEFAULT_TIERS[0].max_width)
+            t2 = time.perf_counter()
+            gray = to_gray(frame)
+            t3 = time.perf_counter()
+            keypoints, _ = detect_keypoints(orb, gray, 0)
+            t4 = time.perf_counter()
+            annotated = draw_keypoints(frame, keypoints)
+            t5 = time.perf_counter()
+            for name, seconds in zip(('read', 'resize', 'gray', 'orb', 'draw'),
+                                     (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+                stages[name].append(seconds)
+            for tier in DEFAULT_TIERS:
+                t6 = time.perf_counter()
+                encode_jpeg(resize_frame(annotated, tier.max_width), tier.jpeg_quality)
+                stages[f'encode_{tier.name}'].append(time.perf_counter() - t6)
+        cap.release()
+
+        for name, samples in stages.items():
+            if samples:
+                yield f'video/{name}[clip={clip}]', summarize(samples)
+
+        if not quick:  # priming the cache takes a whole loop of the clip
+            for label, cache in (('off', None), ('on', FrameCache(1 << 30))):
+                yield f'video/loop_frame[clip={clip},cache={label}]', summarize(_loop_frames(path, cache, frames))
+
+
+class _StopStream(BaseException):
+    """Raised from on_frame to end run_stream (which catches Exception)"""
+
+
+def _loop_frames(path: str, cache, frames: int):
+    """Seconds per emitted frame through run_stream, unpaced, on the clip's second loop"""
+    from services.orb_pipeline import StreamSettings, run_stream
+
+    samples, state = [], {'last': None, 'loop': 0, 'at': None}
+
+    def on_frame(stream_id, encoded, meta):
+        now = time.perf_counter()
+        if state['last'] is not None and meta['frame'] < state['last']:
+            state['loop'] += 1
+        elif state['loop'] == 1 and state['at'] is not None:
+            samples.append(now - state['at'])
+        state['last'], state['at'] = meta['frame'], now
+        if len(samples) >= frames:
+            raise _StopStream
+
+    try:
+        run_stream(0, path, StreamSettings(), on_frame, sleep=lambda seconds: None, cache=cache)
+    except _StopStream:
+        pass
+    return samples
+
+
+BENCHES = {
+    'simulator': bench_simulator,
+    'geofence': bench_geofence,
+    'separation': bench_separation,
+    'serialization': bench_serialization,
+    'store': bench_store,
+    'log': bench_log,
+    'video': bench_video,
+}
+
+
+def _per(stats, n: int):
+    """Rescale whole-batch timings to per-item timings"""
+    scaled = {k: v / n for k, v in stats.items() if k in ('median', 'min', 'mean', 'stdev')}
+    return {**stats, **scaled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for CI smoke runs')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown vs baseline (0.2 = 20%%)')
+    parser.add_argument('--save-baseline', help='also write results JSON here as the new baseline')
+    args = parser.parse_args()
+
+    results = {}
+    for group in args.groups:
+        for name, stats in BENCHES[group](args.quick):
+            results[name] = stats
+            print(f'{name:<70} {format_seconds(stats["median"]):>12}')
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            write_results(path, results)
+            print(f'[BENCH] Wrote {path}')
+
+    if args.baseline:
+        baseline = {name: stats for name, stats in load_results(args.baseline).items()
+                    if name.split('/', 1)[0] in args.groups}
+        rows = compare(results, baseline, args.threshold)
+        regressions = [r for r in rows if r['status'] == 'regression']
+        print(f'\n{"case":<70} {"ratio":>7}  status')
+        for row in rows:
+            ratio = f'{row["ratio"]:.2f}x' if row['ratio'] is not None else '-'
+            print(f'{row["name"]:<70} {ratio:>7}  {row["status"]}')
+        if regressions:
+            print(f'[BENCH] {len(regressions)} regression(s) beyond {args.threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+from array import array
+from typing import Iterator, List, Optional, Tuple
+import math
+
+EARTH_RADIUS = 6371000
+WEB_MERCATOR_M_PER_PX = 156543.03392  # metres per pixel at zoom 0 on the equator
+
+class TrackBuffer:
+    """Fixed-capacity ring of (lat, lon) float64 pairs.
+
+    Storage holds 2 * capacity slots and every point is written twice
+    (slot k and k + capacity), so the latest n points are always one
+    contiguous slice: append is O(1) and window() never copies.
+    """
+
+    def __init__(self, capacity: int = 200, storage=None):
+        self.capacity = capacity
+        if storage is None:
+            storage = array('d', bytes(8 * 4 * capacity))
+        self._data = memoryview(storage).cast('B').cast('d')
+        self._head = 0   # next slot to write, in [0, capacity)
+        self._count = 0
+        self.total = 0   # points ever appended
+
+    @classmethod
+    def over(cls, storage, capacity: int, head: int, count: int, total: int) -> 'TrackBuffer':
+        """Wrap externally managed mirrored storage (e.g. a FleetEngine row)"""
+        buffer = cls(capacity, storage)
+        buffer._head = head
+        buffer._count = count
+        buffer.total = total
+        return buffer
+
+    @property
+    def head(self) -> int:
+        return self._head
+
+    def append(self, lat: float, lon: float):
+        i = 2 * self._head
+        j = i + 2 * self.capacity
+        data = self._data
+        data[i] = data[j] = lat
+        data[i + 1] = data[j + 1] = lon
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.total += 1
+
+    def window(self, n: Optional[int] = None) -> memoryview:
+        """Zero-copy flat view [lat0, lon0, lat1, lon1, ...] of the latest n points"""
+        n = self._count if n is None else max(0, min(n, self._count))
+        start = self._head - n
+        if start < 0:
+            start += self.capacity
+        return self._data[2 * start:2 * (start + n)]
+
+    def tolist(self, n: Optional[int] = None) -> List[List[float]]:
+        """Latest n points as [[lat, lon], ...] ready for JSON"""
+        flat = self.window(n).tolist()
+        return [flat[i:i + 2] for i in range(0, len(flat), 2)]
+
+    def simplified(self, tolerance: float, n: Optional[int] = None) -> List[List[float]]:
+        """Douglas-Peucker simplification of the latest n points (tolerance in metres)"""
+        points = self.tolist(n)
+        if len(points) < 3 or tolerance <= 0:
+            return points
+
+        xy = _project(points)
+        keep = [False] * len(points)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(points) - 1)]
+        while stack:
+            first, last = stack.pop()
+            index, max_dist = 0, 0.0
+            for i in range(first + 1, last):
+                dist = _segment_distance(xy[i], xy[first], xy[last])
+                if dist > max_dist:
+                    index, max_dist = i, dist
+            if max_dist > tolerance:
+                keep[index] = True
+                stack.append((first, index))
+                stack.append((index, last))
+
+        return [p for p, k in zip(points, keep) if k]
+
+    def decimated(self, min_distance: float, n: Optional[int] = None) -> List[List[float]]:
+        """Drop points closer than min_distance metres to the last kept point"""
+        points = self.tolist(n)
+        if len(points) < 3 or min_distance <= 0:
+            return points
+
+        xy = _project(points)
+        result = [points[0]]
+        last = xy[0]
+        for point, p in zip(points[1:-1], xy[1:-1]):
+            if math.hypot(p[0] - last[0], p[1] - last[1]) >= min_distance:
+                result.append(point)
+                last = p
+        result.append(points[-1])
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        flat = self.window().tolist()
+        return iter(list(zip(flat[0::2], flat[1::2])))
+
+    def __getitem__(self, index):
+        points = list(self)
+        return points[index]
+
+def tolerance_for_zoom(zoom: float, lat: float, pixels: float = 1.0) -> float:
+    """Ground distance in metres covered by `pixels` screen pixels at a web map zoom level"""
+    return pixels * WEB_MERCATOR_M_PER_PX * math.cos(math.radians(lat)) / (2 ** zoom)
+
+def _project(points: List[List[float]]) -> List[Tuple[float, float]]:
+    """Local equirectangular projection to metres around the first point"""
+    lat0 = math.radians(points[0][0])
+    kx = math.cos(lat0) * math.pi * EARTH_RADIUS / 180
+    ky = math.pi * EARTH_RADIUS / 180
+    return [(lon * kx, lat * ky) for lat, lon in points]
+
+def _segment_distance(p, a, b) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
@@ -1,10 +1,15 @@
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional
 import time
 import math
 import random
 
+from models.track_buffer import TrackBuffer, tolerance_for_zoom
+
+PATH_HISTORY_LEN = 200
+PATH_SAMPLE_SECONDS = 1.0  # one path point per simulated second, whatever the physics rate
+
 class UAVType(Enum):
     QUADCOPTER = "quadcopter"
     FIXED_WING = "fixed_wing"
@@ -57,7 +62,9 @@ class UAV:
         # Mission data
         self.waypoints: List[Waypoint] = []
         self.current_waypoint_index = 0
-        self.path_history: List[Tuple[float, float]] = [(home_lat, home_lon)]
+        self.path_history = TrackBuffer(PATH_HISTORY_LEN)
+        self.path_history.append(home_lat, home_lon)
+        self.path_age = 0.0
         
         # Enhanced sensors
         self.sensors = {
@@ -110,12 +117,14 @@ class UAV:
         
         self.mission_status = MissionStatus.EN_ROUTE
     
-    def update(self):
+    def update(self, dt: Optional[float] = None):
+        """Advance by `dt` seconds (fixed-step scheduler), or by the wall time since the last update"""
         if self.paused or self.mission_status == MissionStatus.EMERGENCY:
             return
         
         current_time = time.time()
-        dt = current_time - self.last_update
+        if dt is None:
+            dt = current_time - self.last_update
         self.last_update = current_time
         self.last_contact = current_time
         
@@ -172,7 +181,7 @@ class UAV:
             self.current_speed = 0
             self.current_waypoint_index = 0
             # Generate new mission after brief pause
-            if random.random() < 0.1:  # 10% chance per update
+            if random.random() < 0.1 * dt:  # 10% chance per second
                 self._generate_mission()
             return
         
@@ -181,7 +190,7 @@ class UAV:
     def _loiter(self, dt: float):
         self.current_speed = self.max_speed * 0.3
         # Simple circular loiter pattern
-        self.heading = (self.heading + 2) % 360
+        self.heading = (self.heading + 2 * dt) % 360
     
     def _move_towards_target(self, target_lat: float, target_lon: float, target_alt: float, dt: float):
         self.heading = self._calculate_bearing(self.lat, self.lon, target_lat, target_lon)
@@ -205,12 +214,13 @@ class UAV:
         
         # Gradual altitude adjustment
         alt_diff = target_alt - self.altitude
-        self.altitude += alt_diff * 0.05
+        self.altitude += alt_diff * (1 - 0.95 ** dt)
         
         # Update path history
-        self.path_history.append((self.lat, self.lon))
-        if len(self.path_history) > 200:
-            self.path_history.pop(0)
+        self.path_age += dt
+        if self.path_age >= PATH_SAMPLE_SECONDS - 1e-9:
+            self.path_age = 0.0
+            self.path_history.append(self.lat, self.lon)
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         R = 6371000
@@ -257,7 +267,13 @@ class UAV:
         self.mission_status = MissionStatus.RTB
         self.current_waypoint_index = 0
     
-    def to_dict(self) -> dict:
+    def path_points(self, limit: int = 100, zoom: Optional[float] = None) -> List[List[float]]:
+        """Latest track points, simplified to roughly one pixel at a map zoom level"""
+        if zoom is None:
+            return self.path_history.tolist(limit)
+        return self.path_history.simplified(tolerance_for_zoom(zoom, self.lat), limit)
+    
+    def to_dict(self, path_limit: int = 100, zoom: Optional[float] = None) -> dict:
         return {
             'id': self.id,
             'type': self.type.value,
@@ -278,7 +294,7 @@ class UAV:
             'sensors': self.sensors,
             'home_lat': self.home_lat,
             'home_lon': self.home_lon,
-            'path_history': self.path_history[-100:],
+            'path_history': self.path_points(path_limit, zoom),
             'waypoints': [(wp.lat, wp.lon) for wp in self.waypoints],
             'current_waypoint': self.current_waypoint_index
         }
@@ -0,0 +1,258 @@
+import itertools
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Battery thresholds (%); an alert clears only once the level is back above threshold + BATTERY_HYSTERESIS
+BATTERY_LOW = 20.0
+BATTERY_CRITICAL = 10.0
+BATTERY_HYSTERESIS = 5.0
+
+# A forecast breach is imminent (high severity) this many seconds out; it clears once the
+# predicted entry is gone or further than BREACH_CLEAR_FACTOR x the warning window
+BREACH_IMMINENT_SECONDS = 30.0
+BREACH_CLEAR_FACTOR = 1.5
+
+SEPARATION_KINDS = ('near_miss', 'loss_of_separation')
+
+
+class Alert:
+    """One active condition of one UAV, or of a pair for separation alerts;
+    `key` is '<type>:<uav_id>', or 'separation:<uav_id>:<other_id>' for a pair"""
+
+    def __init__(self, kind: str, uav_id: str, severity: str, now: float, fence_ids: Sequence[str] = (),
+                 other_id: Optional[str] = None):
+        self.kind = kind
+        self.uav_id = uav_id
+        self.other_id = other_id
+        self.severity = severity
+        self.fence_ids = list(fence_ids)
+        self.since = now
+        self.notified = now
+        self.clear_started: Optional[float] = None
+        self.battery = None
+        self.forecast: Optional[Dict] = None
+        self.conflict: Optional[Dict] = None
+
+    @property
+    def key(self) -> str:
+        if self.other_id is not None:
+            return f'separation:{self.uav_id}:{self.other_id}'
+        return f'{self.kind}:{self.uav_id}'
+
+    def message(self, state: str) -> str:
+        if self.kind in SEPARATION_KINDS:
+            pair = f'{self.uav_id} and {self.other_id}'
+            if state == 'cleared':
+                return f'{pair} separated'
+            c = self.conflict
+            if self.kind == 'loss_of_separation':
+                return f'Loss of separation: {pair} {c["horizontal_m"]:.0f} m apart, {c["vertical_m"]:.0f} m vertically'
+            return f'Near miss predicted: {pair} within {c["cpa_m"]:.0f} m in {c["cpa_seconds"]:.0f}s'
+        if self.kind == 'breach_forecast':
+            if state == 'cleared':
+                return f'{self.uav_id} no longer on course for restricted airspace'
+            eta = self.forecast['eta_seconds']
+            when = f'in {eta:.0f}s' if eta is not None else f'{self.forecast["distance_m"]:.0f} m ahead'
+            return f'{self.uav_id} predicted to enter {self.forecast["fence_name"]} ({self.fence_ids[0]}) {when}'
+        if self.kind == 'geofence_violation':
+            if state == 'cleared':
+                return f'{self.uav_id} has left restricted airspace'
+            return f'{self.uav_id} has violated restricted airspace ({", ".join(self.fence_ids)})'
+        if state == 'cleared':
+            return f'{self.uav_id} battery recovered: {self.battery:.1f}%'
+        level = 'critically low' if self.severity == 'high' else 'low'
+        return f'{self.uav_id} battery {level}: {self.battery:.1f}%'
+
+    def to_dict(self, state: str, now: float) -> Dict:
+        alert = {
+            'id': self.key,
+            'type': self.kind,
+            'state': state,
+            'uav_id': self.uav_id,
+            'message': self.message(state),
+            'severity': 'info' if state == 'cleared' else self.severity,
+            'since': datetime.fromtimestamp(self.since).isoformat(),
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+        }
+        if self.kind in ('geofence_violation', 'breach_forecast'):
+            alert['fence_ids'] = self.fence_ids
+        if self.kind == 'breach_forecast' and state != 'cleared':
+            alert['eta_seconds'] = self.forecast['eta_seconds']
+            alert['distance_m'] = self.forecast['distance_m']
+            alert['breach_point'] = [self.forecast['lat'], self.forecast['lon']]
+        if self.other_id is not None:
+            alert['uav_ids'] = [self.uav_id, self.other_id]
+            if state != 'cleared':
+                alert.update({k: self.conflict[k] for k in ('horizontal_m', 'vertical_m', 'cpa_m', 'cpa_seconds')})
+        return alert
+
+
+class AlertEngine:
+    """Per-UAV alert state; evaluate() returns only transitions.
+
+    A condition is reported when it is raised, when it escalates (more
+    fences, or battery from low to critical), and when it clears, plus a
+    reminder every `renotify_seconds` while it stays active (0 disables).
+    Clearing needs hysteresis: battery must recover past the threshold by
+    BATTERY_HYSTERESIS, and a UAV must stay outside every fence for
+    `clear_after` seconds, so a UAV hovering on a boundary does not flap.
+    Alert traffic therefore follows events rather than fleet size x time.
+
+    With forecasts from BreachForecaster, a 'breach_forecast' alert is
+    raised once a predicted fence entry is within `breach_warning_seconds`,
+    escalated when it becomes imminent, updated when another fence becomes
+    the first one on the route without raising the severity, and cleared
+    when the route no longer leads into a fence in time.
+
+    evaluate_separation() does the same for UAV pairs from
+    SeparationMonitor: a near miss escalates to loss of separation, and a
+    pair clears after `clear_after` seconds without a conflict.
+    """
+
+    def __init__(self, renotify_seconds: float = 60.0, clear_after: float = 3.0,
+                 breach_warning_seconds: float = 120.0):
+        self.renotify_seconds = renotify_seconds
+        self.clear_after = clear_after
+        self.breach_warning_seconds = breach_warning_seconds
+        self._active: Dict[str, Alert] = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, uavs: Iterable, violations: Sequence[Sequence[str]],
+                 now: Optional[float] = None, forecasts: Optional[Sequence[Optional[Dict]]] = None) -> List[Dict]:
+        """uavs, their fence ids from GeofenceManager.check_fleet and (optionally) their
+        next breaches from BreachForecaster.forecast_fleet -> alert transitions"""
+        now = time.time() if now is None else now
+        events = []
+        seen = set()
+        if forecasts is None:
+            forecasts = itertools.repeat(None)
+        with self._lock:
+            for uav, fence_ids, forecast in zip(uavs, violations, forecasts):
+                seen.add(uav.id)
+                self._geofence(uav.id, fence_ids, now, events)
+                self._battery(uav.id, uav.battery_level, now, events)
+                self._forecast(uav.id, forecast, now, events)
+            # UAVs that left the fleet take their alerts with them
+            for key, alert in list(self._active.items()):
+                if alert.uav_id not in seen or (alert.other_id is not None and alert.other_id not in seen):
+                    del self._active[key]
+                    events.append(alert.to_dict('cleared', now))
+            if self.renotify_seconds:
+                for alert in self._active.values():
+                    if now - alert.notified >= self.renotify_seconds and alert.clear_started is None:
+                        alert.notified = now
+                        events.append(alert.to_dict('renotify', now))
+        return events
+
+    def evaluate_separation(self, conflicts: Sequence[Dict], now: Optional[float] = None) -> List[Dict]:
+        """Conflicting pairs from SeparationMonitor.check -> alert transitions"""
+        now = time.time() if now is None else now
+        events = []
+        current = set()
+        with self._lock:
+            for conflict in conflicts:
+                first, second = conflict['uav_ids']
+                key = f'separation:{first}:{second}'
+                current.add(key)
+                kind = conflict['type']
+                severity = 'high' if kind == 'loss_of_separation' else 'medium'
+                alert = self._active.get(key)
+                if alert is None:
+                    alert = self._active[key] = Alert(kind, first, severity, now, other_id=second)
+                    alert.conflict = conflict
+                    events.append(alert.to_dict('raised', now))
+                    continue
+                alert.conflict = conflict
+                alert.clear_started = None
+                if kind == 'loss_of_separation' and alert.kind == 'near_miss':
+                    alert.kind, alert.severity = kind, severity
+                    alert.notified = now
+                    events.append(alert.to_dict('escalated', now))
+            for key, alert in list(self._active.items()):
+                if alert.other_id is None or key in current:
+                    continue
+                if alert.clear_started is None:
+                    alert.clear_started = now
+                elif now - alert.clear_started >= self.clear_after:
+                    del self._active[key]
+                    events.append(alert.to_dict('cleared', now))
+        return events
+
+    def _geofence(self, uav_id: str, fence_ids: Sequence[str], now: float, events: List[Dict]):
+        key = f'geofence_violation:{uav_id}'
+        alert = self._active.get(key)
+        if fence_ids:
+            if alert is None:
+                alert = self._active[key] = Alert('geofence_violation', uav_id, 'high', now, fence_ids)
+                events.append(alert.to_dict('raised', now))
+                return
+            alert.clear_started = None
+            new = [f for f in fence_ids if f not in alert.fence_ids]
+            alert.fence_ids = list(fence_ids)
+            if new:
+                alert.notified = now
+                events.append(alert.to_dict('escalated', now))
+        elif alert is not None:
+            if alert.clear_started is None:
+                alert.clear_started = now
+            elif now - alert.clear_started >= self.clear_after:
+                del self._active[key]
+                events.append(alert.to_dict('cleared', now))
+
+    def _battery(self, uav_id: str, battery: float, now: float, events: List[Dict]):
+        key = f'low_battery:{uav_id}'
+        alert = self._active.get(key)
+        if alert is None:
+            if battery < BATTERY_LOW:
+                alert = self._active[key] = Alert('low_battery', uav_id,
+                                                  'high' if battery < BATTERY_CRITICAL else 'medium', now)
+                alert.battery = battery
+                events.append(alert.to_dict('raised', now))
+            return
+        alert.battery = battery
+        if battery >= BATTERY_LOW + BATTERY_HYSTERESIS:
+            del self._active[key]
+            events.append(alert.to_dict('cleared', now))
+        elif alert.severity == 'medium' and battery < BATTERY_CRITICAL:
+            alert.severity = 'high'
+            alert.notified = now
+            events.append(alert.to_dict('escalated', now))
+        elif alert.severity == 'high' and battery >= BATTERY_CRITICAL + BATTERY_HYSTERESIS:
+            alert.severity = 'medium'  # de-escalate quietly; it is still active
+
+    def _forecast(self, uav_id: str, forecast: Optional[Dict], now: float, events: List[Dict]):
+        key = f'breach_forecast:{uav_id}'
+        alert = self._active.get(key)
+        eta = forecast['eta_seconds'] if forecast is not None else None
+        if alert is None:
+            if eta is not None and eta <= self.breach_warning_seconds:
+                severity = 'high' if eta <= BREACH_IMMINENT_SECONDS else 'medium'
+                alert = self._active[key] = Alert('breach_forecast', uav_id, severity, now, [forecast['fence_id']])
+                alert.forecast = forecast
+                events.append(alert.to_dict('raised', now))
+            return
+        if eta is None or eta > self.breach_warning_seconds * BREACH_CLEAR_FACTOR:
+            del self._active[key]
+            events.append(alert.to_dict('cleared', now))
+            return
+        alert.forecast = forecast
+        severity = 'high' if eta <= BREACH_IMMINENT_SECONDS else 'medium'
+        if severity == 'high' and alert.severity != 'high':
+            state = 'escalated'
+        elif forecast['fence_id'] != alert.fence_ids[0]:
+            state = 'updated'  # another fence is now first on the route, possibly further away
+        else:
+            return  # same fence; an imminent alert stays high until it clears
+        alert.fence_ids = [forecast['fence_id']]
+        alert.severity = severity
+        alert.notified = now
+        events.append(alert.to_dict(state, now))
+
+    def active(self) -> List[Dict]:
+        """Snapshot of every active alert, oldest first, for newly connected clients"""
+        now = time.time()
+        with self._lock:
+            alerts = sorted(self._active.values(), key=lambda a: a.since)
+            return [alert.to_dict('active', now) for alert in alerts]
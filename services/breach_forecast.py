@@ -0,0 +1,134 @@
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.uav import MissionStatus
+from services.geofence_manager import GeofenceManager
+
+EARTH_RADIUS_M = 6371000
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance, same as UAV._calculate_distance"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat = p2 - p1
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+class Route:
+    """Fence entries along one UAV's remaining route, computed when the route was planned.
+
+    Breach positions are kept as route distance past the first target
+    (negative while still on the first leg), so the distance to go only
+    needs the UAV's distance to that target: one haversine per tick.
+    """
+
+    __slots__ = ('key', 'fence_version', 'target', 'breaches')
+
+    def __init__(self, key: Tuple, fence_version: int, target: Tuple[float, float],
+                 breaches: List[Tuple[float, str, str, float, float]]):
+        self.key = key
+        self.fence_version = fence_version
+        self.target = target
+        self.breaches = breaches  # (offset_m, fence_id, fence_name, lat, lon), in route order
+
+
+class BreachForecaster:
+    """Predicts when each UAV will enter a geofence along its planned route.
+
+    The route is the straight legs the simulator flies: from the current
+    position through the remaining waypoints and home, or straight home when
+    returning. Every leg is intersected with the fences the grid index finds
+    along it, giving the entry points in route order. That work is cached
+    per UAV and redone only when its route (status, waypoint list, waypoint
+    index) or the fence set changes; in between, forecast() just subtracts
+    the distance flown.
+    """
+
+    def __init__(self, geofences: GeofenceManager):
+        self.geofences = geofences
+        self._routes: Dict[str, Route] = {}
+        self._lock = threading.Lock()
+        self.recomputes = 0
+        self.latest: List[Dict] = []  # every non-empty forecast of the last forecast_fleet()
+
+    @staticmethod
+    def _route_key(uav) -> Optional[Tuple]:
+        status = uav.mission_status
+        if status == MissionStatus.EN_ROUTE and uav.current_waypoint_index < len(uav.waypoints):
+            return status, tuple(uav.waypoints), uav.current_waypoint_index
+        if status in (MissionStatus.EN_ROUTE, MissionStatus.RETURNING, MissionStatus.RTB):
+            return MissionStatus.RETURNING, uav.home_lat, uav.home_lon  # heading home
+        return None  # idle, loitering, paused or down: not going anywhere
+
+    @staticmethod
+    def _legs(uav) -> List[Tuple[float, float]]:
+        points = [(uav.lat, uav.lon)]
+        if uav.mission_status == MissionStatus.EN_ROUTE:
+            points += [(wp.lat, wp.lon) for wp in uav.waypoints[uav.current_waypoint_index:]]
+        points.append((uav.home_lat, uav.home_lon))
+        return points
+
+    def _plan(self, uav, key: Tuple, fence_version: int) -> Route:
+        points = self._legs(uav)
+        index = self.geofences.index
+        breaches = []
+        travelled = 0.0  # route distance from the start to the current leg's start
+        for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+            length = distance_m(lat1, lon1, lat2, lon2)
+            for fence in index.candidates_along(lat1, lon1, lat2, lon2):
+                if not fence.active:
+                    continue
+                for t in fence.segment_entries(lat1, lon1, lat2, lon2):
+                    breaches.append((travelled + t * length, fence.id, fence.name,
+                                     lat1 + t * (lat2 - lat1), lon1 + t * (lon2 - lon1)))
+            travelled += length
+        breaches.sort()
+        first_leg = distance_m(*points[0], *points[1])
+        self.recomputes += 1
+        return Route(key, fence_version, points[1],
+                     [(breach[0] - first_leg,) + breach[1:] for breach in breaches])
+
+    def forecast(self, uav) -> Optional[Dict]:
+        """Next fence entry on the UAV's route as {fence_id, fence_name, distance_m, eta_seconds, lat, lon}"""
+        key = self._route_key(uav)
+        if key is None:
+            self._routes.pop(uav.id, None)
+            return None
+        fence_version = self.geofences.version
+        route = self._routes.get(uav.id)
+        if route is None or route.key != key or route.fence_version != fence_version:
+            route = self._routes[uav.id] = self._plan(uav, key, fence_version)
+        if not route.breaches:
+            return None
+
+        to_target = distance_m(uav.lat, uav.lon, *route.target)
+        for offset, fence_id, fence_name, lat, lon in route.breaches:
+            remaining = to_target + offset
+            if remaining > 0:  # entries already behind the UAV are skipped
+                speed = uav.current_speed or uav.max_speed * 0.8
+                return {
+                    'uav_id': uav.id,
+                    'fence_id': fence_id,
+                    'fence_name': fence_name,
+                    'distance_m': round(remaining, 1),
+                    'eta_seconds': round(remaining / speed, 1) if speed > 0 else None,
+                    'lat': round(lat, 6),
+                    'lon': round(lon, 6),
+                }
+        return None
+
+    def forecast_fleet(self, uavs: Iterable) -> List[Optional[Dict]]:
+        """forecast() for each UAV, in order; routes of UAVs no longer present are dropped"""
+        with self._lock:
+            uavs = list(uavs)
+            results = [self.forecast(uav) for uav in uavs]
+            if len(self._routes) > len(uavs):
+                present = {uav.id for uav in uavs}
+                for uav_id in [u for u in self._routes if u not in present]:
+                    del self._routes[uav_id]
+            self.latest = sorted((f for f in results if f is not None),
+                                 key=lambda f: f['distance_m'] if f['eta_seconds'] is None else f['eta_seconds'])
+            return results
@@ -0,0 +1,136 @@
+import math
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+METRES_PER_DEG = 111000  # same flat-earth scale the simulator moves by
+
+# Loss of separation: closer than both minima right now
+SEPARATION_HORIZONTAL_M = 150.0
+SEPARATION_VERTICAL_M = 30.0
+# Near miss: still separated, but the closest point of approach within LOOKAHEAD_SECONDS breaks the horizontal minimum
+LOOKAHEAD_SECONDS = 20.0
+# Pairs further apart than this are not examined; it is also the grid cell size
+SEARCH_RANGE_M = 1500.0
+
+_KEY_BASE = 1 << 20  # per-axis cell index range packed into one int64 key
+
+
+class SeparationMonitor:
+    """Airframe-to-airframe separation check over a uniform 3-D grid.
+
+    UAVs are bucketed into cells SEARCH_RANGE_M wide horizontally and one
+    vertical minimum tall (altitude bands), so any pair that can conflict
+    sits in the same or an adjacent cell. Cells are found by sorting the
+    packed cell keys once and binary-searching the 13 forward neighbour
+    offsets plus the cell itself, which yields every candidate pair exactly
+    once without an n x n scan. Candidates are then filtered exactly and
+    given a closest-point-of-approach estimate from speed and heading
+    (constant velocity, horizontal plane; climbs are not modelled).
+    """
+
+    def __init__(self, horizontal_m: float = SEPARATION_HORIZONTAL_M, vertical_m: float = SEPARATION_VERTICAL_M,
+                 lookahead: float = LOOKAHEAD_SECONDS, search_range_m: float = SEARCH_RANGE_M):
+        self.horizontal_m = horizontal_m
+        self.vertical_m = vertical_m
+        self.lookahead = lookahead
+        self.search_range_m = max(search_range_m, horizontal_m)
+        self.latest: List[Dict] = []
+        self.candidates = 0  # candidate pairs examined by the last check()
+
+        offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+        forward = [o for o in offsets if o > (0, 0, 0)]  # one of each +/- pair
+        self._offsets = [dx * _KEY_BASE * _KEY_BASE + dy * _KEY_BASE + dz for dx, dy, dz in forward]
+
+    def _project(self, lat, lon):
+        """Local east/north metres around the fleet's mean latitude"""
+        lat0 = float(lat.mean())
+        x = (lon - float(lon.mean())) * METRES_PER_DEG * math.cos(math.radians(lat0))
+        y = (lat - lat0) * METRES_PER_DEG
+        return x, y
+
+    def _keys(self, x, y, alt):
+        ix = np.floor(x / self.search_range_m).astype(np.int64)
+        iy = np.floor(y / self.search_range_m).astype(np.int64)
+        iz = np.floor(alt / self.vertical_m).astype(np.int64)
+        # shift so every index (and its -1 neighbour) is positive inside its 20-bit field
+        ix -= ix.min() - 1
+        iy -= iy.min() - 1
+        iz -= iz.min() - 1
+        return (ix * _KEY_BASE + iy) * _KEY_BASE + iz
+
+    @staticmethod
+    def _ranges(lo, hi):
+        """Flattened (row, position) pairs for the half-open ranges lo[row]:hi[row]"""
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        rows = np.repeat(np.arange(len(lo)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return rows, np.arange(total) + starts
+
+    def candidate_pairs(self, keys):
+        """(a, b) index arrays of every pair in the same or a neighbouring cell, each pair once"""
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        n = len(keys)
+        position = np.arange(n)
+        firsts, seconds = [], []
+        # same cell: everything after this UAV up to the end of its run
+        hi = np.searchsorted(sorted_keys, sorted_keys, side='right')
+        rows, cols = self._ranges(position + 1, hi)
+        firsts.append(rows)
+        seconds.append(cols)
+        for offset in self._offsets:
+            target = sorted_keys + offset
+            lo = np.searchsorted(sorted_keys, target, side='left')
+            hi = np.searchsorted(sorted_keys, target, side='right')
+            rows, cols = self._ranges(lo, hi)
+            firsts.append(rows)
+            seconds.append(cols)
+        return order[np.concatenate(firsts)], order[np.concatenate(seconds)]
+
+    def check(self, ids: Sequence[str], lat, lon, alt, speed, heading, moving) -> List[Dict]:
+        """Conflicting pairs as {type, uav_ids, horizontal_m, vertical_m, cpa_m, cpa_seconds}, closest first"""
+        lat = np.asarray(lat, dtype=np.float64)
+        if len(lat) < 2:
+            self.latest = []
+            self.candidates = 0
+            return []
+        lon = np.asarray(lon, dtype=np.float64)
+        alt = np.asarray(alt, dtype=np.float64)
+        x, y = self._project(lat, lon)
+        a, b = self.candidate_pairs(self._keys(x, y, alt))
+        self.candidates = len(a)
+
+        rx, ry = x[b] - x[a], y[b] - y[a]
+        vertical = np.abs(alt[b] - alt[a])
+        horizontal = np.hypot(rx, ry)
+        near = (vertical < self.vertical_m) & (horizontal < self.search_range_m)
+        a, b, rx, ry, vertical, horizontal = a[near], b[near], rx[near], ry[near], vertical[near], horizontal[near]
+
+        # Only UAVs flying a leg hold a heading; loitering/idle/paused ones are treated as stationary
+        speed = np.where(np.asarray(moving, dtype=bool), np.asarray(speed, dtype=np.float64), 0.0)
+        heading = np.radians(np.asarray(heading, dtype=np.float64))
+        vx, vy = speed * np.sin(heading), speed * np.cos(heading)
+        wx, wy = vx[b] - vx[a], vy[b] - vy[a]
+        closing = wx * wx + wy * wy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(closing > 0, -(rx * wx + ry * wy) / closing, 0.0)
+        t = np.clip(t, 0.0, self.lookahead)
+        cpa = np.hypot(rx + wx * t, ry + wy * t)
+
+        lost = horizontal < self.horizontal_m
+        conflict = lost | (cpa < self.horizontal_m)
+        conflicts = []
+        for k in np.flatnonzero(conflict)[np.argsort(cpa[conflict], kind='stable')].tolist():
+            first, second = sorted((ids[a[k]], ids[b[k]]))
+            conflicts.append({
+                'type': 'loss_of_separation' if lost[k] else 'near_miss',
+                'uav_ids': [first, second],
+                'horizontal_m': round(float(horizontal[k]), 1),
+                'vertical_m': round(float(vertical[k]), 1),
+                'cpa_m': round(float(cpa[k]), 1),
+                'cpa_seconds': round(float(t[k]), 1),
+            })
+        self.latest = conflicts
+        return conflicts
@@ -0,0 +1,369 @@
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from models.uav import UAV, UAVType, MissionStatus, PATH_HISTORY_LEN, PATH_SAMPLE_SECONDS
+from models.track_buffer import TrackBuffer
+
+# Integer codes for the enum/string state kept in the arrays
+STATUS_CODES = list(MissionStatus)
+STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+THREAT_LEVELS = ["green", "yellow", "red"]
+THREAT_INDEX = {level: code for code, level in enumerate(THREAT_LEVELS)}
+
+IDLE = STATUS_INDEX[MissionStatus.IDLE]
+EN_ROUTE = STATUS_INDEX[MissionStatus.EN_ROUTE]
+LOITERING = STATUS_INDEX[MissionStatus.LOITERING]
+RETURNING = STATUS_INDEX[MissionStatus.RETURNING]
+EMERGENCY = STATUS_INDEX[MissionStatus.EMERGENCY]
+RTB = STATUS_INDEX[MissionStatus.RTB]
+
+HISTORY_LEN = PATH_HISTORY_LEN
+EARTH_RADIUS = 6371000
+ARRIVAL_THRESHOLD = 50  # metres, same as UAV._move_to_waypoint
+
+
+def _row_property(array_name: str, cast):
+    """Expose one row of an engine array as an attribute of a UAVView"""
+    def fget(self):
+        return cast(getattr(self._engine, array_name)[self._index])
+
+    def fset(self, value):
+        getattr(self._engine, array_name)[self._index] = value
+
+    return property(fget, fset)
+
+
+class UAVView(UAV):
+    """Thin UAV facade whose mutable state lives in a FleetEngine row.
+
+    Static metadata (id, model, sensors, waypoints list) stays on the object;
+    everything the tick touches is read from and written to the engine arrays,
+    so the inherited pause/resume/kill/return_to_base/to_dict keep working.
+    """
+
+    lat = _row_property('lat', float)
+    lon = _row_property('lon', float)
+    altitude = _row_property('alt', float)
+    heading = _row_property('heading', float)
+    current_speed = _row_property('speed', float)
+    max_speed = _row_property('max_speed', float)
+    battery_level = _row_property('battery', float)
+    fuel_level = _row_property('fuel', float)
+    paused = _row_property('paused', bool)
+    current_waypoint_index = _row_property('wp_index', int)
+    last_contact = _row_property('last_contact', float)
+    last_update = _row_property('last_update', float)
+    path_age = _row_property('path_age', float)
+
+    def __init__(self, engine: 'FleetEngine', index: int, uav: UAV):
+        self._engine = engine
+        self._index = index
+        self.id = uav.id
+        self.type = uav.type
+        self.model = uav.model
+        self.home_lat = uav.home_lat
+        self.home_lon = uav.home_lon
+        self.payload_status = uav.payload_status
+        self.communication_status = uav.communication_status
+        self.sensors = uav.sensors
+        self.waypoints = uav.waypoints
+
+    @property
+    def mission_status(self) -> MissionStatus:
+        return STATUS_CODES[self._engine.status[self._index]]
+
+    @mission_status.setter
+    def mission_status(self, status: MissionStatus):
+        self._engine.status[self._index] = STATUS_INDEX[status]
+
+    @property
+    def threat_level(self) -> str:
+        return THREAT_LEVELS[self._engine.threat[self._index]]
+
+    @threat_level.setter
+    def threat_level(self, level: str):
+        self._engine.threat[self._index] = THREAT_INDEX[level]
+
+    @property
+    def path_history(self) -> TrackBuffer:
+        return self._engine.path_history(self._index)
+
+    def update(self, dt: Optional[float] = None):
+        self._engine.step(np.array([self._index]), dt=dt)
+
+    def _generate_mission(self):
+        super()._generate_mission()
+        self._engine.load_waypoints(self._index, self.waypoints)
+
+
+class FleetEngine:
+    """Struct-of-arrays store that steps a whole fleet in one batched update.
+
+    Mirrors UAV.update exactly, but every haversine, bearing and movement
+    calculation runs as a NumPy expression over all active rows at once.
+    """
+
+    _FIELDS = {
+        'lat': np.float64, 'lon': np.float64, 'alt': np.float64,
+        'heading': np.float64, 'speed': np.float64, 'max_speed': np.float64,
+        'battery': np.float64, 'fuel': np.float64,
+        'status': np.int8, 'threat': np.int8, 'paused': np.bool_, 'is_quad': np.bool_,
+        'wp_index': np.int32, 'wp_count': np.int32,
+        'home_lat': np.float64, 'home_lon': np.float64, 'home_alt': np.float64,
+        'last_update': np.float64, 'last_contact': np.float64, 'path_age': np.float64,
+        'hist_head': np.int32, 'hist_len': np.int32, 'hist_total': np.int64,
+    }
+    _MATRICES = {
+        'wp_lat': np.float64, 'wp_lon': np.float64, 'wp_alt': np.float64,
+    }
+
+    def __init__(self, capacity: int = 64, max_waypoints: int = 12):
+        self.size = 0
+        self.capacity = 0
+        self.max_waypoints = max_waypoints
+        self.views: List[UAVView] = []
+        self._resize(max(capacity, 1))
+
+    def _resize(self, capacity: int, max_waypoints: Optional[int] = None):
+        max_waypoints = max_waypoints or self.max_waypoints
+        n = self.size
+        for name, dtype in self._FIELDS.items():
+            arr = np.zeros(capacity, dtype=dtype)
+            if n:
+                arr[:n] = getattr(self, name)[:n]
+            setattr(self, name, arr)
+        for name, dtype in self._MATRICES.items():
+            arr = np.zeros((capacity, max_waypoints), dtype=dtype)
+            if n:
+                arr[:n, :self.max_waypoints] = getattr(self, name)[:n]
+            setattr(self, name, arr)
+        # Mirrored track rings laid out the way TrackBuffer expects
+        hist = np.zeros((capacity, 2 * HISTORY_LEN, 2), dtype=np.float64)
+        if n:
+            hist[:n] = self.hist[:n]
+        self.hist = hist
+        self.capacity = capacity
+        self.max_waypoints = max_waypoints
+
+    def add(self, uav: UAV) -> UAVView:
+        """Copy a freshly built UAV into the arrays and return its view"""
+        if self.size == self.capacity:
+            self._resize(self.capacity * 2)
+        i = self.size
+        self.size += 1
+
+        self.lat[i] = uav.lat
+        self.lon[i] = uav.lon
+        self.alt[i] = uav.altitude
+        self.heading[i] = uav.heading
+        self.speed[i] = uav.current_speed
+        self.max_speed[i] = uav.max_speed
+        self.battery[i] = uav.battery_level
+        self.fuel[i] = uav.fuel_level
+        self.status[i] = STATUS_INDEX[uav.mission_status]
+        self.threat[i] = THREAT_INDEX[uav.threat_level]
+        self.paused[i] = uav.paused
+        self.is_quad[i] = uav.type == UAVType.QUADCOPTER
+        self.wp_index[i] = uav.current_waypoint_index
+        self.home_lat[i] = uav.home_lat
+        self.home_lon[i] = uav.home_lon
+        self.home_alt[i] = uav._get_default_altitude()
+        self.last_update[i] = uav.last_update
+        self.last_contact[i] = uav.last_contact
+        self.path_age[i] = uav.path_age
+
+        self.hist[i] = 0
+        self.hist_head[i] = self.hist_len[i] = self.hist_total[i] = 0
+        track = self.path_history(i)
+        for lat, lon in uav.path_history:
+            track.append(lat, lon)
+        self._store_track(i, track)
+
+        view = UAVView(self, i, uav)
+        self.views.append(view)
+        self.load_waypoints(i, uav.waypoints)
+        return view
+
+    def remove(self, view: UAVView):
+        """Drop a row by moving the last row into its slot"""
+        i = view._index
+        last = self.size - 1
+        if i != last:
+            for name in list(self._FIELDS) + list(self._MATRICES) + ['hist']:
+                arr = getattr(self, name)
+                arr[i] = arr[last]
+            moved = self.views[last]
+            moved._index = i
+            self.views[i] = moved
+        self.views.pop()
+        self.size -= 1
+
+    def load_waypoints(self, i: int, waypoints):
+        if len(waypoints) > self.max_waypoints:
+            self._resize(self.capacity, len(waypoints))
+        self.wp_count[i] = len(waypoints)
+        for j, wp in enumerate(waypoints):
+            self.wp_lat[i, j] = wp.lat
+            self.wp_lon[i, j] = wp.lon
+            self.wp_alt[i, j] = wp.altitude
+
+    def path_history(self, i: int) -> TrackBuffer:
+        """Zero-copy TrackBuffer over row i of the track storage"""
+        return TrackBuffer.over(self.hist[i], HISTORY_LEN, int(self.hist_head[i]),
+                                int(self.hist_len[i]), int(self.hist_total[i]))
+
+    def _store_track(self, i: int, track: TrackBuffer):
+        self.hist_head[i] = track.head
+        self.hist_len[i] = len(track)
+        self.hist_total[i] = track.total
+
+    def kinematics(self):
+        """(views, lat, lon, alt, speed, heading, moving) arrays over the active rows"""
+        n = self.size
+        status = self.status[:n]
+        moving = (status == EN_ROUTE) | (status == RETURNING) | (status == RTB)
+        return (self.views[:n], self.lat[:n], self.lon[:n], self.alt[:n],
+                self.speed[:n], self.heading[:n], moving)
+
+    def step(self, rows: Optional[np.ndarray] = None, now: Optional[float] = None, dt: Optional[float] = None):
+        """Advance every (or the given) UAV by `dt` seconds, or by the time since each one's last update"""
+        if self.size == 0:
+            return
+        now = time.time() if now is None else now
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+
+        rows = rows[~self.paused[rows] & (self.status[rows] != EMERGENCY)]
+        if rows.size == 0:
+            return
+
+        step = dt
+        dt = np.zeros(self.size)
+        dt[rows] = now - self.last_update[rows] if step is None else step
+        self.last_update[rows] = now
+        self.last_contact[rows] = now
+
+        # Battery and fuel
+        moving = self.speed[rows] > 0
+        self.battery[rows] = np.maximum(0, self.battery[rows] - np.where(moving, 0.15, 0.03) * dt[rows])
+        fuel = self.fuel[rows]
+        burn = np.where(moving, 0.1, 0.02) * dt[rows]
+        fuel = np.where(fuel > 0, np.maximum(0, fuel - burn), fuel)
+        self.fuel[rows] = fuel
+
+        # Emergency conditions
+        battery = self.battery[rows]
+        emergency = (battery < 15) | ((fuel > 0) & (fuel < 10))
+        stricken = rows[emergency]
+        self.status[stricken] = EMERGENCY
+        self.threat[stricken] = THREAT_INDEX["red"]
+        self.speed[stricken] = 0
+
+        rows = rows[~emergency]
+        self.threat[rows] = np.where(battery[~emergency] < 30, THREAT_INDEX["yellow"], THREAT_INDEX["green"])
+
+        status = self.status[rows]
+        self._step_en_route(rows[status == EN_ROUTE], dt)
+        self._step_returning(rows[(status == RETURNING) | (status == RTB)], dt)
+
+        loiter = rows[status == LOITERING]
+        self.speed[loiter] = self.max_speed[loiter] * 0.3
+        self.heading[loiter] = (self.heading[loiter] + 2 * dt[loiter]) % 360
+
+    def _step_en_route(self, rows: np.ndarray, dt: np.ndarray):
+        finished = self.wp_index[rows] >= self.wp_count[rows]
+        self.status[rows[finished]] = RETURNING
+        rows = rows[~finished]
+        if rows.size == 0:
+            return
+
+        wp = self.wp_index[rows]
+        target_lat = self.wp_lat[rows, wp]
+        target_lon = self.wp_lon[rows, wp]
+        target_alt = self.wp_alt[rows, wp]
+        distance = haversine(self.lat[rows], self.lon[rows], target_lat, target_lon)
+
+        arrived = distance < ARRIVAL_THRESHOLD
+        reached = rows[arrived]
+        self.wp_index[reached] += 1
+        self.status[reached[self.wp_index[reached] >= self.wp_count[reached]]] = RETURNING
+
+        flying = ~arrived
+        self._move_towards(rows[flying], target_lat[flying], target_lon[flying], target_alt[flying], dt)
+
+    def _step_returning(self, rows: np.ndarray, dt: np.ndarray):
+        if rows.size == 0:
+            return
+        distance = haversine(self.lat[rows], self.lon[rows], self.home_lat[rows], self.home_lon[rows])
+
+        arrived = distance < ARRIVAL_THRESHOLD
+        home = rows[arrived]
+        self.status[home] = IDLE
+        self.speed[home] = 0
+        self.wp_index[home] = 0
+        # Generate new mission after brief pause (rare, so done per object)
+        for i in home.tolist():
+            if random.random() < 0.1 * dt[i]:
+                self.views[i]._generate_mission()
+
+        flying = rows[~arrived]
+        self._move_towards(flying, self.home_lat[flying], self.home_lon[flying], self.home_alt[flying], dt)
+
+    def _move_towards(self, rows: np.ndarray, target_lat, target_lon, target_alt, dt: np.ndarray):
+        if rows.size == 0:
+            return
+        lat = self.lat[rows]
+        lon = self.lon[rows]
+        heading = bearing(lat, lon, target_lat, target_lon)
+        speed = self.max_speed[rows] * np.where(self.is_quad[rows], 0.8, 0.9)
+
+        distance_to_move = speed * dt[rows]
+        bearing_rad = np.radians(heading)
+        lat_new = lat + distance_to_move * np.cos(bearing_rad) / 111000
+        lon_new = lon + distance_to_move * np.sin(bearing_rad) / (111000 * np.cos(np.radians(lat)))
+
+        self.heading[rows] = heading
+        self.speed[rows] = speed
+        self.lat[rows] = lat_new
+        self.lon[rows] = lon_new
+        self.alt[rows] += (target_alt - self.alt[rows]) * (1 - 0.95 ** dt[rows])
+
+        # Append to the per-row track ring (both mirrored slots), once per PATH_SAMPLE_SECONDS
+        self.path_age[rows] += dt[rows]
+        rows = rows[self.path_age[rows] >= PATH_SAMPLE_SECONDS - 1e-9]
+        self.path_age[rows] = 0.0
+        lat_new = self.lat[rows]
+        lon_new = self.lon[rows]
+        head = self.hist_head[rows]
+        for slot in (head, head + HISTORY_LEN):
+            self.hist[rows, slot, 0] = lat_new
+            self.hist[rows, slot, 1] = lon_new
+        self.hist_head[rows] = (head + 1) % HISTORY_LEN
+        self.hist_len[rows] = np.minimum(self.hist_len[rows] + 1, HISTORY_LEN)
+        self.hist_total[rows] += 1
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in metres"""
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lat = lat2_rad - lat1_rad
+    delta_lon = np.radians(lon2 - lon1)
+
+    a = (np.sin(delta_lat / 2) ** 2 +
+         np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon / 2) ** 2)
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearing(lat1, lon1, lat2, lon2):
+    """Vectorized initial bearing in degrees [0, 360)"""
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lon = np.radians(lon2 - lon1)
+
+    y = np.sin(delta_lon) * np.cos(lat2_rad)
+    x = (np.cos(lat1_rad) * np.sin(lat2_rad) -
+         np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(delta_lon))
+    return (np.degrees(np.arctan2(y, x)) + 360) % 360
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+# Per-process caches by byte cap; every stream in a process (threads mode, or one worker) shares one
+_shared: Dict[int, 'FrameCache'] = {}
+_shared_lock = threading.Lock()
+
+
+class CachedFrame:
+    """Pipeline output for one source frame: JPEG per tier plus keypoint count and packed features"""
+
+    __slots__ = ('encoded', 'keypoints', 'features', 'size')
+
+    def __init__(self, encoded: Dict[str, bytes], keypoints: int, features: Optional[bytes]):
+        self.encoded = encoded
+        self.keypoints = keypoints
+        self.features = features
+        self.size = sum(len(jpeg) for jpeg in encoded.values()) + len(features or b'')
+
+
+class FrameCache:
+    """Byte-capped LRU of processed frames, keyed by (video path, frame index, pipeline settings).
+
+    Recorded feeds loop forever, so after the first pass every frame a
+    stream emits is already here and resize, ORB, draw and encode are
+    skipped. A frame cached without a tier that is wanted now counts as a
+    miss; the re-processed tiers are merged into the entry. Size the cap
+    to hold whole loops: a cyclic scan larger than an LRU misses every time.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, CachedFrame]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, tiers) -> Optional[CachedFrame]:
+        """The cached frame if it has every tier in `tiers`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or any(tier not in entry.encoded for tier in tiers):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, encoded: Dict[str, bytes], keypoints: int, features: Optional[bytes] = None):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+                encoded = {**old.encoded, **encoded}
+            entry = CachedFrame(encoded, keypoints, features)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+def shared_frame_cache(max_bytes: int) -> Optional[FrameCache]:
+    """This process's cache for the given cap, or None when caching is off (0)"""
+    if max_bytes <= 0:
+        return None
+    with _shared_lock:
+        cache = _shared.get(max_bytes)
+        if cache is None:
+            cache = _shared[max_bytes] = FrameCache(max_bytes)
+        return cache
@@ -0,0 +1,35 @@
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class FrameHub:
+    """Latest encoded JPEG per stream key, shared by every consumer of that stream.
+
+    Producers publish raw JPEG bytes once; Socket.IO fan-out and MJPEG HTTP
+    clients read the same bytes object, so nothing is re-encoded or copied
+    per consumer. Keys are stream ids or (stream id, tier name) pairs.
+    """
+
+    def __init__(self):
+        self._frames: Dict[Hashable, Tuple[int, bytes]] = {}
+        self._cond = threading.Condition()
+
+    def publish(self, stream_id: Hashable, jpeg: bytes) -> int:
+        """Store a new frame and wake waiting readers; returns its sequence number"""
+        with self._cond:
+            seq = self._frames.get(stream_id, (0, b''))[0] + 1
+            self._frames[stream_id] = (seq, jpeg)
+            self._cond.notify_all()
+        return seq
+
+    def latest(self, stream_id: Hashable) -> Optional[Tuple[int, bytes]]:
+        return self._frames.get(stream_id)
+
+    def wait(self, stream_id: Hashable, after_seq: int, timeout: float = 5.0) -> Optional[Tuple[int, bytes]]:
+        """Block until the stream has a frame newer than `after_seq`"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._frames.get(stream_id, (0,))[0] > after_seq, timeout)
+            frame = self._frames.get(stream_id)
+        if frame is None or frame[0] <= after_seq:
+            return None
+        return frame
@@ -1,6 +1,15 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Sequence
+from collections import defaultdict
+import math
 import uuid
 
+try:
+    import numpy as np
+except ImportError:  # batch checks fall back to the per-point index
+    np = None
+
+GRID_CELL_DEG = 0.01  # ~1.1 km index cells
+
 class Geofence:
     def __init__(self, fence_id: str, name: str, coordinates: List[List[float]], color: str = "red"):
         self.id = fence_id
@@ -8,6 +17,71 @@ class Geofence:
         self.coordinates = coordinates  # List of [lat, lon] pairs
         self.color = color
         self.active = True
+        self._prepare()
+    
+    def _prepare(self):
+        """Precompute bounding box and the non-horizontal edge table for ray casting"""
+        lats = [p[0] for p in self.coordinates]
+        lons = [p[1] for p in self.coordinates]
+        self.bbox = (min(lats), min(lons), max(lats), max(lons))
+        
+        # (lat_min, lat_max, lon_max, lon_at_lat1, lat1, dlon/dlat) per edge;
+        # horizontal edges can never be crossed by the ray and are dropped
+        self.edges: List[Tuple[float, ...]] = []
+        n = len(self.coordinates)
+        for i in range(n):
+            lat1, lon1 = self.coordinates[i]
+            lat2, lon2 = self.coordinates[(i + 1) % n]
+            if lat1 == lat2:
+                continue
+            self.edges.append((min(lat1, lat2), max(lat1, lat2), max(lon1, lon2),
+                               lon1, lat1, (lon2 - lon1) / (lat2 - lat1)))
+        
+        if np is not None:
+            self.edge_table = np.array(self.edges, dtype=np.float64).reshape(-1, 6)
+    
+    def contains(self, lat: float, lon: float) -> bool:
+        """Ray casting against the prepared edge table"""
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            return False
+        
+        inside = False
+        for lat_min, lat_max, lon_max, lon1, lat1, slope in self.edges:
+            if lat_min < lat <= lat_max and lon <= lon_max and lon <= (lat - lat1) * slope + lon1:
+                inside = not inside
+        return inside
+    
+    def segment_entries(self, lat1: float, lon1: float, lat2: float, lon2: float) -> List[float]:
+        """Fractions t in (0, 1] along the segment where it enters the polygon, in order"""
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        if (max(lat1, lat2) < min_lat or min(lat1, lat2) > max_lat or
+                max(lon1, lon2) < min_lon or min(lon1, lon2) > max_lon):
+            return []
+        
+        dlat, dlon = lat2 - lat1, lon2 - lon1
+        crossings = []
+        n = len(self.coordinates)
+        for i in range(n):
+            a_lat, a_lon = self.coordinates[i]
+            b_lat, b_lon = self.coordinates[(i + 1) % n]
+            e_lat, e_lon = b_lat - a_lat, b_lon - a_lon
+            denom = dlat * e_lon - dlon * e_lat
+            if denom == 0:
+                continue  # parallel to the edge
+            # segment at t meets the edge at u; u in [0, 1) so a shared vertex counts once
+            t = ((a_lat - lat1) * e_lon - (a_lon - lon1) * e_lat) / denom
+            u = ((a_lat - lat1) * dlon - (a_lon - lon1) * dlat) / denom
+            if 0 < t <= 1 and 0 <= u < 1:
+                crossings.append(t)
+        
+        entries = []
+        inside = self.contains(lat1, lon1)
+        for t in sorted(crossings):
+            inside = not inside
+            if inside:
+                entries.append(t)
+        return entries
     
     def to_dict(self):
         return {
@@ -18,43 +92,151 @@ class Geofence:
             'active': self.active
         }
 
+class GeofenceIndex:
+    """Uniform grid over fence bounding boxes.
+
+    With NumPy the grid is also kept as flat arrays (sorted cell keys, each
+    cell's fence list, every fence's edges), so fences_containing() can test
+    a whole fleet without a Python loop over cells or fences.
+    """
+    
+    def __init__(self, geofences: Sequence[Geofence], cell_size: float = GRID_CELL_DEG):
+        self.cell_size = cell_size
+        self.fences = list(geofences)
+        self.cells: Dict[Tuple[int, int], List[Geofence]] = defaultdict(list)
+        for fence in self.fences:
+            min_lat, min_lon, max_lat, max_lon = fence.bbox
+            for i in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                for j in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                    self.cells[(i, j)].append(fence)
+        if np is not None:
+            self._build_arrays()
+    
+    def _build_arrays(self):
+        position = {fence.id: k for k, fence in enumerate(self.fences)}
+        keys = sorted(self.cells)
+        self.cell_keys = np.array([self._pack(i, j) for i, j in keys], dtype=np.int64)
+        members = [[position[fence.id] for fence in self.cells[key]] for key in keys]
+        self.cell_start = np.cumsum([0] + [len(m) for m in members]).astype(np.int64)
+        self.cell_fences = np.array([k for m in members for k in m], dtype=np.int64)
+        self.bboxes = np.array([fence.bbox for fence in self.fences], dtype=np.float64).reshape(-1, 4)
+        self.edge_start = np.cumsum([0] + [len(fence.edges) for fence in self.fences]).astype(np.int64)
+        self.edge_table = (np.concatenate([fence.edge_table for fence in self.fences])
+                           if self.fences else np.empty((0, 6)))
+    
+    @staticmethod
+    def _pack(row, col):
+        """One int64 key per cell; rows and columns of 0.01 deg cells stay far inside +/- 2^20"""
+        return (row + (1 << 20)) * (1 << 21) + (col + (1 << 20))
+    
+    @staticmethod
+    def _ranges(lo, hi):
+        """Flattened (row, position) pairs for the half-open ranges lo[row]:hi[row]"""
+        counts = hi - lo
+        rows = np.repeat(np.arange(len(lo)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return rows, np.arange(int(counts.sum())) + starts
+    
+    def fences_containing(self, lats, lons) -> List[List[str]]:
+        """IDs of the active fences containing each point, in fence order (like candidates())"""
+        result: List[List[str]] = [[] for _ in range(len(lats))]
+        if not len(lats) or not len(self.cell_keys):
+            return result
+        
+        # point -> its cell's fence list, as (point, fence) candidate pairs
+        keys = self._pack(np.floor(lats / self.cell_size).astype(np.int64),
+                          np.floor(lons / self.cell_size).astype(np.int64))
+        cell = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = self.cell_keys[cell] == keys
+        lo = np.where(found, self.cell_start[cell], 0)
+        hi = np.where(found, self.cell_start[cell + 1], 0)
+        points, slots = self._ranges(lo, hi)
+        fences = self.cell_fences[slots]
+        
+        box = self.bboxes[fences]
+        plat, plon = lats[points], lons[points]
+        keep = (plat >= box[:, 0]) & (plat <= box[:, 2]) & (plon >= box[:, 1]) & (plon <= box[:, 3])
+        points, fences = points[keep], fences[keep]
+        if not len(points):
+            return result
+        
+        # every candidate pair against each edge of its fence; odd crossing count = inside
+        pairs, edges = self._ranges(self.edge_start[fences], self.edge_start[fences + 1])
+        e = self.edge_table[edges]
+        lat, lon = lats[points][pairs], lons[points][pairs]
+        crossing = ((e[:, 0] < lat) & (lat <= e[:, 1]) & (lon <= e[:, 2]) &
+                    (lon <= (lat - e[:, 4]) * e[:, 5] + e[:, 3]))
+        inside = np.bincount(pairs, weights=crossing, minlength=len(points)).astype(np.int64) & 1
+        points, fences = points[inside == 1], fences[inside == 1]
+        
+        order = np.lexsort((fences, points))
+        for point, k in zip(points[order].tolist(), fences[order].tolist()):
+            fence = self.fences[k]
+            if fence.active:
+                result[point].append(fence.id)
+        return result
+    
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+    
+    def candidates(self, lat: float, lon: float) -> List[Geofence]:
+        return self.cells.get((self._cell(lat), self._cell(lon)), [])
+    
+    def candidates_along(self, lat1: float, lon1: float, lat2: float, lon2: float) -> List[Geofence]:
+        """Fences in any cell of the segment's bounding box, each once"""
+        found: Dict[str, Geofence] = {}
+        for i in range(self._cell(min(lat1, lat2)), self._cell(max(lat1, lat2)) + 1):
+            for j in range(self._cell(min(lon1, lon2)), self._cell(max(lon1, lon2)) + 1):
+                for fence in self.cells.get((i, j), ()):
+                    found[fence.id] = fence
+        return list(found.values())
+
 class GeofenceManager:
     def __init__(self):
         self.geofences: Dict[str, Geofence] = {}
+        self._index = None
+        self.version = 0  # bumped on every change, for cached snapshots
     
     def add_geofence(self, fence_id: str, name: str, coordinates: List[List[float]], color: str = "red"):
         """Add a new geofence"""
         geofence = Geofence(fence_id, name, coordinates, color)
         self.geofences[fence_id] = geofence
+        self._index = None
+        self.version += 1
         return fence_id
     
+    def remove_geofence(self, fence_id: str) -> bool:
+        """Remove a geofence"""
+        if self.geofences.pop(fence_id, None) is None:
+            return False
+        self._index = None
+        self.version += 1
+        return True
+    
     def get_all_geofences(self) -> List[Dict[str, Any]]:
         """Get all geofences"""
         return [fence.to_dict() for fence in self.geofences.values() if fence.active]
     
+    @property
+    def index(self) -> GeofenceIndex:
+        """Grid index, rebuilt lazily after fences are added or removed"""
+        if self._index is None:
+            self._index = GeofenceIndex(list(self.geofences.values()))
+        return self._index
+    
     def check_violation(self, lat: float, lon: float) -> bool:
         """Check if coordinates violate any geofence"""
-        for geofence in self.geofences.values():
-            if geofence.active and self._point_in_polygon(lat, lon, geofence.coordinates):
-                return True
-        return False
-    
-    def _point_in_polygon(self, lat: float, lon: float, polygon: List[List[float]]) -> bool:
-        """Check if point is inside polygon using ray casting algorithm"""
-        x, y = lon, lat
-        n = len(polygon)
-        inside = False
-        
-        p1x, p1y = polygon[0]
-        for i in range(1, n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
+        return bool(self.fences_at(lat, lon))
+    
+    def fences_at(self, lat: float, lon: float) -> List[str]:
+        """IDs of active geofences containing the point"""
+        return [fence.id for fence in self.index.candidates(lat, lon)
+                if fence.active and fence.contains(lat, lon)]
+    
+    def check_fleet(self, lats: Sequence[float], lons: Sequence[float]) -> List[List[str]]:
+        """For each coordinate pair, the IDs of the active geofences containing it"""
+        if np is None:
+            return [self.fences_at(lat, lon) for lat, lon in zip(lats, lons)]
         
-        return inside
+        return self.index.fences_containing(np.asarray(lats, dtype=np.float64),
+                                            np.asarray(lons, dtype=np.float64))
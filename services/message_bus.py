@@ -0,0 +1,492 @@
+"""Message bus between the producer process and the client-facing web workers.
+
+The queue URL picks the backend. redis://, amqp://, kafka:// and zmq:// use
+python-socketio's own client managers for event fan-out (the same choice
+Flask-SocketIO makes for `message_queue`). local://host:port is a small TCP
+broker, LocalBroker, so a producer and several web workers can run on one
+machine without external services.
+
+Besides Socket.IO events the bus carries producer RPC (RpcServer/RpcClient)
+and MJPEG frames; those need local:// or redis://. Messages are JSON with
+binary attachments (wire_format.pack_message), never pickles, so a peer on
+the queue can send bad data but cannot run code in the producer or workers.
+
+Run a standalone broker (otherwise the producer hosts it); it binds to
+loopback unless a bind address is given:
+    python -m services.message_bus local://127.0.0.1:5600 [bind-host]
+"""
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import socketio
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from services.wire_format import pack_message, unpack_message
+
+RPC_CHANNEL = 'uav-rpc'
+FRAMES_CHANNEL = 'uav-frames'
+
+# frame: total length, op, channel length, channel, payload (wire_format.pack_message)
+_HEADER = struct.Struct('>IcH')
+_PUBLISH = b'P'
+_SUBSCRIBE = b'S'
+_SUBSCRIBED = b'A'
+
+
+def parse_local_url(url: str) -> Tuple[str, int]:
+    parsed = urlparse(url)
+    if parsed.scheme != 'local' or not parsed.port:
+        raise ValueError(f'Expected local://host:port, got {url!r}')
+    return parsed.hostname or '127.0.0.1', parsed.port
+
+
+def _decode(channel: str, payload: bytes):
+    """Unpacked message, or None (logged) if it is not a valid bus message"""
+    try:
+        return unpack_message(payload)
+    except ValueError as e:
+        print(f'[BUS] Dropped undecodable message on {channel}: {e}')
+        return None
+
+
+def _frame(op: bytes, channel: str, payload: bytes = b'') -> bytes:
+    name = channel.encode()
+    return _HEADER.pack(_HEADER.size - 4 + len(name) + len(payload), op, len(name)) + name + payload
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise ConnectionError('bus connection closed')
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+
+def _read_frame(sock: socket.socket) -> Tuple[bytes, str, bytes, bytes]:
+    """(op, channel, payload, raw frame)"""
+    head = _recv_exact(sock, _HEADER.size)
+    length, op, name_len = _HEADER.unpack(head)
+    body = _recv_exact(sock, length - (_HEADER.size - 4))
+    return op, body[:name_len].decode(), body[name_len:], head + body
+
+
+class _Subscriber:
+    """One subscribed connection with a bounded outbound queue and its own writer thread"""
+
+    def __init__(self, conn: socket.socket, max_pending: int):
+        self.conn = conn
+        self.channels = set()
+        self.pending = queue.Queue(max_pending)
+        self.alive = True
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def send(self, frame: bytes) -> bool:
+        try:
+            self.pending.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+    def _write(self):
+        while self.alive:
+            frame = self.pending.get()
+            if frame is None:
+                break
+            try:
+                self.conn.sendall(frame)
+            except OSError:
+                break
+        self.close()
+
+    def close(self):
+        if not self.alive:
+            return
+        self.alive = False
+        try:
+            self.pending.put_nowait(None)  # wake the writer
+        except queue.Full:
+            pass
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class LocalBroker:
+    """Minimal TCP pub/sub broker: each published frame is copied to the subscribers of its channel.
+
+    Frames are forwarded without decoding. A subscriber that falls
+    `max_pending` frames behind is disconnected and reconnects, so one slow
+    web worker cannot stall the producer. Binds to loopback unless given
+    another address; the broker has no authentication, so only expose it
+    on a trusted network.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 5600, max_pending: int = 10000):
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+
+    @classmethod
+    def from_url(cls, url: str, bind: Optional[str] = None, **kwargs) -> 'LocalBroker':
+        """Broker on the URL's port; listens on `bind` (default loopback), not the URL's host"""
+        _, port = parse_local_url(url)
+        return cls(bind or '127.0.0.1', port, **kwargs)
+
+    def start(self) -> 'LocalBroker':
+        """Bind and accept on a background thread; raises OSError if the port is taken"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            server.bind((self.host, self.port))
+        except OSError:
+            server.close()
+            raise
+        server.listen(128)
+        self._server = server
+        threading.Thread(target=self._accept, daemon=True).start()
+        print(f'[BUS] Broker listening on {self.host}:{self.port}')
+        return self
+
+    def close(self):
+        if self._server:
+            self._server.close()
+        with self._lock:
+            for sub in self.subscribers:
+                sub.close()
+            self.subscribers = []
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        subscriber = None
+        try:
+            while True:
+                op, channel, payload, raw = _read_frame(conn)
+                if op == _PUBLISH:
+                    self._fan_out(channel, raw)
+                elif op == _SUBSCRIBE:
+                    if subscriber is None:
+                        subscriber = _Subscriber(conn, self.max_pending)
+                        with self._lock:
+                            self.subscribers.append(subscriber)
+                    subscriber.channels.update(payload.decode().split('\n'))
+                    subscriber.send(_frame(_SUBSCRIBED, channel))
+        except (OSError, ConnectionError, struct.error):
+            pass
+        finally:
+            if subscriber is not None:
+                self._drop(subscriber)
+            else:
+                conn.close()
+
+    def _fan_out(self, channel: str, frame: bytes):
+        with self._lock:
+            targets = [sub for sub in self.subscribers if channel in sub.channels]
+        for sub in targets:
+            if not sub.send(frame):
+                print(f'[BUS] Subscriber to {sorted(sub.channels)} fell {self.max_pending} frames behind, dropping it')
+                self._drop(sub)
+
+    def _drop(self, subscriber: _Subscriber):
+        subscriber.close()
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+
+class LocalBus:
+    """Client for LocalBroker: publish() on a shared connection, listen() on one of its own"""
+
+    def __init__(self, host: str, port: int, retry_max: float = 5.0):
+        self.host = host
+        self.port = port
+        self.retry_max = retry_max
+        self._conn: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str) -> 'LocalBus':
+        return cls(*parse_local_url(url))
+
+    def _connect(self) -> socket.socket:
+        conn = socket.create_connection((self.host, self.port), timeout=5)
+        conn.settimeout(None)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def publish(self, channel: str, message):
+        frame = _frame(_PUBLISH, channel, pack_message(message))
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = self._connect()
+                    self._conn.sendall(frame)
+                    return
+                except OSError as e:
+                    if self._conn is not None:
+                        self._conn.close()
+                        self._conn = None
+                    if attempt:
+                        print(f'[BUS] Publish to {channel} dropped: {e}')
+
+    def listen(self, channels: List[str], ready: Optional[threading.Event] = None) -> Iterator[Tuple[str, object]]:
+        """Yield (channel, message) forever, reconnecting with backoff; sets `ready` once subscribed"""
+        delay = 0.5
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                conn.sendall(_frame(_SUBSCRIBE, '', '\n'.join(channels).encode()))
+                while True:
+                    op, channel, payload, _ = _read_frame(conn)
+                    if op == _SUBSCRIBED:
+                        delay = 0.5
+                        if ready is not None:
+                            ready.set()
+                        continue
+                    message = _decode(channel, payload)
+                    if message is not None:
+                        yield channel, message
+            except (OSError, ConnectionError, struct.error) as e:
+                if ready is not None:
+                    ready.clear()
+                print(f'[BUS] Listener for {channels} lost {self.host}:{self.port} ({e}), retrying in {delay:.1f}s')
+            finally:
+                if conn is not None:
+                    conn.close()
+            time.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+
+
+class RedisBus:
+    """The same publish/listen interface on Redis pub/sub"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError('redis:// message queues need the redis package: pip install redis')
+        self.redis = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, message):
+        self.redis.publish(channel, pack_message(message))
+
+    def listen(self, channels: List[str], ready: Optional[threading.Event] = None) -> Iterator[Tuple[str, object]]:
+        delay = 0.5
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(*channels)
+                if ready is not None:
+                    ready.set()
+                delay = 0.5
+                for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        channel = message['channel'].decode()
+                        decoded = _decode(channel, message['data'])
+                        if decoded is not None:
+                            yield channel, decoded
+            except redis.exceptions.RedisError as e:
+                if ready is not None:
+                    ready.clear()
+                print(f'[BUS] Redis listener for {channels} failed ({e}), retrying in {delay:.1f}s')
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+
+def connect_bus(url: str):
+    """Bus for RPC and frames; event fan-out goes through queue_manager()"""
+    if url.startswith('local://'):
+        return LocalBus.from_url(url)
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisBus(url)
+    raise ValueError(f'Producer/web split needs a local:// or redis:// message queue, got {url!r}')
+
+
+class LocalBusManager(socketio.PubSubManager):
+    """python-socketio client manager that fans events out through LocalBroker"""
+    name = 'local'
+
+    def __init__(self, url: str, channel: str = 'flask-socketio', write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.bus = LocalBus.from_url(url)
+
+    def _publish(self, data):
+        self.bus.publish(self.channel, data)
+
+    def _listen(self):
+        for _, message in self.bus.listen([self.channel]):
+            if isinstance(message, dict):  # anything else would reach PubSubManager's pickle fallback
+                yield message
+
+
+class RedisBusManager(socketio.RedisManager):
+    """socketio.RedisManager with bus-encoded messages instead of pickles"""
+    name = 'redis-bus'
+
+    def _publish(self, data):
+        retry = True
+        while True:
+            try:
+                if not retry:
+                    self._redis_connect()
+                return self.redis.publish(self.channel, pack_message(data))
+            except redis.exceptions.RedisError:
+                if not retry:
+                    print(f'[BUS] Cannot publish to redis, dropping {data.get("method")}')
+                    return
+                retry = False
+
+    def _listen(self):
+        # decoded here so PubSubManager gets dicts and never falls back to pickle.loads
+        for message in super()._listen():
+            decoded = _decode(self.channel, message) if isinstance(message, bytes) else None
+            if isinstance(decoded, dict):
+                yield decoded
+
+
+def queue_manager(url: str, write_only: bool = False, channel: str = 'flask-socketio') -> socketio.PubSubManager:
+    """Socket.IO client manager for a queue URL, picked the way Flask-SocketIO picks for message_queue"""
+    if url.startswith('local://'):
+        return LocalBusManager(url, channel=channel, write_only=write_only)
+    if url.startswith(('redis://', 'rediss://')):
+        manager_class = RedisBusManager
+    elif url.startswith('kafka://'):
+        manager_class = socketio.KafkaManager
+    elif url.startswith('zmq'):
+        manager_class = socketio.ZmqManager
+    else:
+        manager_class = socketio.KombuManager
+    return manager_class(url, channel=channel, write_only=write_only)
+
+
+class RpcTimeout(TimeoutError):
+    pass
+
+
+class RpcServer:
+    """Answers web-worker requests on RPC_CHANNEL by calling handlers[op](**args).
+
+    Calls that expect a reply run on a pool of `workers` threads, so one
+    slow operation (a deep log page, a long track query) does not hold up
+    every other worker's REST calls. Casts (no reply) are quick state
+    updates and run in arrival order on the listening thread.
+    """
+
+    def __init__(self, bus, handlers: Dict[str, Callable], workers: int = 8):
+        self.bus = bus
+        self.handlers = handlers
+        self.workers = workers
+
+    def _handle(self, request: dict):
+        op = request.get('op')
+        reply = {'id': request.get('id')}
+        try:
+            handler = self.handlers.get(op)
+            if handler is None:
+                raise KeyError(f'unknown operation {op!r}')
+            args = request.get('args') or {}
+            if not isinstance(args, dict):
+                raise TypeError('args must be an object')
+            reply['result'] = handler(**args)
+        except Exception as e:
+            print(f'[BUS] {op} failed: {e}')
+            reply['error'] = f'{type(e).__name__}: {e}'
+        reply_to = request.get('reply_to')
+        if isinstance(reply_to, str) and reply_to.startswith(f'{RPC_CHANNEL}-reply:'):
+            self.bus.publish(reply_to, reply)
+
+    def serve(self):
+        print(f'[BUS] Serving {len(self.handlers)} producer operations on {self.workers} threads')
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='RPC') as pool:
+            for _, request in self.bus.listen([RPC_CHANNEL]):
+                if not isinstance(request, dict):
+                    continue
+                if request.get('reply_to'):
+                    pool.submit(self._handle, request)
+                else:
+                    self._handle(request)
+
+
+class RpcClient:
+    """Calls producer operations from a web worker; replies come back on a per-worker channel"""
+
+    def __init__(self, bus, timeout: float = 5.0):
+        self.bus = bus
+        self.timeout = timeout
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.reply_to = f'{RPC_CHANNEL}-reply:{self.worker_id}'
+        self._pending: Dict[str, list] = {}
+        self._ready = threading.Event()
+
+    def start(self, spawn: Optional[Callable] = None):
+        if spawn is not None:
+            spawn(self._listen)
+        else:
+            threading.Thread(target=self._listen, daemon=True).start()
+
+    def _listen(self):
+        for _, reply in self.bus.listen([self.reply_to], self._ready):
+            if not isinstance(reply, dict):
+                continue
+            slot = self._pending.get(reply.get('id'))
+            if slot is not None:
+                slot[1] = reply
+                slot[0].set()
+
+    def call(self, op: str, timeout: Optional[float] = None, **args):
+        timeout = timeout or self.timeout
+        if not self._ready.wait(timeout):
+            raise RpcTimeout('message bus not connected')
+        call_id = uuid.uuid4().hex
+        slot = [threading.Event(), None]
+        self._pending[call_id] = slot
+        try:
+            self.bus.publish(RPC_CHANNEL, {'op': op, 'args': args, 'id': call_id, 'reply_to': self.reply_to})
+            if not slot[0].wait(timeout):
+                raise RpcTimeout(f'{op}: no reply from the producer within {timeout:.0f}s')
+        finally:
+            self._pending.pop(call_id, None)
+        reply = slot[1]
+        if 'error' in reply:
+            raise RuntimeError(f"{op}: {reply['error']}")
+        return reply.get('result')
+
+    def cast(self, op: str, **args):
+        """Fire-and-forget call"""
+        self.bus.publish(RPC_CHANNEL, {'op': op, 'args': args})
+
+
+if __name__ == '__main__':
+    broker = LocalBroker.from_url(sys.argv[1] if len(sys.argv) > 1 else 'local://127.0.0.1:5600',
+                                  bind=sys.argv[2] if len(sys.argv) > 2 else None).start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        broker.close()
@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from engineio import json as socketio_json
+
+from services.socket_transport import RawJSON
+
+# Upper bounds; one extra overflow bucket catches everything above the last
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(64 * 4 ** i for i in range(10))  # 64 B .. 16 MiB
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions under a lock"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * ((rank - seen) / n)
+            seen += n
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Named, labelled histograms and counters with Prometheus text and JSON export"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.help: Dict[str, str] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, **labels) -> Histogram:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        series = self.histograms.get(name)
+        if series is not None:
+            hist = series.get(key)
+            if hist is not None:
+                return hist
+        with self._lock:
+            return self.histograms.setdefault(name, {}).setdefault(key, Histogram(buckets))
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        self.histogram(name, buckets, **labels).observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        hist = self.histogram(name, **labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            hist.observe(time.perf_counter() - start)
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        for name, series in sorted(self.counters.items()):
+            if name in self.help:
+                lines.append(f'# HELP {name} {self.help[name]}')
+            lines.append(f'# TYPE {name} counter')
+            for key, value in sorted(series.items()):
+                lines.append(f'{name}{_labels(key)} {value}')
+        for name, series in sorted(self.histograms.items()):
+            if name in self.help:
+                lines.append(f'# HELP {name} {self.help[name]}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, hist in sorted(series.items()):
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{_labels(key + (("le", repr(float(bound))),))} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(key + (("le", "+Inf"),))} {hist.count}')
+                lines.append(f'{name}_sum{_labels(key)} {hist.sum}')
+                lines.append(f'{name}_count{_labels(key)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self) -> Dict:
+        return {
+            'uptime': time.time() - self.started,
+            'counters': {name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                         for name, series in sorted(self.counters.items())},
+            'histograms': {name: [{'labels': dict(key), **hist.summary()} for key, hist in sorted(series.items())]
+                           for name, series in sorted(self.histograms.items())},
+        }
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in key) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PacketSizeJSON:
+    """json module stand-in for Socket.IO that records the size of every encoded event packet.
+
+    Socket.IO encodes each packet once per recipient, so the histogram counts
+    what actually goes on the wire (text part only; binary attachments such as
+    video frames are recorded where they are produced). RawJSON arguments are
+    spliced in as-is, so cached snapshots are not re-encoded per recipient.
+    `dumps` replaces the stdlib encoder (wire_format.dumps uses orjson).
+    """
+
+    def __init__(self, registry: MetricsRegistry, name: str = 'socketio_packet_bytes',
+                 dumps: Optional[Callable[[object], str]] = None):
+        self.registry = registry
+        self.name = name
+        self._dumps = dumps
+
+    def dumps(self, obj, *args, **kwargs) -> str:
+        encode = self._dumps or (lambda item: json.dumps(item, *args, **kwargs))
+        if isinstance(obj, list) and any(isinstance(item, RawJSON) for item in obj):
+            text = '[' + ','.join(item.text if isinstance(item, RawJSON) else encode(item) for item in obj) + ']'
+        else:
+            text = encode(obj)
+        if isinstance(obj, list) and obj and isinstance(obj[0], str):
+            self.registry.observe(self.name, len(text), BYTES_BUCKETS, event=obj[0])
+        return text
+
+    def loads(self, *args, **kwargs):
+        return socketio_json.loads(*args, **kwargs)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+LEVELS = ('debug', 'info', 'warning', 'error', 'critical')
+
+
+class _Index:
+    """Posting lists: key -> sorted array of entry sequence numbers, plus a small code per key"""
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.codes: Dict[str, int] = {}
+
+    def add(self, key: str, seq: int) -> int:
+        posting = self.postings.get(key)
+        if posting is None:
+            posting = self.postings[key] = array('q')
+            self.codes[key] = len(self.codes) + 1
+        posting.append(seq)
+        return self.codes[key]
+
+
+class MissionLog:
+    """Append-only mission/audit log with secondary indexes and cursor pagination.
+
+    Entries are JSON lines in `path`, written and flushed one at a time; the
+    newest `ring_size` are also kept in memory. Sequence numbers are dense,
+    so the per-entry arrays (file offset, line length, timestamp, user and
+    level codes) are indexed by them directly, and each UAV, user and level
+    has a sorted posting list. A page is found by bisecting those arrays,
+    so its cost does not grow with the size of the log; entries that have
+    left the ring are read back with one pread each.
+
+    With path=None nothing is written and entries older than the ring are
+    dropped.
+    """
+
+    def __init__(self, path: Optional[str] = None, ring_size: int = 10000, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.ring: deque = deque(maxlen=ring_size)
+        self.offsets = array('q')
+        self.lengths = array('l')
+        self.times = array('d')
+        self.user_codes = array('l')
+        self.level_codes = array('b')
+        self.uavs = _Index()
+        self.users = _Index()
+        self.levels = _Index()
+        self._lock = threading.Lock()
+        self._file = None
+        self._fd = None
+        if path:
+            self._open(path)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _open(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'a+b')
+        self._fd = self._file.fileno()
+        self._file.seek(0)
+        offset = 0
+        started = time.perf_counter()
+        for line in self._file:
+            if not line.endswith(b'\n'):
+                break  # torn write from a crash; cut below
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                offset += len(line)
+                continue
+            self._index(entry, offset, len(line))
+            self.ring.append(entry)
+            offset += len(line)
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        if self.times:
+            print(f'[LOG] Indexed {len(self.times)} entries from {path} in {time.perf_counter() - started:.2f}s')
+
+    def _index(self, entry: Dict[str, Any], offset: int, length: int):
+        seq = len(self.times)
+        entry['id'] = seq
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.times.append(max(entry['ts'], self.times[-1]) if self.times else entry['ts'])  # keep it sorted
+        self.level_codes.append(self.levels.add(entry['level'], seq))
+        self.user_codes.append(self.users.add(entry['user'], seq) if entry.get('user') else 0)
+        for uav_id in entry.get('uav_ids', ()):
+            self.uavs.add(uav_id, seq)
+
+    def append(self, message: str, level: str = 'info', user: Optional[str] = None,
+               uav_ids: Iterable[str] = (), ts: Optional[float] = None) -> Dict[str, Any]:
+        ts = time.time() if ts is None else ts
+        entry = {
+            'id': 0,
+            'ts': ts,
+            'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            'message': message,
+            'level': level,
+            'user': user,
+            'uav_ids': list(uav_ids),
+        }
+        with self._lock:
+            entry['id'] = len(self.times)
+            line = (json.dumps(entry, separators=(',', ':')) + '\n').encode()
+            offset = 0
+            if self._file is not None:
+                offset = self._file.tell()
+                self._file.write(line)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._fd)
+            self._index(entry, offset, len(line))
+            self.ring.append(entry)
+        return entry
+
+    def entry(self, seq: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            oldest = len(self.times) - len(self.ring)
+            if seq >= oldest:
+                return self.ring[seq - oldest]
+        if self._fd is None:
+            return None
+        entry = json.loads(os.pread(self._fd, self.lengths[seq], self.offsets[seq]))
+        entry['id'] = seq
+        return entry
+
+    def query(self, uav_id: Optional[str] = None, user: Optional[str] = None, level: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[int] = None, limit: int = 50) -> Dict[str, Any]:
+        """Newest-first page of matching entries; pass `next_cursor` back to get the following page"""
+        with self._lock:
+            total = len(self.times)
+        hi = total if cursor is None else max(0, min(cursor, total))
+        if until is not None:
+            hi = min(hi, bisect_right(self.times, until, 0, total))
+        lo = bisect_left(self.times, since, 0, total) if since is not None else 0
+
+        # scan the shortest posting list; the UAV filter is multi-valued, so it always drives when given
+        candidates, driver = None, None
+        if uav_id is not None:
+            candidates, driver = self.uavs.postings.get(uav_id, ()), 'uav'
+        else:
+            for key, index, name in ((user, self.users, 'user'), (level, self.levels, 'level')):
+                if key is not None:
+                    posting = index.postings.get(key, ())
+                    if candidates is None or len(posting) < len(candidates):
+                        candidates, driver = posting, name
+        user_code = self.users.codes.get(user, -1) if user is not None and driver != 'user' else None
+        level_code = self.levels.codes.get(level, -1) if level is not None and driver != 'level' else None
+
+        if candidates is None:
+            seqs = range(hi - 1, lo - 1, -1)
+        else:
+            end = bisect_left(candidates, hi)
+            start = bisect_left(candidates, lo)
+            seqs = (candidates[i] for i in range(end - 1, start - 1, -1))
+
+        entries = []
+        next_cursor = None
+        for seq in seqs:
+            if user_code is not None and self.user_codes[seq] != user_code:
+                continue
+            if level_code is not None and self.level_codes[seq] != level_code:
+                continue
+            if len(entries) == limit:
+                next_cursor = entries[-1]['id']
+                break
+            entry = self.entry(seq)
+            if entry is not None:
+                entries.append(entry)
+        return {'entries': entries, 'next_cursor': next_cursor}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = self._fd = None
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
+
+from services.mission_log import MissionLog
 
 class Mission:
     def __init__(self, mission_id: str, name: str, description: str, uav_ids: List[str], created_by: str):
@@ -26,9 +28,10 @@ class Mission:
         }
 
 class MissionManager:
-    def __init__(self):
+    def __init__(self, log: Optional[MissionLog] = None):
         self.missions: Dict[str, Mission] = {}
-        self.mission_logs: List[Dict[str, Any]] = []
+        self.version = 0  # bumped on every change, for cached snapshots
+        self.log = log if log is not None else MissionLog()  # in-memory ring unless given a durable log
         
         # Initialize with demo missions
         self._init_demo_missions()
@@ -58,8 +61,9 @@ class MissionManager:
         mission_id = str(uuid.uuid4())
         mission = Mission(mission_id, name, description, uav_ids, created_by)
         self.missions[mission_id] = mission
+        self.version += 1
         
-        self.add_log_entry(f"Mission '{name}' created by {created_by}")
+        self.add_log_entry(f"Mission '{name}' created by {created_by}", user=created_by, uav_ids=uav_ids)
         return mission_id
     
     def get_mission(self, mission_id: str) -> Mission:
@@ -70,20 +74,11 @@ class MissionManager:
         """Get all missions"""
         return [mission.to_dict() for mission in self.missions.values()]
     
-    def add_log_entry(self, message: str, level: str = "info"):
+    def add_log_entry(self, message: str, level: str = "info", user: Optional[str] = None,
+                      uav_ids: Iterable[str] = ()) -> Dict[str, Any]:
         """Add entry to mission log"""
-        log_entry = {
-            'id': str(uuid.uuid4()),
-            'timestamp': datetime.now().isoformat(),
-            'message': message,
-            'level': level
-        }
-        self.mission_logs.append(log_entry)
-        
-        # Keep only last 100 entries
-        if len(self.mission_logs) > 100:
-            self.mission_logs.pop(0)
+        return self.log.append(message, level, user, uav_ids)
     
     def get_mission_logs(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get recent mission logs"""
-        return self.mission_logs[-limit:]
+        """Get recent mission logs, oldest first"""
+        return self.log.query(limit=limit)['entries'][::-1]
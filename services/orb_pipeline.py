@@ -0,0 +1,388 @@
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Tier/settings types live in stream_config so the server can configure streams without OpenCV
+from services.stream_config import QualityTier, StreamSettings
+from services.frame_cache import FrameCache, shared_frame_cache
+
+_orb_slam = None  # ORBExtractor class, or False when python_orb_slam3 is missing; probed on first use
+
+DEFAULT_SOURCE_FPS = 30.0  # used when the container does not report a frame rate
+IDLE_POLL_INTERVAL = 0.2   # seconds between demand checks while a stream is paused
+SEEK_AHEAD_FRAMES = 60     # on a replay miss, decode forward up to this far instead of seeking
+
+# Packed keypoint record: x/y normalized to 0..65535 of the frame size, size in
+# pixels (clamped to 255), angle in 1/256 turns, response as half float
+KEYPOINT_DTYPE = np.dtype([('x', '<u2'), ('y', '<u2'), ('size', 'u1'), ('angle', 'u1'), ('response', '<f2')])
+
+
+class PacedCapture:
+    """Video reader paced by the container's frame timestamps and a target emit rate.
+
+    Every source frame is grabbed so the stream advances at its native rate,
+    but only frames that fall on the emit schedule are retrieved (converted to
+    BGR) and returned. Skipped frames never reach resize, ORB or encode.
+
+    With `replay`, the (frame index, media time) schedule of the first
+    complete loop is recorded, and later loops follow it without touching
+    the decoder: read() returns the frame as None and the caller, which
+    serves it from a cache, calls fetch() only for frames it does not have.
+
+    `sleep` paces the reader and `offload(fn)` runs decoder calls; async
+    servers pass their cooperative sleep and a native-thread executor so
+    neither blocks the event loop.
+    """
+
+    def __init__(self, video_path: str, emit_fps: float, loop: bool = True,
+                 sleep: Callable[[float], None] = time.sleep, offload: Optional[Callable] = None,
+                 replay: bool = False):
+        self.video_path = video_path
+        self.loop = loop
+        self.replay = replay and loop
+        self.sleep = sleep
+        self.offload = offload
+        self.cap = cv2.VideoCapture(video_path)
+
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+        self.source_fps = fps if 0 < fps <= 240 else DEFAULT_SOURCE_FPS
+        self.emit_interval = 1.0 / min(float(emit_fps), self.source_fps)
+
+        self.frame_index = -1   # index of the last grabbed frame in the current loop
+        self.loops = 0
+        self._next_emit = 0.0   # media time (s) of the next frame to emit
+        self._clock_origin = None  # monotonic time at media time 0
+        self.last_wait = 0.0    # seconds the last read() slept for pacing
+
+        self.timeline: Optional[List[Tuple[int, float]]] = None  # emit schedule of one loop, once known
+        self._recording: Optional[List[Tuple[int, float]]] = [] if self.replay else None
+        self._cursor = 0
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+    def read(self) -> Optional[Tuple[int, float, Optional[np.ndarray]]]:
+        """Block until the next scheduled frame; returns (frame index, media time, BGR frame).
+        While replaying the frame is None: use fetch(index) if it is needed"""
+        if self.timeline is not None:
+            return self._replay()
+        while True:
+            if not self._call(self.cap.grab):
+                if not self.loop or self.frame_index < 0:
+                    return None
+                self._rewind()
+                if self.timeline is not None:
+                    return self._replay()
+                continue
+
+            self.frame_index += 1
+            media_time = self._media_time()
+            if media_time + 1e-6 < self._next_emit:
+                continue  # not on the emit schedule: grabbed only
+
+            self._next_emit += self.emit_interval
+            if self._next_emit <= media_time:
+                self._next_emit = media_time + self.emit_interval  # skip ahead after a gap
+            self._wait_until(media_time)
+
+            ok, frame = self._call(self.cap.retrieve)
+            if ok:
+                if self._recording is not None:
+                    self._recording.append((self.frame_index, media_time))
+                return self.frame_index, media_time, frame
+
+    def _replay(self) -> Tuple[int, float, None]:
+        if self._cursor >= len(self.timeline):
+            self._cursor = 0
+            self.loops += 1
+            self._clock_origin = None
+        frame_index, media_time = self.timeline[self._cursor]
+        self._cursor += 1
+        self._wait_until(media_time)
+        return frame_index, media_time, None
+
+    def fetch(self, frame_index: int) -> Optional[np.ndarray]:
+        """Decode one frame while replaying: reads forward when it is just ahead, seeks otherwise"""
+        if frame_index <= self.frame_index or frame_index - self.frame_index > SEEK_AHEAD_FRAMES:
+            self._call(lambda: self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index))
+            self.frame_index = frame_index - 1
+        while self.frame_index < frame_index:
+            if not self._call(self.cap.grab):
+                return None
+            self.frame_index += 1
+        ok, frame = self._call(self.cap.retrieve)
+        return frame if ok else None
+
+    def _call(self, fn):
+        return self.offload(fn) if self.offload else fn()
+
+    def _media_time(self) -> float:
+        """Container timestamp of the grabbed frame, or index / fps when unavailable"""
+        pos_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if pos_ms > 0 or self.frame_index == 0:
+            return pos_ms / 1000.0
+        return self.frame_index / self.source_fps
+
+    def _wait_until(self, media_time: float):
+        now = time.monotonic()
+        if self._clock_origin is None:
+            self._clock_origin = now - media_time
+        delay = self._clock_origin + media_time - now
+        self.last_wait = max(delay, 0.0)
+        if delay > 0:
+            self.sleep(delay)
+        elif delay < -1.0:
+            # Fell more than a second behind: re-anchor instead of bursting to catch up
+            self._clock_origin = now - media_time
+
+    def resync(self):
+        """Re-anchor pacing at the next frame, e.g. after the reader was paused"""
+        self._clock_origin = None
+        if self.timeline is not None:
+            return  # carry on from the next frame of the schedule
+        if self.frame_index >= 0 and self._recording is not None:
+            self._recording = None  # this loop's schedule has a gap; record the next one
+        self._next_emit = 0.0 if self.frame_index < 0 else self._media_time()
+
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.frame_index = -1
+        self.loops += 1
+        self._next_emit = 0.0
+        self._clock_origin = None
+        if self._recording:
+            self.timeline = self._recording  # a complete loop: replay it from now on
+        self._recording = [] if self.replay and self.timeline is None else None
+
+
+def _orb_slam_class():
+    """Simplified ORB-SLAM import, done once when the first stream starts"""
+    global _orb_slam
+    if _orb_slam is None:
+        try:
+            from python_orb_slam3 import ORBExtractor
+            _orb_slam = ORBExtractor
+            print("✓ Using python_orb_slam3")
+        except ImportError:
+            _orb_slam = False
+            print("⚠ python_orb_slam3 not found, using OpenCV ORB fallback")
+    return _orb_slam or None
+
+
+def create_orb_extractor(stream_id: int):
+    """ORB-SLAM3 extractor when available, OpenCV ORB otherwise"""
+    ORBExtractor = _orb_slam_class()
+    if ORBExtractor is not None:
+        try:
+            orb_extractor = ORBExtractor()
+            print(f"[ORB-{stream_id}] Using ORB-SLAM3")
+            return orb_extractor
+        except Exception as e:
+            print(f"[ORB-{stream_id}] ORB-SLAM3 failed: {e}, using OpenCV")
+            return cv2.ORB_create(nfeatures=2000)
+    print(f"[ORB-{stream_id}] Using OpenCV ORB")
+    return cv2.ORB_create(nfeatures=2000)
+
+
+def resize_frame(frame: np.ndarray, max_width: int) -> np.ndarray:
+    h, w = frame.shape[:2]
+    if w > max_width:
+        scale = max_width / float(w)
+        frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+    return frame
+
+
+def to_gray(frame: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def detect_keypoints(orb_extractor, gray: np.ndarray, stream_id: int):
+    """ORB keypoints and descriptors of a grayscale frame"""
+    try:
+        if isinstance(orb_extractor, cv2.ORB):
+            return orb_extractor.detectAndCompute(gray, None)
+        return orb_extractor.detectAndCompute(gray)
+    except Exception as e:
+        print(f"[ORB-{stream_id}] Detection error: {e}")
+        return [], None
+
+
+def draw_keypoints(frame: np.ndarray, keypoints) -> np.ndarray:
+    # Small dots with flags=0
+    return cv2.drawKeypoints(frame, keypoints, None, color=(0, 255, 0), flags=0)
+
+
+def pack_keypoints(keypoints, width: int, height: int) -> bytes:
+    """Quantize keypoints into KEYPOINT_DTYPE records (8 bytes each)"""
+    packed = np.empty(len(keypoints), dtype=KEYPOINT_DTYPE)
+    if len(keypoints) == 0:
+        return packed.tobytes()
+    pts = cv2.KeyPoint_convert(keypoints)
+    packed['x'] = np.clip(pts[:, 0] * (65535.0 / max(width - 1, 1)), 0, 65535)
+    packed['y'] = np.clip(pts[:, 1] * (65535.0 / max(height - 1, 1)), 0, 65535)
+    packed['size'] = np.clip([kp.size for kp in keypoints], 0, 255)
+    packed['angle'] = (np.array([kp.angle for kp in keypoints]) % 360) * (256.0 / 360.0)
+    packed['response'] = [kp.response for kp in keypoints]
+    return packed.tobytes()
+
+
+def unpack_keypoints(data: bytes, width: int, height: int) -> np.ndarray:
+    """Inverse of pack_keypoints: (N, 5) float array of x, y, size, angle, response"""
+    packed = np.frombuffer(data, dtype=KEYPOINT_DTYPE)
+    out = np.empty((len(packed), 5), dtype=np.float32)
+    out[:, 0] = packed['x'] * ((width - 1) / 65535.0)
+    out[:, 1] = packed['y'] * ((height - 1) / 65535.0)
+    out[:, 2] = packed['size']
+    out[:, 3] = packed['angle'] * (360.0 / 256.0)
+    out[:, 4] = packed['response']
+    return out
+
+
+def encode_jpeg(img_bgr: np.ndarray, quality: int) -> Optional[bytes]:
+    """Convert BGR image to raw JPEG bytes"""
+    is_success, buf = cv2.imencode('.jpg', img_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    if not is_success:
+        return None
+    return buf.tobytes()
+
+
+def encode_tiers(frame: np.ndarray, tiers: Sequence[QualityTier], wanted: List[int]) -> Dict[str, bytes]:
+    """Encode `frame` once for each wanted tier index"""
+    encoded = {}
+    for i in wanted:
+        tier = tiers[i]
+        jpeg = encode_jpeg(resize_frame(frame, tier.max_width), tier.jpeg_quality)
+        if jpeg:
+            encoded[tier.name] = jpeg
+    return encoded
+
+
+def process_frame(orb_extractor, frame: np.ndarray, settings: StreamSettings, wanted: List[int],
+                  stream_id: int) -> Tuple[Dict[str, bytes], dict]:
+    """resize -> gray -> ORB -> draw/pack -> encode for one frame; pure CPU, safe to offload"""
+    t1 = time.perf_counter()
+    frame = resize_frame(frame, settings.max_width)
+    t2 = time.perf_counter()
+    timings = {'resize': t2 - t1}
+    gray = to_gray(frame)
+    t3 = time.perf_counter()
+    timings['gray'] = t3 - t2
+    keypoints, _ = detect_keypoints(orb_extractor, gray, stream_id)
+    t4 = time.perf_counter()
+    timings['orb'] = t4 - t3
+
+    meta = {'keypoints': len(keypoints), 'timings': timings}
+    if settings.keypoint_channel:
+        meta['features'] = pack_keypoints(keypoints, frame.shape[1], frame.shape[0])
+    else:
+        frame = draw_keypoints(frame, keypoints)
+    t5 = time.perf_counter()
+    timings['draw'] = t5 - t4  # keypoint packing in channel mode
+
+    encoded = encode_tiers(frame, settings.tiers, wanted)
+    timings['encode'] = time.perf_counter() - t5
+    return encoded, meta
+
+
+def run_stream(stream_id: int, video_path: str, settings: StreamSettings,
+               on_frame: Callable[[int, Dict[str, bytes], dict], None], demand=None,
+               sleep: Callable[[float], None] = time.sleep, offload: Optional[Callable] = None,
+               cache: Optional[FrameCache] = None):
+    """Paced capture -> resize -> ORB -> draw -> encode loop.
+
+    Each frame is encoded once per tier that `demand` reports consumers for
+    and the {tier name: JPEG} map is handed to on_frame. With
+    `settings.keypoint_channel` the JPEGs are left un-annotated and the packed
+    keypoints travel in meta['features'] instead. While `demand`
+    shows no consumers at all the stream is paused: nothing is decoded,
+    detected or encoded. Without `demand` the top tier is always encoded.
+
+    meta['timings'] carries per-stage seconds (read excludes pacing sleep)
+    so the consumer can record them in whichever process it runs.
+
+    With a frame cache (`cache`, or this process's shared one when
+    `settings.frame_cache_bytes` is set) output is stored per (path, frame
+    index, pipeline settings). Once a full loop has played, the capture
+    replays its schedule without decoding and frames come from the cache;
+    meta['cached'] says which. Only misses are decoded and processed.
+
+    Under an async server, `sleep` is the cooperative sleep and
+    `offload(fn, *args)` runs decoding and process_frame in a native thread.
+    on_frame is always called from the calling task.
+    """
+    print(f"[ORB-{stream_id}] Starting stream: {video_path}")
+
+    if cache is None:
+        cache = shared_frame_cache(settings.frame_cache_bytes)
+    pipeline = (settings.max_width, settings.keypoint_channel, settings.tiers)  # everything that shapes the output
+
+    # Frames off the emit schedule are grabbed but never retrieved or processed
+    capture = PacedCapture(video_path, settings.emit_fps, sleep=sleep, offload=offload, replay=cache is not None)
+    if not capture.isOpened():
+        print(f"[ORB-{stream_id}] ERROR: Cannot open video")
+        return
+    print(f"[ORB-{stream_id}] Source {capture.source_fps:.1f} fps, emitting every {capture.emit_interval * 1000:.0f} ms")
+
+    orb_extractor = create_orb_extractor(stream_id)
+    emitted = 0
+    paused = False
+
+    while True:
+        if demand is not None and demand.count(stream_id) == 0:
+            if not paused:
+                print(f"[ORB-{stream_id}] No subscribers, pausing")
+                paused = True
+            sleep(IDLE_POLL_INTERVAL)
+            continue
+        if paused:
+            print(f"[ORB-{stream_id}] Subscriber joined, resuming")
+            capture.resync()
+            paused = False
+
+        t0 = time.perf_counter()
+        item = capture.read()
+        if item is None:
+            print(f"[ORB-{stream_id}] Stream ended")
+            break
+        frame_index, _, frame = item
+        read_time = time.perf_counter() - t0 - capture.last_wait
+
+        wanted = demand.wanted(stream_id) if demand is not None else [0]
+        tiers = [settings.tiers[i].name for i in wanted]
+        key = (video_path, frame_index, pipeline)
+        cached = cache.get(key, tiers) if cache is not None else None
+        if cached is not None:
+            encoded = {tier: cached.encoded[tier] for tier in tiers}
+            meta = {'keypoints': cached.keypoints, 'timings': {}, 'cached': True}
+            if cached.features is not None:
+                meta['features'] = cached.features
+        else:
+            if frame is None:  # replaying, and this frame is not cached (evicted, or a new tier)
+                t1 = time.perf_counter()
+                frame = capture.fetch(frame_index)
+                read_time += time.perf_counter() - t1
+                if frame is None:
+                    continue
+            args = (orb_extractor, frame, settings, wanted, stream_id)
+            encoded, meta = offload(process_frame, *args) if offload else process_frame(*args)
+            if cache is not None:
+                cache.put(key, encoded, meta['keypoints'], meta.get('features'))
+                meta['cached'] = False
+        meta['frame'] = frame_index
+        meta['timings']['read'] = read_time
+        if not encoded:
+            continue
+        try:
+            on_frame(stream_id, encoded, meta)
+            emitted += 1
+            if emitted % 50 == 0:  # Log every 50 frames
+                print(f"[ORB-{stream_id}] Frame {frame_index}, keypoints: {meta['keypoints']}")
+        except Exception as e:
+            print(f"[ORB-{stream_id}] Emit error: {e}")
+
+    capture.release()
@@ -0,0 +1,31 @@
+from typing import Callable, Optional
+
+ASYNC_MODES = ('threading', 'eventlet', 'gevent')
+
+
+def monkey_patch(mode: str):
+    """Cooperative modes must patch the stdlib before Flask, sockets or threads are imported"""
+    if mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    elif mode not in ASYNC_MODES:
+        raise ValueError(f"Unknown async mode {mode!r}, expected one of {ASYNC_MODES}")
+
+
+def offloader(mode: str) -> Optional[Callable]:
+    """offload(fn, *args): run fn on a native OS thread while the event loop keeps serving.
+
+    Returns None in threading mode, where every task already has its own
+    thread and blocking calls are fine.
+    """
+    if mode == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute
+    if mode == 'gevent':
+        import gevent
+        pool = gevent.get_hub().threadpool
+        return lambda fn, *args: pool.apply(fn, args)
+    return None
@@ -0,0 +1,100 @@
+import time
+from typing import Callable, List, Optional
+
+from services.metrics import MetricsRegistry
+
+
+class Task:
+    """One periodic job of a TickScheduler"""
+
+    def __init__(self, name: str, rate: float, fn: Callable, fixed_step: bool = False):
+        if rate <= 0:
+            raise ValueError(f'{name}: rate must be positive, got {rate}')
+        self.name = name
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.fn = fn
+        self.fixed_step = fixed_step
+        self.due = 0.0
+        self.runs = 0
+
+
+class TickScheduler:
+    """Runs periodic tasks at independent rates from a single loop.
+
+    A fixed-step task (physics) is called as fn(period) once per elapsed
+    period, so the simulation advances by exact steps whatever the loop's
+    timing. When it falls behind it catches up with up to `max_catchup`
+    steps in one go; beyond that the remaining steps are dropped (skip
+    ahead) rather than letting the backlog grow. Other tasks are called as
+    fn() at most once per period; a task that misses periods runs once and
+    the missed ones are skipped.
+
+    The loop sleeps until the earliest due task, so deadlines do not drift
+    by the time the work takes. Per task it records run time, start lag
+    behind the deadline, overruns (a run longer than the period) and
+    skipped periods.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.perf_counter, max_catchup: int = 5):
+        self.registry = registry
+        self.sleep = sleep
+        self.clock = clock
+        self.max_catchup = max_catchup
+        self.tasks: List[Task] = []
+        self._running = False
+
+    def add(self, name: str, rate: float, fn: Callable, fixed_step: bool = False) -> Task:
+        task = Task(name, rate, fn, fixed_step)
+        self.tasks.append(task)
+        return task
+
+    def run(self):
+        """Run forever (until stop())"""
+        self._running = True
+        now = self.clock()
+        for task in self.tasks:
+            task.due = now
+        while self._running:
+            delay = self.run_pending() - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+    def stop(self):
+        self._running = False
+
+    def run_pending(self) -> float:
+        """Run every task that is due; returns the time the next one is due"""
+        for task in self.tasks:
+            now = self.clock()
+            if now >= task.due:
+                self._run(task, now)
+        return min(task.due for task in self.tasks)
+
+    def _run(self, task: Task, now: float):
+        lag = now - task.due
+        behind = int(lag // task.period)  # whole periods missed
+        steps, skipped = 1, behind
+        if task.fixed_step:
+            steps = min(behind + 1, self.max_catchup)
+            skipped = behind + 1 - steps
+
+        started = now
+        try:
+            for _ in range(steps):
+                task.fn(task.period) if task.fixed_step else task.fn()
+        except Exception as e:
+            print(f'[SCHED] {task.name} failed: {e}')
+        elapsed = self.clock() - started
+        task.runs += steps
+        # next deadline on the original grid, after any skipped periods
+        task.due += (behind + 1) * task.period
+
+        if self.registry is not None:
+            self.registry.observe('tick_task_seconds', elapsed, task=task.name)
+            self.registry.observe('tick_lag_seconds', lag, task=task.name)
+            if elapsed > task.period * steps:
+                self.registry.inc('tick_overruns_total', task=task.name)
+            if skipped:
+                self.registry.inc('tick_skipped_total', skipped, task=task.name)
@@ -0,0 +1,93 @@
+import json
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from services.metrics import MetricsRegistry
+from services.socket_transport import RawJSON
+
+# ETags embed a per-process id, so versions restarting at 0 after a restart never match old tags
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class Snapshot:
+    """One serialized payload: ETag, JSON text (for Socket.IO) and UTF-8 body (for HTTP)"""
+
+    __slots__ = ('version', 'etag', 'text', 'body')
+
+    def __init__(self, version: Any, etag: str, text: str):
+        self.version = version
+        self.etag = etag
+        self.text = text
+        self.body = text.encode()
+
+    def raw(self) -> RawJSON:
+        return RawJSON(self.text)
+
+
+class SnapshotCache:
+    """Collection payloads serialized once per version of the collection.
+
+    Each collection is registered with a builder (returning the JSON-able
+    payload) and a version getter; owners bump the version on every mutation.
+    get() returns the cached Snapshot while the version is unchanged, so a
+    burst of reconnecting consoles costs one to_dict() pass, not one each.
+    Builder keyword arguments (path limit, zoom) select variants, kept in a
+    small LRU.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, max_variants: int = 64,
+                 dumps: Optional[Callable[[Any], str]] = None):
+        self.registry = registry
+        self.max_variants = max_variants
+        self.dumps = dumps or (lambda obj: json.dumps(obj, separators=(',', ':')))
+        self._collections: Dict[str, Tuple[Callable[..., Any], Callable[[], Any]]] = {}
+        self._entries: 'OrderedDict[Hashable, Snapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, build: Callable[..., Any], version: Callable[[], Any]):
+        self._collections[name] = (build, version)
+
+    @staticmethod
+    def _key(name: str, args: Dict) -> Hashable:
+        return (name,) + tuple(sorted(args.items()))
+
+    def _etag(self, key: Hashable, version: Any) -> str:
+        return f'{BOOT_ID}-{zlib.crc32(repr(key).encode()):08x}-{version}'
+
+    def get(self, name: str, **args) -> Snapshot:
+        build, version_of = self._collections[name]
+        key = self._key(name, args)
+        version = version_of()
+        snapshot = self._entries.get(key)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:  # one rebuild per version, however many requests are waiting
+            snapshot = self._entries.get(key)
+            if snapshot is None or snapshot.version != version:
+                text = self.dumps(build(**args))
+                snapshot = Snapshot(version, self._etag(key, version), text)
+                self._store(key, snapshot)
+                if self.registry is not None:
+                    self.registry.inc('snapshot_builds_total', collection=name)
+            return snapshot
+
+    def revalidate(self, name: str, fetch: Callable[[Optional[str]], Tuple[str, Optional[str]]], **args) -> Snapshot:
+        """Web worker side: fetch(known_etag) -> (etag, text, or None when known_etag is current)"""
+        key = self._key(name, args)
+        snapshot = self._entries.get(key)
+        etag, text = fetch(snapshot.etag if snapshot is not None else None)
+        if text is None and snapshot is not None:
+            return snapshot
+        snapshot = Snapshot(etag, etag, text)
+        with self._lock:
+            self._store(key, snapshot)
+        return snapshot
+
+    def _store(self, key: Hashable, snapshot: Snapshot):
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_variants:
+            self._entries.popitem(last=False)
@@ -0,0 +1,30 @@
+import threading
+
+
+class RawJSON:
+    """Already-serialized JSON; PacketSizeJSON splices it into Socket.IO packets verbatim"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def serialize_packet_sends(server):
+    """Make every Socket.IO packet reach a client as one contiguous run of messages.
+
+    A packet with binary attachments (video frames, keypoints) is sent as a
+    text header followed by one message per attachment. When several threads
+    emit at once those messages can interleave, and the client then treats
+    another packet's bytes as the pending attachment and drops or garbles
+    frames. Holding a lock around each packet's sends keeps them together;
+    the sends only enqueue, so the lock is held briefly.
+    """
+    lock = threading.Lock()
+    send_packet = server._send_packet
+
+    def send_packet_locked(eio_sid, pkt):
+        with lock:
+            send_packet(eio_sid, pkt)
+
+    server._send_packet = send_packet_locked
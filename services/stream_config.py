@@ -0,0 +1,66 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    """One output encoding of a stream; each tier is encoded once per frame"""
+    name: str
+    max_width: int
+    jpeg_quality: int
+
+
+DEFAULT_TIERS = (
+    QualityTier('high', 640, 75),
+    QualityTier('medium', 480, 60),
+    QualityTier('low', 320, 40),
+)
+
+
+@dataclass
+class StreamSettings:
+    """Pipeline knobs shared by thread and worker-process stream modes"""
+    emit_fps: float = 10
+    max_width: int = 640  # processing (ORB) width; tiers scale down from here
+    tiers: Tuple[QualityTier, ...] = DEFAULT_TIERS
+    keypoint_channel: bool = False  # send packed keypoints instead of drawing them into the JPEG
+    frame_cache_bytes: int = 0  # processed-frame cache for looping clips, per process (0 = off)
+
+
+def check_process_map(groups: Sequence[Sequence[int]], stream_count: int):
+    """Raise ValueError unless every stream 0..stream_count-1 is assigned to exactly one worker"""
+    assigned = [s for group in groups for s in group]
+    out_of_range = sorted({s for s in assigned if not 0 <= s < stream_count})
+    repeated = sorted({s for s in assigned if assigned.count(s) > 1})
+    missing = sorted(set(range(stream_count)) - set(assigned))
+    problems = []
+    if out_of_range:
+        problems.append(f'unknown streams {out_of_range} (valid: 0-{stream_count - 1})')
+    if repeated:
+        problems.append(f'streams {repeated} assigned more than once')
+    if missing:
+        problems.append(f'streams {missing} not assigned to any worker')
+    if problems:
+        raise ValueError(f"Invalid ORB_PROCESS_MAP {';'.join(','.join(map(str, g)) for g in groups)!r}: "
+                         + '; '.join(problems))
+
+
+def parse_process_map(spec: Optional[str], stream_count: int) -> List[List[int]]:
+    """'0,1;2,3' -> [[0, 1], [2, 3]]; default is one process per stream, capped at CPU count.
+
+    A given map must name every stream exactly once (ValueError otherwise).
+    """
+    if spec:
+        try:
+            groups = [[int(s) for s in group.split(',') if s.strip()] for group in spec.split(';')]
+        except ValueError:
+            raise ValueError(f'Invalid ORB_PROCESS_MAP {spec!r}: expected stream ids like "0,1;2,3"') from None
+        groups = [g for g in groups if g]
+        check_process_map(groups, stream_count)
+        return groups
+    workers = max(1, min(stream_count, os.cpu_count() or 1))
+    groups = [[] for _ in range(workers)]
+    for stream_id in range(stream_count):
+        groups[stream_id % workers].append(stream_id)
+    return groups
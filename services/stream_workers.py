@@ -0,0 +1,199 @@
+import multiprocessing as mp
+import signal
+import struct
+import sys
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.orb_pipeline import StreamSettings, run_stream
+from services.stream_config import check_process_map, parse_process_map
+
+SLOT_HEADER = struct.Struct('<QI4x')  # sequence number, payload length
+DEFAULT_SLOTS = 4
+DEFAULT_SLOT_SIZE = 1 << 20  # 1 MiB per encoded frame
+
+_spawn_lock = threading.Lock()
+
+
+class SharedFrameRing:
+    """Fixed-size JPEG slots in one SharedMemory block (one writer, one reader).
+
+    The writer zeroes a slot's sequence number, copies the payload, then
+    publishes the real sequence number; the reader re-checks it after copying,
+    so a slot overwritten mid-read is dropped instead of torn.
+    """
+
+    def __init__(self, name: Optional[str] = None, slots: int = DEFAULT_SLOTS,
+                 slot_size: int = DEFAULT_SLOT_SIZE):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.stride = SLOT_HEADER.size + slot_size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * self.stride)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def write(self, seq: int, payload: bytes) -> Optional[int]:
+        """Store payload in the slot for `seq`; returns the slot or None if it does not fit"""
+        if len(payload) > self.slot_size:
+            return None
+        slot = seq % self.slots
+        offset = slot * self.stride
+        buf = self.shm.buf
+        SLOT_HEADER.pack_into(buf, offset, 0, 0)
+        start = offset + SLOT_HEADER.size
+        buf[start:start + len(payload)] = payload
+        SLOT_HEADER.pack_into(buf, offset, seq, len(payload))
+        return slot
+
+    def read(self, slot: int, seq: int) -> Optional[bytes]:
+        """Copy out the payload for `seq`, or None if the writer already reused the slot"""
+        offset = slot * self.stride
+        buf = self.shm.buf
+        current, length = SLOT_HEADER.unpack_from(buf, offset)
+        if current != seq:
+            return None
+        start = offset + SLOT_HEADER.size
+        payload = bytes(buf[start:start + length])
+        if SLOT_HEADER.unpack_from(buf, offset)[0] != seq:
+            return None
+        return payload
+
+    def close(self, unlink: bool = False):
+        try:
+            self.shm.close()
+        finally:
+            if unlink:
+                self.shm.unlink()
+
+
+def _worker_main(streams: Dict[int, str], ring_names: Dict[Tuple[int, str], str], settings: StreamSettings,
+                 demand, slots: int, slot_size: int, notify):
+    """Worker process entry: one thread per assigned stream, frames out through shared memory"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the whole group; the server stops us
+    rings = {key: SharedFrameRing(name, slots, slot_size) for key, name in ring_names.items()}
+    sequences = {stream_id: 0 for stream_id in streams}
+
+    def on_frame(stream_id: int, encoded: Dict[str, bytes], meta: dict):
+        sequences[stream_id] += 1
+        seq = sequences[stream_id]
+        placed = {}
+        for tier, jpeg in encoded.items():
+            slot = rings[(stream_id, tier)].write(seq, jpeg)
+            if slot is None:
+                print(f"[ORB-{stream_id}] {tier} frame of {len(jpeg)} bytes exceeds shared slot size")
+                continue
+            placed[tier] = slot
+        if placed:
+            notify.put((stream_id, seq, placed, meta))
+
+    threads = [threading.Thread(target=run_stream, args=(stream_id, path, settings, on_frame, demand),
+                                daemon=True, name=f"ORB-Stream-{stream_id}")
+               for stream_id, path in streams.items()]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+@contextmanager
+def _worker_bootstrap():
+    """Present this module as __main__ while workers are spawned.
+
+    A spawned child imports the parent's __main__ (app.py) as __mp_main__
+    before running its target, which would repeat the whole server setup
+    (monkey patching, Socket.IO, bus, telemetry store) in every worker.
+    With this module standing in, a worker imports only the ORB pipeline.
+    """
+    with _spawn_lock:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = sys.modules[__name__]
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+class StreamWorkerPool:
+    """Runs stream processing in worker processes; the web process only fans out bytes"""
+
+    def __init__(self, video_paths: List[str], settings: StreamSettings, demand=None,
+                 process_map: Optional[List[List[int]]] = None,
+                 slots: int = DEFAULT_SLOTS, slot_size: int = DEFAULT_SLOT_SIZE):
+        self.video_paths = video_paths
+        self.settings = settings
+        self.demand = demand
+        self.process_map = process_map or parse_process_map(None, len(video_paths))
+        check_process_map(self.process_map, len(video_paths))
+        self.slots = slots
+        self.slot_size = slot_size
+        self.rings: Dict[Tuple[int, str], SharedFrameRing] = {}
+        self.processes: List[mp.Process] = []
+        self._stopped = False
+        self._ctx = mp.get_context('spawn')  # never fork the Flask/Socket.IO process
+        self._notify = self._ctx.Queue()
+
+    def start(self, on_frame: Callable[[int, Dict[str, bytes], dict], None],
+              spawn: Optional[Callable] = None, offload: Optional[Callable] = None):
+        """Start the workers; `spawn` starts the fan-out task (a thread by default) and
+        `offload` runs its blocking queue reads under an async server"""
+        for stream_id in range(len(self.video_paths)):
+            for tier in self.settings.tiers:
+                self.rings[(stream_id, tier.name)] = SharedFrameRing(slots=self.slots, slot_size=self.slot_size)
+
+        for n, stream_ids in enumerate(self.process_map):
+            streams = {s: self.video_paths[s] for s in stream_ids}
+            ring_names = {key: ring.name for key, ring in self.rings.items() if key[0] in streams}
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(streams, ring_names, self.settings, self.demand, self.slots, self.slot_size, self._notify),
+                daemon=True, name=f"ORB-Worker-{n}")
+            with _worker_bootstrap():
+                process.start()
+            self.processes.append(process)
+            print(f"[ORB] Worker {n} (pid {process.pid}) handles streams {list(streams)}")
+
+        if spawn:
+            spawn(self._drain, on_frame, offload)
+        else:
+            threading.Thread(target=self._drain, args=(on_frame,), daemon=True, name="ORB-Fanout").start()
+
+    def _drain(self, on_frame: Callable[[int, Dict[str, bytes], dict], None], offload: Optional[Callable] = None):
+        """Read frame notifications and hand the shared-memory bytes to on_frame"""
+        while True:
+            try:
+                stream_id, seq, placed, meta = offload(self._notify.get) if offload else self._notify.get()
+            except (EOFError, OSError):
+                return
+            if self._stopped:
+                return
+            encoded = {}
+            for tier, slot in placed.items():
+                jpeg = self.rings[(stream_id, tier)].read(slot, seq)
+                if jpeg is not None:  # None: slot already reused, a newer frame is queued
+                    encoded[tier] = jpeg
+            if not encoded:
+                continue
+            try:
+                on_frame(stream_id, encoded, meta)
+            except Exception as e:
+                print(f"[ORB-{stream_id}] Emit error: {e}")
+
+    def stop(self):
+        """Terminate the workers and unlink the shared memory; safe to call more than once"""
+        if self._stopped:
+            return
+        self._stopped = True
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout=5)
+        for ring in self.rings.values():
+            try:
+                ring.close(unlink=True)
+            except (BufferError, FileNotFoundError) as e:
+                print(f"[ORB] Could not release shared frame ring {ring.name}: {e}")
+        print(f"[ORB] Stopped {len(self.processes)} stream workers")
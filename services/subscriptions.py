@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from services.video_tiers import StreamDemand
+
+TOPICS = ('telemetry', 'alerts', 'video_feeds')
+
+
+class TopicSubscriptions:
+    """Which Socket.IO clients want which broadcast topics.
+
+    Each topic maps to a Socket.IO room of the same name; the counts here let
+    the broadcaster skip building payloads nobody is subscribed to.
+    """
+
+    def __init__(self, topics: Iterable[str] = TOPICS):
+        self.topics = tuple(topics)
+        self._subscribers: Dict[str, Set[str]] = {topic: set() for topic in self.topics}
+        self._lock = threading.Lock()
+
+    def subscribe(self, sid: str, topics: Iterable[str]) -> List[str]:
+        """Add sid to each known topic; returns the topics it newly joined"""
+        joined = []
+        with self._lock:
+            for topic in topics:
+                members = self._subscribers.get(topic)
+                if members is not None and sid not in members:
+                    members.add(sid)
+                    joined.append(topic)
+        return joined
+
+    def unsubscribe(self, sid: str, topics: Iterable[str]) -> List[str]:
+        """Remove sid from each topic; returns the topics it actually left"""
+        left = []
+        with self._lock:
+            for topic in topics:
+                members = self._subscribers.get(topic)
+                if members is not None and sid in members:
+                    members.discard(sid)
+                    left.append(topic)
+        return left
+
+    def drop(self, sid: str):
+        """Forget a disconnected client"""
+        self.unsubscribe(sid, self.topics)
+
+    def topics_of(self, sid: str) -> List[str]:
+        return [topic for topic in self.topics if sid in self._subscribers[topic]]
+
+    def count(self, topic: str) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+
+class WorkerDemand:
+    """Consumer counts reported by web workers, summed on the producer.
+
+    Each report replaces that worker's previous one. Stream counts are folded
+    into the producer's StreamDemand as deltas, so its own viewers
+    (APP_ROLE=all) and remote ones add up; a worker that has not reported for
+    `expire_after` seconds is dropped so a crashed worker does not keep
+    streams running.
+    """
+
+    def __init__(self, demand: StreamDemand, expire_after: float = 5.0):
+        self.demand = demand
+        self.expire_after = expire_after
+        self.reports: Dict[str, dict] = {}
+        self.applied = [0] * (demand.streams * demand.tiers)
+        self.mjpeg = [0] * len(self.applied)
+        self.topics: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def report(self, worker: str, streams: List[int], mjpeg: List[int], topics: Dict[str, int],
+               now: Optional[float] = None):
+        with self._lock:
+            self.reports[worker] = {'at': time.time() if now is None else now,
+                                    'streams': streams, 'mjpeg': mjpeg, 'topics': topics}
+            self._apply()
+
+    def expire(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            stale = [w for w, r in self.reports.items() if now - r['at'] > self.expire_after]
+            for worker in stale:
+                print(f'[BUS] Web worker {worker} stopped reporting, dropping its demand')
+                del self.reports[worker]
+            if stale:
+                self._apply()
+
+    def topic_count(self, topic: str) -> int:
+        return self.topics.get(topic, 0)
+
+    def mjpeg_count(self, stream_id: int, tier_index: int) -> int:
+        return self.mjpeg[stream_id * self.demand.tiers + tier_index]
+
+    def _apply(self):
+        size = len(self.applied)
+        streams, mjpeg, topics = [0] * size, [0] * size, {}
+        for report in self.reports.values():
+            for i, n in enumerate(report['streams'][:size]):
+                streams[i] += n
+            for i, n in enumerate(report['mjpeg'][:size]):
+                mjpeg[i] += n
+            for topic, n in report['topics'].items():
+                topics[topic] = topics.get(topic, 0) + n
+        for i, (new, old) in enumerate(zip(streams, self.applied)):
+            if new != old:
+                self.demand.add(i // self.demand.tiers, i % self.demand.tiers, new - old)
+        self.applied, self.mjpeg, self.topics = streams, mjpeg, topics
@@ -0,0 +1,308 @@
+import math
+import os
+import re
+from bisect import bisect_left, bisect_right
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.uav import MissionStatus
+
+# Fixed-width record, one per UAV per tick; 41 bytes
+RECORD_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('lat', '<f8'),
+    ('lon', '<f8'),
+    ('altitude', '<f4'),
+    ('speed', '<f4'),
+    ('heading', '<f4'),
+    ('battery', '<f4'),
+    ('status', 'u1'),
+])
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('record_size', '<u4'),
+    ('capacity', '<u8'),
+    ('count', '<u8'),
+    ('start', '<f8'),
+    ('pad', 'V28'),
+])  # 64 bytes
+MAGIC = b'UAVTRK01'
+STATUSES = list(MissionStatus)
+STATUS_INDEX = {status: i for i, status in enumerate(STATUSES)}
+STATUS_NAMES = [status.value for status in STATUSES] + [None] * (256 - len(STATUSES))
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class TrackSegment:
+    """One UAV's records for one time partition, memory-mapped.
+
+    A 64-byte header followed by `capacity` fixed-width records. The file is
+    created sparse at full size, so disk use grows with the records actually
+    written and the mapping never has to be resized. The writer stores a
+    record before bumping `count`, so readers only ever see complete records.
+    """
+
+    def __init__(self, path: str, capacity: int = 0, start: float = 0.0, writable: bool = False):
+        self.path = path
+        if writable and not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize)
+            raw = np.memmap(path, np.uint8, mode='r+')
+            header = raw[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+            header['magic'], header['record_size'] = MAGIC, RECORD_DTYPE.itemsize
+            header['capacity'], header['count'], header['start'] = capacity, 0, start
+        else:
+            raw = np.memmap(path, np.uint8, mode='r+' if writable else 'r')
+        self.raw = raw
+        # plain ndarray views of the mapping: indexing a memmap subclass costs several times more
+        self.header = np.asarray(raw[:HEADER_DTYPE.itemsize]).view(HEADER_DTYPE)
+        if self.header['magic'][0] != MAGIC or self.header['record_size'][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f'{path} is not a telemetry segment')
+        self.capacity = int(self.header['capacity'][0])
+        self.records = np.asarray(raw[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + self.capacity * RECORD_DTYPE.itemsize]) \
+            .view(RECORD_DTYPE)
+
+    @property
+    def count(self) -> int:
+        return int(self.header['count'][0])
+
+    def valid(self) -> np.ndarray:
+        return self.records[:self.count]
+
+    def append(self, row: Tuple) -> bool:
+        """Store one record; False when the segment is full"""
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.records[i] = row
+        self.header['count'] = i + 1
+        return True
+
+    def extend(self, rows: np.ndarray) -> int:
+        """Store as many of `rows` as fit; returns how many were written"""
+        i = self.count
+        n = min(len(rows), self.capacity - i)
+        self.records[i:i + n] = rows[:n]
+        self.header['count'] = i + n
+        return n
+
+    def flush(self):
+        self.raw.flush()
+
+
+class TelemetryStore:
+    """Append-only telemetry history on disk, for after-action review.
+
+    Layout: <root>/<partition start, UTC>/<uav_id>.<part>.trk. Each partition
+    covers `segment_seconds`; a segment holds up to `segment_seconds * max_rate`
+    records and spills into the next part when full. Queries binary-search the
+    timestamp column of the memory-mapped segments and read only the records
+    they return, so a day-long track costs a few page faults, not a full load.
+    """
+
+    def __init__(self, root: str, segment_seconds: int = 3600, max_rate: float = 2.0,
+                 retain_seconds: Optional[float] = None, open_segments: int = 4096):
+        self.root = root
+        self.segment_seconds = segment_seconds
+        self.capacity = int(segment_seconds * max_rate)
+        self.retain_seconds = retain_seconds
+        self.open_segments = open_segments
+        self._writers: Dict[str, Tuple[int, TrackSegment]] = {}  # uav_id -> (partition, segment)
+        self._readers: 'OrderedDict[str, TrackSegment]' = OrderedDict()
+        self._partition: Optional[int] = None
+        self._dirs: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def partition_of(self, ts: float) -> int:
+        return int(ts // self.segment_seconds) * self.segment_seconds
+
+    def _partition_dir(self, start: int) -> str:
+        path = self._dirs.get(start)
+        if path is None:
+            path = self._dirs[start] = os.path.join(self.root, time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(start)))
+        return path
+
+    def _segment_path(self, start: int, uav_id: str, part: int) -> str:
+        return os.path.join(self._partition_dir(start), f'{_UNSAFE.sub("_", uav_id)}.{part}.trk')
+
+    def append(self, uav_id: str, ts: float, lat: float, lon: float, altitude: float, speed: float,
+               heading: float, battery: float, status: MissionStatus):
+        row = (ts, lat, lon, altitude, speed, heading, battery, STATUS_INDEX.get(status, 0))
+        if not self._writer(uav_id, ts).append(row):
+            self._writers.pop(uav_id, None)  # full: the next writer opens a new part
+            self._writer(uav_id, ts).append(row)
+
+    def append_fleet(self, uavs: Iterable, ts: Optional[float] = None):
+        """One record per UAV for this tick"""
+        ts = time.time() if ts is None else ts
+        for uav in uavs:
+            self.append(uav.id, ts, uav.lat, uav.lon, uav.altitude, uav.current_speed, uav.heading,
+                        uav.battery_level, uav.mission_status)
+
+    def extend(self, uav_id: str, rows: np.ndarray):
+        """Bulk append (imports, backfill); `rows` is a RECORD_DTYPE array in time order"""
+        partitions = rows['ts'] // self.segment_seconds
+        for chunk in np.split(rows, np.flatnonzero(np.diff(partitions)) + 1):
+            while len(chunk):
+                chunk = chunk[self._writer(uav_id, float(chunk['ts'][0])).extend(chunk):]
+                if len(chunk):
+                    self._writers.pop(uav_id, None)
+
+    def _writer(self, uav_id: str, ts: float) -> TrackSegment:
+        start = self.partition_of(ts)
+        current = self._writers.get(uav_id)
+        if current is not None and current[0] == start:
+            return current[1]
+        with self._lock:
+            if start != self._partition:
+                self._roll(start)
+            os.makedirs(self._partition_dir(start), exist_ok=True)
+            # continue in the newest part of this partition (after a restart), or open the next one when it is full
+            part, segment = self._last_part(start, uav_id), None
+            if part >= 0:
+                segment = TrackSegment(self._segment_path(start, uav_id, part), writable=True)
+                if segment.count >= segment.capacity:
+                    segment = None
+            if segment is None:
+                part += 1
+                segment = TrackSegment(self._segment_path(start, uav_id, part), self.capacity, start, writable=True)
+            self._writers[uav_id] = (start, segment)
+            self._readers[segment.path] = segment  # queries read the live mapping
+            return segment
+
+    def _parts(self, start: int, uav_id: str) -> List[str]:
+        """Segment paths of one UAV in one partition; parts are numbered without gaps"""
+        paths = []
+        while True:
+            path = self._segment_path(start, uav_id, len(paths))
+            if not os.path.exists(path):
+                return paths
+            paths.append(path)
+
+    def _last_part(self, start: int, uav_id: str) -> int:
+        return len(self._parts(start, uav_id)) - 1
+
+    def _roll(self, start: int):
+        """New partition: flush and forget the previous writers, apply retention"""
+        for _, segment in self._writers.values():
+            segment.flush()
+        self._writers.clear()
+        self._partition = start
+        if self.retain_seconds:
+            self.prune(start - self.retain_seconds)
+
+    def prune(self, before: float):
+        """Delete partitions that end before `before`"""
+        for start, path in self.partitions():
+            if start + self.segment_seconds > before:
+                break
+            for name in os.listdir(path):
+                self._readers.pop(os.path.join(path, name), None)
+                os.remove(os.path.join(path, name))
+            os.rmdir(path)
+            print(f'[STORE] Pruned partition {os.path.basename(path)}')
+
+    def partitions(self) -> List[Tuple[int, str]]:
+        """(start, directory) of every partition on disk, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            try:
+                start = int(datetime.strptime(name, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc).timestamp())
+            except ValueError:
+                continue
+            found.append((start, os.path.join(self.root, name)))
+        return sorted(found)
+
+    def _segments(self, uav_id: str, start: float, end: float) -> List[TrackSegment]:
+        first = self.partition_of(start)
+        if (end - first) / self.segment_seconds <= 1000:
+            candidates = range(first, int(end) + 1, self.segment_seconds)
+        else:  # open-ended range: only look at partitions that exist
+            candidates = [p for p, _ in self.partitions() if first <= p <= end]
+        return [self._open(path) for partition in candidates for path in self._parts(partition, uav_id)]
+
+    def _open(self, path: str) -> TrackSegment:
+        """Segment from an LRU of open mappings; files are fixed-size, so a mapping never goes stale"""
+        with self._lock:
+            segment = self._readers.get(path)
+            if segment is not None:
+                self._readers.move_to_end(path)
+                return segment
+            segment = TrackSegment(path)
+            self._readers[path] = segment
+            while len(self._readers) > self.open_segments:
+                self._readers.popitem(last=False)
+            return segment
+
+    def query(self, uav_id: str, start: float, end: float, max_points: int = 1000) -> Dict:
+        """Records of `uav_id` with start <= ts <= end, evenly decimated to at most max_points.
+
+        Decimation picks evenly spaced record indices across the whole range
+        (first and last always included), so the cost depends on max_points,
+        not on how many records the range holds.
+        """
+        ranges = []
+        for segment in self._segments(uav_id, start, end):
+            records = segment.valid()
+            ts = records['ts']  # strided view; bisect touches ~log2(n) pages where searchsorted would copy it
+            i0 = bisect_left(ts, start)
+            i1 = bisect_right(ts, end)
+            if i1 > i0:
+                ranges.append((records, i0, i1))
+        total = sum(i1 - i0 for _, i0, i1 in ranges)
+
+        chunks = []
+        if total <= max_points:
+            chunks = [records[i0:i1] for records, i0, i1 in ranges]
+        elif max_points > 0:
+            wanted = np.unique(np.linspace(0, total - 1, max_points).round().astype(np.int64))
+            offset = 0
+            for records, i0, i1 in ranges:
+                n = i1 - i0
+                lo, hi = np.searchsorted(wanted, [offset, offset + n])
+                if hi > lo:
+                    chunks.append(records[i0 + wanted[lo:hi] - offset])
+                offset += n
+        out = np.concatenate(chunks) if chunks else np.empty(0, RECORD_DTYPE)
+
+        return {
+            'uav_id': uav_id,
+            'from': start,
+            'to': end,
+            'count': total,
+            'returned': len(out),
+            'ts': out['ts'].tolist(),
+            'lat': out['lat'].round(6).tolist(),
+            'lon': out['lon'].round(6).tolist(),
+            # float32 columns are widened first, or rounding leaves float32 noise (1290.199951171875)
+            'altitude': out['altitude'].astype(np.float64).round(1).tolist(),
+            'speed': out['speed'].astype(np.float64).round(1).tolist(),
+            'heading': out['heading'].astype(np.float64).round(1).tolist(),
+            'battery_level': out['battery'].astype(np.float64).round(1).tolist(),
+            'mission_status': [STATUS_NAMES[i] for i in out['status'].tolist()],
+        }
+
+    def flush(self):
+        for _, segment in list(self._writers.values()):
+            segment.flush()
+
+
+def parse_timestamp(value: Optional[str], default: Optional[float]) -> Optional[float]:
+    """Epoch seconds or ISO-8601 (naive times are local, like the rest of the app)"""
+    if value is None or value == '':
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+    if not math.isfinite(seconds):
+        raise ValueError(f'Timestamp must be finite: {value}')
+    return seconds
+
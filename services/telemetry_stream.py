@@ -0,0 +1,233 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.fleet_engine import STATUS_CODES, STATUS_INDEX, THREAT_INDEX, THREAT_LEVELS
+
+# Track history is diffed by its appended tail rather than by value
+PATH_FIELD = 'path_history'
+# Advances on every update, so it travels once per delta instead of per UAV
+CONTACT_FIELD = 'last_contact'
+
+
+class TelemetryDeltaEncoder:
+    """Encode successive fleet snapshots as keyframes and field-level deltas.
+
+    Every encoded frame carries a monotonically increasing ``seq``. A delta
+    holds only the fields that changed since the previous frame plus any path
+    points appended since then; clients apply it on top of their copy and
+    request a resync (a fresh keyframe) if they ever see a gap in ``seq``.
+    ``last_contact`` is not diffed: a delta's ``contact`` applies to every
+    UAV outside the held set, the UAVs whose contact stopped advancing
+    (paused or in an emergency). Keyframes carry the set as ``contact_held``
+    and deltas only its changes, ``contact_hold`` and ``contact_release``.
+    """
+
+    def __init__(self, keyframe_interval: int = 30, path_points: int = 100):
+        self.keyframe_interval = keyframe_interval
+        self.path_points = path_points
+        self.seq = 0
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._contacts: Dict[str, Any] = {}  # raw last_contact, _state holds what clients see
+        self._held: set = set()
+        self._since_keyframe = 0
+        self._lock = threading.Lock()
+
+    def encode(self, uavs_data: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Return (event name, payload) for the next broadcast"""
+        with self._lock:
+            self.seq += 1
+            force_keyframe = not self._state or self._since_keyframe >= self.keyframe_interval
+
+            changed: Dict[str, Dict[str, Any]] = {}
+            added: List[Dict[str, Any]] = []
+            held = set()
+            hold: List[str] = []
+            seen = set()
+            # Newest contact in the frame; with the object engine UAVs are stamped
+            # microseconds apart, so rounding the rest up to it loses nothing
+            contact = max((uav.get(CONTACT_FIELD) or 0 for uav in uavs_data), default=0)
+
+            for uav in uavs_data:
+                uav_id = uav['id']
+                seen.add(uav_id)
+                path = [(round(lat, 6), round(lon, 6)) for lat, lon in uav[PATH_FIELD][-self.path_points:]]
+                previous = self._state.get(uav_id)
+                raw_contact = uav.get(CONTACT_FIELD)
+                advanced = raw_contact != self._contacts.get(uav_id)
+                self._contacts[uav_id] = raw_contact
+
+                current = dict(uav)
+                current[PATH_FIELD] = path
+                if previous is not None:
+                    if not advanced:
+                        held.add(uav_id)
+                        if uav_id not in self._held:
+                            hold.append(uav_id)
+                    if not force_keyframe:
+                        current[CONTACT_FIELD] = contact if advanced else previous.get(CONTACT_FIELD)
+                self._state[uav_id] = current
+
+                if previous is None:
+                    added.append(current)
+                    continue
+                if force_keyframe:
+                    continue
+
+                diff = {key: value for key, value in uav.items()
+                        if key not in (PATH_FIELD, CONTACT_FIELD) and previous.get(key) != value}
+                self._diff_path(previous[PATH_FIELD], path, diff)
+                if diff:
+                    changed[uav_id] = diff
+
+            removed = [uav_id for uav_id in self._state if uav_id not in seen]
+            for uav_id in removed:
+                del self._state[uav_id]
+                del self._contacts[uav_id]
+            release = [uav_id for uav_id in self._held if uav_id not in held and uav_id in seen]
+            self._held = held
+
+            if force_keyframe:
+                self._since_keyframe = 0
+                return 'telemetry_keyframe', self._keyframe()
+
+            self._since_keyframe += 1
+            delta = {'seq': self.seq, 'ts': time.time(), 'contact': contact, 'uavs': changed}
+            if hold:
+                delta['contact_hold'] = hold
+            if release:
+                delta['contact_release'] = release
+            if added:
+                delta['added'] = added
+            if removed:
+                delta['removed'] = removed
+            return 'telemetry_delta', delta
+
+    def keyframe(self) -> Dict[str, Any]:
+        """Full state as of the last encoded frame, for new or resyncing clients"""
+        with self._lock:
+            return self._keyframe()
+
+    def _keyframe(self) -> Dict[str, Any]:
+        return {
+            'seq': self.seq,
+            'ts': time.time(),
+            'path_points': self.path_points,
+            'contact_held': list(self._held),
+            'uavs': [dict(uav) for uav in self._state.values()]
+        }
+
+    def _diff_path(self, previous: List[Tuple[float, float]], path: List[Tuple[float, float]], diff: Dict[str, Any]):
+        """Add either the appended tail or a full replacement path to `diff`"""
+        if path == previous:
+            return
+        start = self._append_start(previous, path)
+        if start is None:
+            diff[PATH_FIELD] = path
+        else:
+            diff['path_append'] = path[start:]
+
+    @staticmethod
+    def _append_start(previous: List[Tuple[float, float]], path: List[Tuple[float, float]]) -> Optional[int]:
+        if not previous:
+            return None
+        tail = previous[-1]
+        for i in range(len(path) - 1, -1, -1):
+            if path[i] == tail:
+                return i + 1
+        return None
+
+
+class ColumnarTelemetry:
+    """Fixed-schema binary telemetry: the fleet's fast-changing fields as typed arrays.
+
+    A frame carries one little-endian array per type, column-major (every
+    UAV's lat, then every UAV's lon, ...), sent as Socket.IO binary
+    attachments so a browser reads them with Float64Array/Float32Array views
+    and no parsing. Rows follow the roster, the ordered list of UAV ids,
+    which is only sent when it changes. Static fields, waypoints and the
+    initial track come from the JSON keyframe; `path_total` tells the client
+    when the server has recorded a new track point. Nothing is rounded or
+    turned into per-UAV dicts, and with the vectorized engine the arrays are
+    read straight from its columns.
+    """
+
+    F64 = ('lat', 'lon')
+    F32 = ('altitude', 'speed', 'heading', 'battery_level', 'fuel_level')
+    U8 = ('mission_status', 'threat_level', 'paused')
+    U32 = ('path_total',)
+
+    def __init__(self):
+        self.seq = 0
+        self.roster = 0
+        self._ids: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def schema(cls) -> Dict[str, Any]:
+        return {
+            'f64': cls.F64, 'f32': cls.F32, 'u8': cls.U8, 'u32': cls.U32,
+            'mission_status': [status.value for status in STATUS_CODES],
+            'threat_level': THREAT_LEVELS,
+        }
+
+    def _columns(self, simulator):
+        engine = simulator.engine
+        if engine is not None:
+            n = engine.size
+            ids = [view.id for view in engine.views[:n]]
+            f64 = np.stack([engine.lat[:n], engine.lon[:n]])
+            f32 = np.stack([engine.alt[:n], engine.speed[:n], engine.heading[:n],
+                            engine.battery[:n], engine.fuel[:n]])
+            u8 = np.stack([engine.status[:n], engine.threat[:n], engine.paused[:n]])
+            u32 = engine.hist_total[:n]
+        else:
+            uavs = list(simulator.uavs.values())
+            ids = [uav.id for uav in uavs]
+            f64 = [[uav.lat for uav in uavs], [uav.lon for uav in uavs]]
+            f32 = [[uav.altitude for uav in uavs], [uav.current_speed for uav in uavs],
+                   [uav.heading for uav in uavs], [uav.battery_level for uav in uavs],
+                   [uav.fuel_level for uav in uavs]]
+            u8 = [[STATUS_INDEX[uav.mission_status] for uav in uavs],
+                  [THREAT_INDEX.get(uav.threat_level, 0) for uav in uavs],
+                  [uav.paused for uav in uavs]]
+            u32 = [uav.path_history.total for uav in uavs]
+        return (ids, np.asarray(f64, '<f8'), np.asarray(f32, '<f4'), np.asarray(u8, 'u1'),
+                np.asarray(u32, '<u4'))
+
+    def _update_roster(self, ids: List[str]) -> bool:
+        if ids == self._ids:
+            return False
+        self._ids = ids
+        self.roster += 1
+        return True
+
+    def encode(self, simulator) -> Dict[str, Any]:
+        """Next frame; includes `ids` when the roster changed since the previous one"""
+        ids, f64, f32, u8, u32 = self._columns(simulator)
+        with self._lock:
+            self.seq += 1
+            frame = {
+                'seq': self.seq,
+                'ts': time.time(),
+                'roster': self.roster,
+                'n': len(ids),
+                'f64': f64.tobytes(),
+                'f32': f32.tobytes(),
+                'u8': u8.tobytes(),
+                'u32': u32.tobytes(),
+            }
+            if self._update_roster(ids):
+                frame['roster'] = self.roster
+                frame['ids'] = ids
+        return frame
+
+    def roster_of(self, simulator) -> Dict[str, Any]:
+        """Current roster, for a client that is about to start receiving frames"""
+        engine = simulator.engine
+        ids = [view.id for view in engine.views[:engine.size]] if engine is not None else list(simulator.uavs)
+        with self._lock:
+            self._update_roster(ids)
+            return {'roster': self.roster, 'ids': ids}
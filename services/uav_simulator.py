@@ -1,13 +1,33 @@
 from typing import Dict, Optional
-from models.uav import UAV, UAVType
+from models.uav import UAV, UAVType, MissionStatus
+
+try:
+    from services.fleet_engine import FleetEngine
+except ImportError:  # NumPy not installed
+    FleetEngine = None
+
+# Statuses in which a UAV flies along its heading (loitering circles on the spot)
+MOVING_STATUSES = (MissionStatus.EN_ROUTE, MissionStatus.RETURNING, MissionStatus.RTB)
 
 class UAVSimulator:
-    def __init__(self):
+    def __init__(self, vectorized: bool = False):
         self.uavs: Dict[str, UAV] = {}
+        self.engine = None
+        self.version = 0  # bumped on every step and command, for cached snapshots
+
+        # Optional struct-of-arrays engine for large fleets
+        if vectorized:
+            if FleetEngine is None:
+                print("[SIM] NumPy not available, using per-object updates")
+            else:
+                self.engine = FleetEngine()
     
     def add_uav(self, uav_id: str, uav_type: UAVType, home_lat: float, home_lon: float, model: str = "Unknown") -> UAV:
         uav = UAV(uav_id, uav_type, home_lat, home_lon, model)
+        if self.engine is not None:
+            uav = self.engine.add(uav)
         self.uavs[uav_id] = uav
+        self.version += 1
         return uav
     
     def get_uav(self, uav_id: str) -> Optional[UAV]:
@@ -15,13 +35,38 @@ class UAVSimulator:
     
     def remove_uav(self, uav_id: str) -> bool:
         if uav_id in self.uavs:
+            if self.engine is not None:
+                self.engine.remove(self.uavs[uav_id])
             del self.uavs[uav_id]
+            self.version += 1
             return True
         return False
     
-    def update_all_uavs(self):
-        for uav in self.uavs.values():
-            uav.update()
+    def positions(self):
+        """(uavs, lats, lons) for batch checks; arrays come straight from the engine when vectorized"""
+        if self.engine is not None:
+            n = self.engine.size
+            return self.engine.views[:n], self.engine.lat[:n], self.engine.lon[:n]
+        uavs = list(self.uavs.values())
+        return uavs, [uav.lat for uav in uavs], [uav.lon for uav in uavs]
+    
+    def kinematics(self):
+        """(uavs, lats, lons, altitudes, speeds, headings, moving) for fleet-wide separation checks"""
+        if self.engine is not None:
+            return self.engine.kinematics()
+        uavs = list(self.uavs.values())
+        return (uavs, [uav.lat for uav in uavs], [uav.lon for uav in uavs], [uav.altitude for uav in uavs],
+                [uav.current_speed for uav in uavs], [uav.heading for uav in uavs],
+                [uav.mission_status in MOVING_STATUSES for uav in uavs])
+    
+    def update_all_uavs(self, dt: Optional[float] = None):
+        """Advance the fleet by `dt` seconds, or by the wall time since each UAV's last update"""
+        if self.engine is not None:
+            self.engine.step(dt=dt)
+        else:
+            for uav in self.uavs.values():
+                uav.update(dt)
+        self.version += 1  # after the step, so a snapshot taken mid-step is rebuilt
     
     def toggle_uav_pause(self, uav_id: str) -> bool:
         uav = self.get_uav(uav_id)
@@ -30,6 +75,7 @@ class UAVSimulator:
                 uav.resume()
             else:
                 uav.pause()
+            self.version += 1
             return True
         return False
     
@@ -37,6 +83,7 @@ class UAVSimulator:
         uav = self.get_uav(uav_id)
         if uav:
             uav.kill()
+            self.version += 1
             return True
         return False
     
@@ -44,5 +91,6 @@ class UAVSimulator:
         uav = self.get_uav(uav_id)
         if uav:
             uav.return_to_base()
+            self.version += 1
             return True
-        return False
+        return False
\ No newline at end of file
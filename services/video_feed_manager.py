@@ -33,6 +33,7 @@ class VideoFeed:
 class VideoFeedManager:
     def __init__(self):
         self.feeds: Dict[str, VideoFeed] = {}
+        self.version = 0  # bumped on every change, for cached snapshots
         self._init_demo_feeds()
     
     def _init_demo_feeds(self):
@@ -53,8 +54,8 @@ class VideoFeedManager:
         """Get all video feeds"""
         return [feed.to_dict() for feed in self.feeds.values()]
     
-    def update_feeds(self) -> List[Dict[str, Any]]:
-        """Update feed status and return current feeds"""
+    def update_feeds(self):
+        """Update feed status (serialize with get_all_feeds or the app's snapshot cache)"""
         for feed in self.feeds.values():
             feed.last_update = datetime.now()
             # Simulate occasional feed issues
@@ -62,5 +63,4 @@ class VideoFeedManager:
                 feed.status = "degraded"
             else:
                 feed.status = "active"
-        
-        return self.get_all_feeds()
+        self.version += 1
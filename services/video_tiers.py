@@ -0,0 +1,184 @@
+import multiprocessing as mp
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.stream_config import QualityTier
+
+
+class StreamDemand:
+    """Consumer counts per (stream, tier) in shared memory.
+
+    Updated by the web process as clients come and go; read by the stream
+    pipeline (thread or worker process) to decide which tiers to encode.
+    """
+
+    def __init__(self, streams: int, tiers: int, ctx=mp):
+        self.streams = streams
+        self.tiers = tiers
+        self.counts = ctx.RawArray('i', streams * tiers)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, stream_id: int, tier_index: int, delta: int):
+        if 0 <= stream_id < self.streams:
+            with self._lock:
+                self.counts[stream_id * self.tiers + tier_index] += delta
+
+    def count(self, stream_id: int, tier_index: Optional[int] = None) -> int:
+        base = stream_id * self.tiers
+        if tier_index is not None:
+            return self.counts[base + tier_index]
+        return sum(self.counts[base:base + self.tiers])
+
+    def snapshot(self) -> List[int]:
+        """Counts for every (stream, tier), stream-major"""
+        return list(self.counts)
+
+    def wanted(self, stream_id: int) -> List[int]:
+        """Tier indices of `stream_id` that currently have at least one consumer"""
+        base = stream_id * self.tiers
+        return [t for t in range(self.tiers) if self.counts[base + t] > 0]
+
+
+class ClientTier:
+    def __init__(self, tier_index: int):
+        self.tier_index = tier_index
+        self.streams = set()  # subscribed stream ids
+        self.explicit = False
+        self.latency: Optional[float] = None  # EWMA of ack latency, seconds
+        self.fast_acks = 0
+
+
+class TierSelector:
+    """Places each Socket.IO client on a quality tier.
+
+    Clients start on the top tier and move down when their smoothed frame
+    acknowledgment latency exceeds `degrade_above`; they move back up one
+    tier after `upgrade_acks` consecutive acks below `upgrade_below`. An
+    explicit tier request pins the client until it asks for 'auto' again.
+    Demand is only counted for the streams a client has subscribed to.
+    """
+
+    def __init__(self, tiers: Sequence[QualityTier], demand: StreamDemand,
+                 degrade_above: float = 0.4, upgrade_below: float = 0.15,
+                 upgrade_acks: int = 5, alpha: float = 0.3):
+        self.tiers = list(tiers)
+        self.demand = demand
+        self.degrade_above = degrade_above
+        self.upgrade_below = upgrade_below
+        self.upgrade_acks = upgrade_acks
+        self.alpha = alpha
+        self.clients: Dict[str, ClientTier] = {}
+        self._lock = threading.Lock()
+
+    def tier_index(self, name: str) -> Optional[int]:
+        for i, tier in enumerate(self.tiers):
+            if tier.name == name:
+                return i
+        return None
+
+    def add(self, sid: str) -> str:
+        with self._lock:
+            self.clients[sid] = ClientTier(0)
+        return self.tiers[0].name
+
+    def remove(self, sid: str) -> Optional[str]:
+        with self._lock:
+            client = self.clients.pop(sid, None)
+            if client is None:
+                return None
+            self._count(client, client.tier_index, -1)
+            return self.tiers[client.tier_index].name
+
+    def subscribe(self, sid: str, stream_id: int) -> Optional[str]:
+        """Start counting the client towards `stream_id`; returns its tier, or None if already subscribed"""
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None or stream_id in client.streams or not 0 <= stream_id < self.demand.streams:
+                return None
+            client.streams.add(stream_id)
+            self.demand.add(stream_id, client.tier_index, +1)
+            return self.tiers[client.tier_index].name
+
+    def unsubscribe(self, sid: str, stream_id: int) -> Optional[str]:
+        """Stop counting the client towards `stream_id`; returns its tier, or None if not subscribed"""
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None or stream_id not in client.streams:
+                return None
+            client.streams.discard(stream_id)
+            self.demand.add(stream_id, client.tier_index, -1)
+            return self.tiers[client.tier_index].name
+
+    def tier_of(self, sid: str) -> Optional[str]:
+        client = self.clients.get(sid)
+        return self.tiers[client.tier_index].name if client else None
+
+    def streams_of(self, sid: str) -> List[int]:
+        client = self.clients.get(sid)
+        return sorted(client.streams) if client else []
+
+    def request(self, sid: str, name: str) -> Optional[Tuple[str, str]]:
+        """Pin a client to a named tier ('auto' re-enables adaptation); returns (old, new) on change"""
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return None
+            if name == 'auto':
+                client.explicit = False
+                return None
+            index = self.tier_index(name)
+            if index is None:
+                return None
+            client.explicit = True
+            return self._move(client, index)
+
+    def record_ack(self, sid: str, sent_ts: float, now: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """Fold one ack into the client's latency estimate; returns (old, new) if its tier changed"""
+        now = time.time() if now is None else now
+        latency = max(0.0, now - sent_ts)
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return None
+            if client.latency is None:
+                client.latency = latency
+            else:
+                client.latency += self.alpha * (latency - client.latency)
+            if client.explicit:
+                return None
+
+            if client.latency > self.degrade_above and client.tier_index < len(self.tiers) - 1:
+                client.fast_acks = 0
+                return self._move(client, client.tier_index + 1)
+
+            if client.latency < self.upgrade_below and client.tier_index > 0:
+                client.fast_acks += 1
+                if client.fast_acks >= self.upgrade_acks:
+                    client.fast_acks = 0
+                    return self._move(client, client.tier_index - 1)
+            else:
+                client.fast_acks = 0
+            return None
+
+    def _move(self, client: ClientTier, index: int) -> Optional[Tuple[str, str]]:
+        old = client.tier_index
+        if old == index:
+            return None
+        self._count(client, old, -1)
+        self._count(client, index, +1)
+        client.tier_index = index
+        return self.tiers[old].name, self.tiers[index].name
+
+    def _count(self, client: ClientTier, tier_index: int, delta: int):
+        for stream_id in client.streams:
+            self.demand.add(stream_id, tier_index, delta)
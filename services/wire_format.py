@@ -0,0 +1,117 @@
+import json
+import struct
+from typing import Any, List
+
+from flask.json.provider import DefaultJSONProvider
+
+from services.socket_transport import RawJSON
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+WIRE_FORMATS = ('json', 'columnar')
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+# Bus message: JSON length, attachment count, tagged flag; then the JSON, then each attachment as length + bytes
+_MESSAGE_HEADER = struct.Struct('>IHB')
+_ATTACHMENT_HEADER = struct.Struct('>I')
+_BINARY_TAG = '__binary__'
+_RAW_TAG = '__raw_json__'
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text, through orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass  # something orjson does not take (e.g. ints beyond 64 bits); the stdlib does
+    return json.dumps(obj, separators=(',', ':'))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson, falling back to Flask's own for anything else"""
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        # jsonify() only ever passes separators (compact) or indent (debug)
+        if orjson is not None and set(kwargs) <= {'separators', 'indent'}:
+            option = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, option=option).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+
+def pack_message(obj: Any) -> bytes:
+    """Encode a process-bus message as JSON, without pickle.
+
+    bytes values anywhere in `obj` are replaced by {"__binary__": n} and
+    appended after the JSON as attachments, as Socket.IO does for binary
+    packets; RawJSON becomes {"__raw_json__": text} so it stays
+    pre-serialized on the receiving side. Tuples arrive as lists.
+    """
+    attachments: List[bytes] = []
+
+    def tag(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            attachments.append(bytes(value))
+            return {_BINARY_TAG: len(attachments) - 1}
+        if isinstance(value, RawJSON):
+            tagged.append(value)
+            return {_RAW_TAG: value.text}
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+    tagged: List[RawJSON] = []
+    text = None
+    if orjson is not None:
+        try:
+            text = orjson.dumps(obj, default=tag, option=_ORJSON_OPTIONS)
+        except TypeError:
+            attachments.clear()
+            tagged.clear()
+    if text is None:
+        text = json.dumps(obj, separators=(',', ':'), default=tag).encode()
+    parts = [_MESSAGE_HEADER.pack(len(text), len(attachments), bool(attachments or tagged)), text]
+    for data in attachments:
+        parts.append(_ATTACHMENT_HEADER.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def unpack_message(payload: bytes) -> Any:
+    """Decode pack_message() output; raises ValueError on anything malformed"""
+    try:
+        length, count, tagged = _MESSAGE_HEADER.unpack_from(payload, 0)
+        offset = _MESSAGE_HEADER.size
+        text = payload[offset:offset + length]
+        offset += length
+        attachments = []
+        for _ in range(count):
+            (size,) = _ATTACHMENT_HEADER.unpack_from(payload, offset)
+            offset += _ATTACHMENT_HEADER.size
+            attachments.append(payload[offset:offset + size])
+            offset += size
+    except struct.error as e:
+        raise ValueError(f'truncated bus message: {e}') from None
+    if len(text) != length or offset != len(payload):
+        raise ValueError('bus message length does not match its header')
+    if not tagged:
+        return orjson.loads(text) if orjson is not None else json.loads(text)
+
+    def untag(obj):
+        if len(obj) == 1:
+            if _BINARY_TAG in obj:
+                index = obj[_BINARY_TAG]
+                if not isinstance(index, int) or not 0 <= index < len(attachments):
+                    raise ValueError(f'bad attachment reference {index!r}')
+                return attachments[index]
+            if _RAW_TAG in obj and isinstance(obj[_RAW_TAG], str):
+                return RawJSON(obj[_RAW_TAG])
+        return obj
+
+    return json.loads(text, object_hook=untag)
@@ -13,6 +13,7 @@ class CommandInterface {
         this.showPaths = true;
         this.currentLayer = 'satellite';
         this.theme = 'day';
+        this.alertElements = new Map();  // alert id -> element, so updates replace and clears remove
         
         this.init();
     }
@@ -104,6 +105,11 @@ class CommandInterface {
             this.updateUAVs(data);
         });
         
+        // Keyframe + delta telemetry
+        this.telemetry = new TelemetryClient(this.socket, (uavs) => {
+            this.updateUAVs(uavs);
+        });
+        
         this.socket.on('alerts', (alerts) => {
             this.handleAlerts(alerts);
         });
@@ -396,14 +402,30 @@ class CommandInterface {
         if (!container) return;
         
         alerts.forEach(alert => {
+            // Alerts arrive on raise/escalate/clear (plus reminders); replace this alert's previous entry
+            const previous = alert.id && this.alertElements.get(alert.id);
+            if (previous) {
+                previous.remove();
+                this.alertElements.delete(alert.id);
+            }
+            if (alert.state === 'cleared') {
+                this.addLogEntry(alert.message, 'info');
+                return;
+            }
+            
             const alertElement = document.createElement('div');
             alertElement.className = `alert-item alert-${alert.severity}`;
             alertElement.textContent = alert.message;
             
             container.insertBefore(alertElement, container.firstChild);
+            if (alert.id) {
+                this.alertElements.set(alert.id, alertElement);
+            }
             
-            // Add to log
-            this.addLogEntry(`ALERT: ${alert.message}`, 'warning');
+            // Add to log (not for reminders or the snapshot sent on subscribe)
+            if (alert.state !== 'renotify' && alert.state !== 'active') {
+                this.addLogEntry(`ALERT: ${alert.message}`, 'warning');
+            }
         });
         
         // Keep only last 5 alerts
@@ -52,6 +52,11 @@ class UAVDashboard {
         this.socket.on('uav_update', (data) => {
             this.updateUAVs(data);
         });
+        
+        // Keyframe + delta telemetry
+        this.telemetry = new TelemetryClient(this.socket, (uavs) => {
+            this.updateUAVs(uavs);
+        });
     }
     
     initEventListeners() {
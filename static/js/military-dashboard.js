@@ -8,6 +8,7 @@ class MilitaryUAVDashboard {
         this.showPaths = true;
         this.currentLayer = 'dark';
         this.alerts = [];
+        this.alertElements = new Map();  // alert id -> element, so updates replace and clears remove
         this.missionLogs = [];
         
         this.init();
@@ -71,6 +72,11 @@ class MilitaryUAVDashboard {
             this.updateUAVs(data);
         });
         
+        // Keyframe + delta telemetry
+        this.telemetry = new TelemetryClient(this.socket, (uavs) => {
+            this.updateUAVs(uavs);
+        });
+        
         this.socket.on('mission_data', (data) => {
             this.updateMissions(data);
         });
@@ -370,6 +376,17 @@ class MilitaryUAVDashboard {
         const container = document.getElementById('alerts-container');
         
         alerts.forEach(alert => {
+            // Alerts arrive on raise/escalate/clear (plus reminders); replace this alert's previous entry
+            const previous = alert.id && this.alertElements.get(alert.id);
+            if (previous) {
+                previous.remove();
+                this.alertElements.delete(alert.id);
+            }
+            if (alert.state === 'cleared') {
+                this.addMissionLogEntry(alert.message, 'info');
+                return;
+            }
+            
             // Add to alerts array
             this.alerts.unshift(alert);
             
@@ -386,9 +403,14 @@ class MilitaryUAVDashboard {
             `;
             
             container.insertBefore(alertElement, container.firstChild);
+            if (alert.id) {
+                this.alertElements.set(alert.id, alertElement);
+            }
             
-            // Add to mission log
-            this.addMissionLogEntry(`ALERT: ${alert.message}`, 'warning');
+            // Add to mission log (not for reminders or the snapshot sent on subscribe)
+            if (alert.state !== 'renotify' && alert.state !== 'active') {
+                this.addMissionLogEntry(`ALERT: ${alert.message}`, 'warning');
+            }
         });
         
         // Keep only last 10 alerts
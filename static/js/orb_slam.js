@@ -1,14 +1,38 @@
 document.addEventListener("DOMContentLoaded", () => {
     const socket = io();
+    const overlayToggle = document.getElementById("orb-overlay-toggle");
 
-    // Listen for ORB-SLAM frames
-    socket.on("frame", (data) => {
-        if (data.id !== undefined && data.image) {
-            const feedIndex = data.id + 1; // backend sends 0-3, UI expects 1-4
+    // Listen for ORB-SLAM frames (binary JPEG, shown via blob URLs)
+    new VideoFeedClient(socket, (id, url) => {
+        if (id !== undefined) {
+            const feedIndex = id + 1; // backend sends 0-3, UI expects 1-4
             const imgEl = document.getElementById(`orb-feed-${feedIndex}`);
             if (imgEl) {
-                imgEl.src = data.image;
+                imgEl.src = url;
             }
         }
     });
+
+    // Keypoints arrive separately when the server runs with ORB_KEYPOINTS=channel
+    const features = new FeatureChannelClient(socket, (id, points) => {
+        const canvas = document.getElementById(`orb-overlay-${id + 1}`);
+        if (!canvas) return;
+        canvas.width = canvas.clientWidth;
+        canvas.height = canvas.clientHeight;
+        FeatureChannelClient.draw(canvas, points);
+    });
+
+    if (overlayToggle) {
+        overlayToggle.addEventListener("change", () => {
+            const ids = [0, 1, 2, 3];
+            if (overlayToggle.checked) {
+                features.subscribe(ids);
+            } else {
+                features.unsubscribe(ids);
+                document.querySelectorAll(".orb-overlay").forEach((c) => {
+                    c.getContext("2d").clearRect(0, 0, c.width, c.height);
+                });
+            }
+        });
+    }
 });
@@ -0,0 +1,138 @@
+/**
+ * Telemetry delta protocol client
+ * Rebuilds the full UAV list from telemetry_keyframe / telemetry_delta events, or, with the
+ * 'columnar' wire format (option or ?wire=columnar), from typed-array telemetry_columnar frames
+ */
+
+class TelemetryClient {
+    constructor(socket, onUpdate, options = {}) {
+        this.socket = socket;
+        this.onUpdate = onUpdate;
+        this.uavs = new Map();
+        this.held = new Set();  // UAVs whose last_contact is not advancing
+        this.seq = 0;
+        this.pathPoints = 100;
+        this.synced = false;
+        this.format = options.format || new URLSearchParams(window.location.search).get('wire') || 'json';
+        this.schema = null;
+        this.roster = null;
+        this.ids = [];
+
+        this.socket.on('telemetry_keyframe', (frame) => this.applyKeyframe(frame));
+        this.socket.on('telemetry_delta', (delta) => this.applyDelta(delta));
+        this.socket.on('disconnect', () => { this.synced = false; });
+
+        if (this.format !== 'json') {
+            // Servers without columnar support ignore the request and keep sending JSON
+            const negotiate = () => this.socket.emit('set_wire_format', { format: this.format });
+            this.socket.on('connect', negotiate);
+            if (this.socket.connected) negotiate();
+
+            this.socket.on('wire_format', (ack) => { this.schema = ack.schema; });
+            this.socket.on('telemetry_roster', (roster) => { this.roster = roster.roster; this.ids = roster.ids; });
+            this.socket.on('uav_data', (uavs) => this.applyRecords(uavs));
+            this.socket.on('telemetry_columnar', (frame) => this.applyColumnar(frame));
+        }
+    }
+
+    applyRecords(uavs) {
+        if (!this.schema) return;
+        this.uavs = new Map(uavs.map(uav => [uav.id, uav]));
+        this.synced = true;
+    }
+
+    applyColumnar(frame) {
+        if (!this.synced || !this.schema) return;
+        if (frame.ids) {
+            this.roster = frame.roster;
+            this.ids = frame.ids;
+        }
+
+        // Rows we cannot place: ask for the roster and full records again
+        if (frame.roster !== this.roster || this.ids.some(id => !this.uavs.has(id))) {
+            this.synced = false;
+            this.socket.emit('telemetry_resync', { roster: this.roster });
+            return;
+        }
+
+        const n = frame.n;
+        const schema = this.schema;
+        const f64 = new Float64Array(frame.f64);
+        const f32 = new Float32Array(frame.f32);
+        const u8 = new Uint8Array(frame.u8);
+        const u32 = new Uint32Array(frame.u32);
+
+        this.ids.forEach((id, i) => {
+            const uav = this.uavs.get(id);
+            schema.f64.forEach((field, k) => { uav[field] = f64[k * n + i]; });
+            schema.f32.forEach((field, k) => { uav[field] = Math.round(f32[k * n + i] * 10) / 10; });
+            // Enumerations are sent as indexes into the schema's tables; the rest are flags
+            schema.u8.forEach((field, k) => {
+                const value = u8[k * n + i];
+                uav[field] = schema[field] ? schema[field][value] : value === 1;
+            });
+            // The server recorded a new track point
+            const total = u32[i];
+            if (uav.path_total !== undefined && total > uav.path_total) {
+                uav.path_history = uav.path_history.concat([[uav.lat, uav.lon]]).slice(-this.pathPoints);
+            }
+            uav.path_total = total;
+        });
+
+        if (this.uavs.size !== this.ids.length) {
+            const current = new Set(this.ids);
+            Array.from(this.uavs.keys()).forEach(id => { if (!current.has(id)) this.uavs.delete(id); });
+        }
+
+        this.onUpdate(this.list());
+    }
+
+    applyKeyframe(frame) {
+        this.seq = frame.seq;
+        this.pathPoints = frame.path_points || this.pathPoints;
+        this.uavs = new Map(frame.uavs.map(uav => [uav.id, uav]));
+        this.held = new Set(frame.contact_held || []);
+        this.synced = true;
+        this.onUpdate(this.list());
+    }
+
+    applyDelta(delta) {
+        if (!this.synced) return;
+
+        // Stale or duplicate, e.g. the delta for a keyframe that arrived first
+        if (delta.seq <= this.seq) return;
+
+        // Gap in the sequence: drop our copy and ask for a keyframe
+        if (delta.seq > this.seq + 1) {
+            this.synced = false;
+            this.socket.emit('telemetry_resync', { seq: this.seq });
+            return;
+        }
+        this.seq = delta.seq;
+
+        // last_contact is not diffed: everyone moves to delta.contact except the held UAVs
+        (delta.contact_hold || []).forEach(id => this.held.add(id));
+        (delta.contact_release || []).forEach(id => this.held.delete(id));
+        this.uavs.forEach((uav, id) => { if (!this.held.has(id)) uav.last_contact = delta.contact; });
+
+        (delta.added || []).forEach(uav => this.uavs.set(uav.id, uav));
+        (delta.removed || []).forEach(id => { this.uavs.delete(id); this.held.delete(id); });
+
+        Object.entries(delta.uavs).forEach(([id, changes]) => {
+            const uav = this.uavs.get(id);
+            if (!uav) return;
+
+            const { path_append: appended, ...fields } = changes;
+            Object.assign(uav, fields);
+            if (appended) {
+                uav.path_history = uav.path_history.concat(appended).slice(-this.pathPoints);
+            }
+        });
+
+        this.onUpdate(this.list());
+    }
+
+    list() {
+        return Array.from(this.uavs.values());
+    }
+}
@@ -0,0 +1,154 @@
+/**
+ * Processed video feed client
+ * Frames arrive as raw JPEG binary attachments and are shown through blob URLs.
+ * Only subscribed streams are sent (and processed) by the server. Displayed
+ * frames are acknowledged about once a second so the server can move this
+ * client between quality tiers.
+ */
+
+class VideoFeedClient {
+    constructor(socket, onFrame, streams = [0, 1, 2, 3], ackInterval = 1000) {
+        this.socket = socket;
+        this.onFrame = onFrame;
+        this.urls = new Map();
+        this.streams = new Set(streams);
+        this.tier = null;
+        this.tiers = [];
+        this.ackInterval = ackInterval;
+        this.lastAck = 0;
+
+        this.socket.on('frame', (payload) => this.handleFrame(payload));
+        this.socket.on('stream_tier', (data) => {
+            this.tier = data.tier;
+            if (data.tiers) this.tiers = data.tiers;
+        });
+
+        // Subscriptions live in server-side rooms, so replay them after every reconnect
+        this.socket.on('connect', () => this.resubscribe());
+        if (this.socket.connected) this.resubscribe();
+    }
+
+    resubscribe() {
+        if (this.streams.size) {
+            this.socket.emit('subscribe', { streams: [...this.streams] });
+        }
+    }
+
+    subscribe(ids) {
+        ids.forEach((id) => this.streams.add(id));
+        this.socket.emit('subscribe', { streams: ids });
+    }
+
+    unsubscribe(ids) {
+        ids.forEach((id) => this.streams.delete(id));
+        this.socket.emit('unsubscribe', { streams: ids });
+    }
+
+    handleFrame(payload) {
+        const { id, image } = payload;
+
+        // Older servers still send data: URLs
+        const url = typeof image === 'string'
+            ? image
+            : URL.createObjectURL(new Blob([image], { type: 'image/jpeg' }));
+
+        const previous = this.urls.get(id);
+        this.urls.set(id, url);
+        this.onFrame(id, url, payload);
+
+        if (previous && previous.startsWith('blob:')) {
+            URL.revokeObjectURL(previous);
+        }
+
+        if (payload.ts !== undefined) {
+            const now = Date.now();
+            if (now - this.lastAck >= this.ackInterval) {
+                this.lastAck = now;
+                this.socket.emit('frame_ack', { ts: payload.ts });
+            }
+        }
+    }
+
+    // 'high' | 'medium' | 'low' pins a tier; 'auto' follows measured latency
+    setTier(tier) {
+        this.socket.emit('set_stream_tier', { tier });
+    }
+
+    static mjpegUrl(id, tier) {
+        return tier ? `/video/${id}.mjpg?tier=${tier}` : `/video/${id}.mjpg`;
+    }
+}
+
+/**
+ * Packed ORB keypoints from the 'features' event (server ORB_KEYPOINTS=channel).
+ * 8-byte little-endian records: x, y (uint16, 0..65535 of the frame size),
+ * size (uint8 px), angle (uint8, 1/256 turn), response (float16).
+ */
+class FeatureChannelClient {
+    constructor(socket, onFeatures, streams = [0, 1, 2, 3]) {
+        this.socket = socket;
+        this.onFeatures = onFeatures;
+        this.streams = new Set(streams);
+
+        this.socket.on('features', (payload) => {
+            this.onFeatures(payload.id, FeatureChannelClient.decode(payload.data), payload);
+        });
+        this.socket.on('connect', () => this.resubscribe());
+        if (this.socket.connected) this.resubscribe();
+    }
+
+    resubscribe() {
+        if (this.streams.size) {
+            this.socket.emit('subscribe', { features: [...this.streams] });
+        }
+    }
+
+    // Stop receiving keypoints (frames keep coming, un-annotated)
+    unsubscribe(ids) {
+        ids.forEach((id) => this.streams.delete(id));
+        this.socket.emit('unsubscribe', { features: ids });
+    }
+
+    subscribe(ids) {
+        ids.forEach((id) => this.streams.add(id));
+        this.socket.emit('subscribe', { features: ids });
+    }
+
+    static decode(buffer) {
+        const view = new DataView(buffer instanceof ArrayBuffer ? buffer : buffer.buffer);
+        const count = Math.floor(view.byteLength / 8);
+        const points = new Array(count);
+        for (let i = 0, o = 0; i < count; i++, o += 8) {
+            points[i] = {
+                x: view.getUint16(o, true) / 65535,
+                y: view.getUint16(o + 2, true) / 65535,
+                size: view.getUint8(o + 4),
+                angle: view.getUint8(o + 5) * (360 / 256),
+                response: halfToFloat(view.getUint16(o + 6, true))
+            };
+        }
+        return points;
+    }
+
+    // Draw keypoints as small dots scaled to the canvas (matches the old burned-in look)
+    static draw(canvas, points, minResponse = 0) {
+        const ctx = canvas.getContext('2d');
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.fillStyle = '#00ff00';
+        for (const p of points) {
+            if (p.response < minResponse) continue;
+            ctx.beginPath();
+            ctx.arc(p.x * canvas.width, p.y * canvas.height, 2, 0, 2 * Math.PI);
+            ctx.fill();
+        }
+    }
+}
+
+function halfToFloat(h) {
+    const sign = h & 0x8000 ? -1 : 1;
+    const exp = (h >> 10) & 0x1f;
+    const frac = h & 0x3ff;
+    if (exp === 0) return sign * Math.pow(2, -14) * (frac / 1024);
+    if (exp === 0x1f) return frac ? NaN : sign * Infinity;
+    return sign * Math.pow(2, exp - 15) * (1 + frac / 1024);
+}